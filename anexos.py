@@ -0,0 +1,52 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/anexos.py
+# Anexos das OS (laudos em PDF antigos e afins), guardados na tabela `anexos`.
+#
+# As listagens de OS nunca trazem o conteúdo binário: aqui só se consulta os
+# metadados e o arquivo é lido em blocos (substring) quando o download é pedido.
+# Os anexos vêm da migração dos laudos antigos; a aplicação não grava novos.
+
+from sqlalchemy import text
+
+# Tamanho de cada leitura do conteúdo (1 MiB)
+TAMANHO_BLOCO = 1024 * 1024
+
+
+def listar_anexos(conn, tipo_os, os_id):
+    """Metadados dos anexos de uma OS (sem o conteúdo)."""
+    query = text("""
+        SELECT id, nome_arquivo, mime, tamanho, criado_em
+        FROM anexos
+        WHERE tipo_os = :tipo_os AND os_id = :os_id
+        ORDER BY id
+    """)
+    with conn.connect() as con:
+        return [dict(row._mapping) for row in con.execute(query, {"tipo_os": tipo_os, "os_id": int(os_id)})]
+
+
+def ler_anexo_em_blocos(conn, anexo_id, tamanho_bloco=TAMANHO_BLOCO):
+    """Gera o conteúdo do anexo em blocos de `tamanho_bloco` bytes."""
+    query = text("SELECT substring(conteudo FROM :inicio FOR :tamanho) FROM anexos WHERE id = :id")
+    with conn.connect() as con:
+        tamanho_total = con.execute(
+            text("SELECT tamanho FROM anexos WHERE id = :id"), {"id": anexo_id}
+        ).scalar()
+        if tamanho_total is None:
+            return
+        inicio = 1  # substring do Postgres é 1-indexado
+        while inicio <= tamanho_total:
+            bloco = con.execute(query, {"id": anexo_id, "inicio": inicio, "tamanho": tamanho_bloco}).scalar()
+            if not bloco:
+                break
+            yield bytes(bloco)
+            inicio += tamanho_bloco
+
+
+def ler_anexo(conn, anexo_id):
+    """Conteúdo completo do anexo.
+
+    A leitura em blocos só limita o tamanho de cada consulta: os blocos são
+    juntados aqui, então o arquivo inteiro fica em memória (o st.download_button
+    precisa dos bytes completos).
+    """
+    return b"".join(ler_anexo_em_blocos(conn, anexo_id))
+
@@ -1,43 +1,27 @@
 # CÓDIGO COMPLETO E CORRIGIDO: app.py
 
 import streamlit as st
-from sqlalchemy import create_engine, text
 from sqlalchemy.exc import OperationalError
-import time
-import os
 import database
+import monitoramento
 from auth import authenticate_user
+from instrumentacao import medir
 
-@st.cache_resource(show_spinner="Conectando e configurando o banco de dados...", ttl=300)
+# Sem TTL: o engine vive enquanto o processo viver (ver database.py). As
+# migrações só rodam de fato quando há versão pendente (ver migrador.py).
+@st.cache_resource(show_spinner="Conectando e configurando o banco de dados...")
 def initialize_database():
-    retries = 10
-    for i in range(retries):
-        try:
-            DB_HOST = os.getenv("DB_HOST", "localhost")
-            DB_NAME = os.getenv("DB_NAME", "ordens_servico")
-            DB_USER = os.getenv("DB_USER", "postgres")
-            DB_PASSWORD = os.getenv("DB_PASSWORD", "1234")
-            
-            db_engine_url = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}"
-            db_engine = create_engine(db_engine_url, pool_pre_ping=True, pool_size=10, max_overflow=20, pool_recycle=3600)
-            
-            with db_engine.connect() as connection:
-                connection.execute(text("SELECT 1"))
-            
-            from database import init_db
-            init_db(db_engine)
-            
-            global _engine
-            database._engine = db_engine
-            return db_engine
-            
-        except OperationalError as e:
-            print(f"Tentativa {i + 1} de {retries} falhou: {e}")
-            if i < retries - 1:
-                time.sleep(2)
-            else:
-                st.error("Não foi possível conectar ao banco de dados após várias tentativas.")
-                raise
+    try:
+        return database.inicializar_engine()
+    except OperationalError:
+        st.error("Não foi possível conectar ao banco de dados após várias tentativas.")
+        raise
+
+# Com `python servidor.py` o monitoramento já está no ar; aqui cobre o
+# `streamlit run app.py` direto (ex.: desenvolvimento)
+@st.cache_resource(show_spinner=False)
+def iniciar_monitoramento():
+    return monitoramento.iniciar()
 
 def show_login_page():
     st.set_page_config(page_title="Sistema de Registro de OS - PMLEM", page_icon="🔐", layout="centered")
@@ -178,6 +162,10 @@ def show_main_app():
                 st.session_state.current_page = "Gerenciar Usuários"
                 st.rerun()
             
+            if st.button("Desempenho", use_container_width=True):
+                st.session_state.current_page = "Desempenho"
+                st.rerun()
+            
             st.markdown("---")
             
             if st.button("Minha Conta", use_container_width=True):
@@ -267,7 +255,7 @@ def show_main_app():
                 for key in list(st.session_state.keys()):
                     del st.session_state[key]
                 st.rerun()
-    
+        
     # Verificação de acesso às páginas
     page = st.session_state.current_page
     
@@ -284,6 +272,7 @@ def show_main_app():
         "Laudos": ["tecnico", "admin"],
         "Importar Dados": ["admin"],
         "Gerenciar Usuários": ["admin"],
+        "Desempenho": ["admin"],
         "Minha Conta": ["admin", "tecnico", "administrativo", "tecnico_recarga"],
     }
     
@@ -301,56 +290,62 @@ def show_main_app():
         
         st.rerun()
     
-    # Roteamento de páginas
-    if page == "Dashboard":
-        import dashboard
-        dashboard.render()
+    # Roteamento de páginas; mede só a página, sem o menu lateral
+    with medir(f"render:{page}"):
+        if page == "Dashboard":
+            import dashboard
+            dashboard.render()
+    
+        elif page == "Registrar OS":
+            import registrar_os
+            registrar_os.render()
     
-    elif page == "Registrar OS":
-        import registrar_os
-        registrar_os.render()
+        elif page == "Minhas Tarefas":
+            import minhas_tarefas
+            minhas_tarefas.render()
     
-    elif page == "Minhas Tarefas":
-        import minhas_tarefas
-        minhas_tarefas.render()
+        elif page == "Minhas Recargas":
+            import minhas_recargas
+            minhas_recargas.render()
     
-    elif page == "Minhas Recargas":
-        import minhas_recargas
-        minhas_recargas.render()
+        elif page == "Filtrar OS":
+            import filtro
+            filtro.render()
     
-    elif page == "Filtrar OS":
-        import filtro
-        filtro.render()
+        elif page == "Dar Baixa":
+            import dar_baixa
+            dar_baixa.render()
     
-    elif page == "Dar Baixa":
-        import dar_baixa
-        dar_baixa.render()
+        elif page == "Equipamentos":
+            import equipamentos
+            equipamentos.render()
     
-    elif page == "Equipamentos":
-        import equipamentos
-        equipamentos.render()
+        elif page == "Laudos":
+            import laudos
+            laudos.render()
     
-    elif page == "Laudos":
-        import laudos
-        laudos.render()
+        elif page == "Registrar Laudo":
+            import laudos
+            laudos.render()
     
-    elif page == "Registrar Laudo":
-        import laudos
-        laudos.render()
+        elif page == "Importar Dados":
+            import importar_dados
+            importar_dados.render()
     
-    elif page == "Importar Dados":
-        import importar_dados
-        importar_dados.render()
+        elif page == "Gerenciar Usuários":
+            import gerenciar_usuarios
+            gerenciar_usuarios.render()
     
-    elif page == "Gerenciar Usuários":
-        import gerenciar_usuarios
-        gerenciar_usuarios.render()
+        elif page == "Minha Conta":
+            import minha_conta
+            minha_conta.render()
     
-    elif page == "Minha Conta":
-        import minha_conta
-        minha_conta.render()
+        elif page == "Desempenho":
+            import desempenho
+            desempenho.render()
 
 def main():
+    iniciar_monitoramento()
     initialize_database()
     
     if "authenticated" not in st.session_state:
@@ -359,7 +354,9 @@ def main():
     if not st.session_state.authenticated:
         show_login_page()
     else:
-        show_main_app()
+        # Mede a execução completa do script (menu lateral + página)
+        with medir(f"pagina:{st.session_state.get('current_page', '')}"):
+            show_main_app()
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -3,6 +3,7 @@
 from passlib.context import CryptContext
 from sqlalchemy import text
 from database import get_connection
+from instrumentacao import cronometrado
 import re 
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -11,6 +12,7 @@ def hash_password(password: str) -> str:
     """Gera o hash de uma senha."""
     return pwd_context.hash(password)
 
+@cronometrado("bcrypt_segundos")
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verifica se a senha simples corresponde ao hash."""
     return pwd_context.verify(plain_password, hashed_password)
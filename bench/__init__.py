@@ -0,0 +1,76 @@
+# Scripts de benchmark e verificação de desempenho.
+# Execute a partir da raiz do projeto, apontando para um banco de DESENVOLVIMENTO:
+#   DB_HOST=localhost DB_NAME=ordens_servico_dev python -m bench.<script>
+
+from sqlalchemy import create_engine, text
+from config import DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT
+from config import TECNICOS, SECRETARIAS, CATEGORIAS, EQUIPAMENTOS
+
+
+def criar_engine(pool_size=10, max_overflow=20):
+    """Cria um engine próprio para os benchmarks (não usa o engine da aplicação)."""
+    url = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    return create_engine(url, pool_size=pool_size, max_overflow=max_overflow, pool_pre_ping=True)
+
+
+# Carga sintética de OS com distribuição aproximada de produção: a grande
+# maioria já foi encerrada. As linhas levam o marcador em `registrado_por`
+# e no número, para que possam ser removidas depois (limpar_os).
+SQL_POPULAR_OS = text("""
+    WITH p AS (
+        SELECT CAST(:tecnicos AS text[]) AS tecnicos,
+               CAST(:secretarias AS text[]) AS secretarias,
+               CAST(:categorias AS text[]) AS categorias,
+               CAST(:equipamentos AS text[]) AS equipamentos
+    )
+    INSERT INTO ordens_servico (
+        tipo, numero, secretaria, setor, data, hora, solicitante, telefone,
+        solicitacao_cliente, categoria, equipamento, status, data_finalizada, tecnico, registrado_por
+    )
+    SELECT
+        CASE WHEN s.r_tipo < 0.6 THEN 'Interna' ELSE 'Externa' END,
+        :marcador || '-' || s.g,
+        p.secretarias[1 + floor(s.r_sec * array_length(p.secretarias, 1))::int],
+        'BENCH',
+        CURRENT_DATE - floor(s.r_data * 1825)::int,
+        TIME '07:00' + s.r_hora * INTERVAL '10 hours',
+        'bench', '0', 'carga sintética',
+        p.categorias[1 + floor(s.r_cat * array_length(p.categorias, 1))::int],
+        p.equipamentos[1 + floor(s.r_cat * array_length(p.equipamentos, 1))::int],
+        s.status,
+        CASE WHEN s.status IN ('FINALIZADO', 'AGUARDANDO RETIRADA', 'ENTREGUE AO CLIENTE')
+             THEN (CURRENT_DATE - floor(s.r_data * 1825)::int) + s.r_hora * INTERVAL '15 days'
+        END,
+        p.tecnicos[1 + floor(s.r_tec * array_length(p.tecnicos, 1))::int],
+        :marcador
+    FROM p, (
+        SELECT g, random() AS r_tipo, random() AS r_sec, random() AS r_data, random() AS r_hora,
+               random() AS r_cat, random() AS r_tec,
+               CASE
+                   WHEN random() < 0.03 THEN 'EM ABERTO'
+                   WHEN random() < 0.02 THEN 'AGUARDANDO PEÇA(S)'
+                   WHEN random() < 0.05 THEN 'AGUARDANDO RETIRADA'
+                   WHEN random() < 0.15 THEN 'FINALIZADO'
+                   ELSE 'ENTREGUE AO CLIENTE'
+               END AS status
+        FROM generate_series(1, :registros) g
+        OFFSET 0  -- impede que o subselect seja achatado (random() por linha)
+    ) s
+""")
+
+
+def popular_os(con, registros, marcador):
+    """Insere `registros` OS sintéticas em ordens_servico (na transação corrente)."""
+    con.execute(SQL_POPULAR_OS, {
+        "registros": registros,
+        "marcador": marcador,
+        "tecnicos": TECNICOS,
+        "secretarias": SECRETARIAS,
+        "categorias": CATEGORIAS,
+        "equipamentos": EQUIPAMENTOS,
+    })
+
+
+def limpar_os(con, marcador):
+    """Remove as OS sintéticas criadas com o marcador."""
+    con.execute(text("DELETE FROM ordens_servico WHERE registrado_por = :marcador"), {"marcador": marcador})
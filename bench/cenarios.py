@@ -0,0 +1,205 @@
+# Cenário de uso completo, executado sem navegador pelo streamlit.testing.v1.AppTest.
+#
+# Cada iteração abre sessões novas e percorre o fluxo do dia a dia:
+#
+#   login           técnico entra (bcrypt + primeira renderização de Minhas Tarefas)
+#   minhas_tarefas  volta para Minhas Tarefas pelo menu
+#   filtro          abre Filtrar OS
+#   filtro_aplicar  aplica os filtros (primeira página de resultados)
+#   dashboard       admin, em outra sessão, abre o Dashboard
+#   dar_baixa       técnico abre Dar Baixa e busca uma OS aberta dele
+#
+# O tempo de cada passo é o de um `at.run()` (o rerun completo do script, como
+# o navegador veria). A baixa em si não é gravada, para que as iterações e as
+# execuções sejam comparáveis. Os usuários e as OS vêm de bench.gerador.
+#
+# Uso:
+#   python -m bench.gerador --os 1000000
+#   python -m bench.cenarios --iteracoes 30 --salvar base.json
+#   ... mudança ...
+#   python -m bench.cenarios --iteracoes 30 --comparar base.json
+
+import argparse
+import json
+import os
+import time
+from datetime import datetime
+
+from sqlalchemy import text
+from streamlit.testing.v1 import AppTest
+
+from bench import criar_engine
+from bench.gerador import SENHA, nome_usuario
+from config import TECNICOS
+from instrumentacao import _percentil, resumo_consultas
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+PASSOS = ["login", "minhas_tarefas", "filtro", "filtro_aplicar", "dashboard", "dar_baixa"]
+
+SQL_OS_ABERTA = text("""
+    SELECT tipo, numero
+    FROM ordens_servico
+    WHERE tecnico = :tecnico AND status IN ('EM ABERTO', 'AGUARDANDO PEÇA(S)')
+    ORDER BY ordenacao DESC
+    LIMIT 1
+""")
+
+
+def _widget(lista, rotulo):
+    for widget in lista:
+        if widget.label == rotulo:
+            return widget
+    raise LookupError(f"Widget '{rotulo}' não encontrado na página")
+
+
+def _rodar(at, tempos, passo):
+    inicio = time.perf_counter()
+    at.run()
+    tempos.setdefault(passo, []).append((time.perf_counter() - inicio) * 1000)
+    if at.exception:
+        raise RuntimeError(f"{passo}: {at.exception[0].value}")
+
+
+def _entrar(at, usuario, senha, tempos, passo):
+    at.run()
+    _widget(at.text_input, "Usuário").input(usuario)
+    _widget(at.text_input, "Senha").input(senha)
+    _widget(at.button, "Entrar").click()
+    _rodar(at, tempos, passo)
+    if not at.session_state["authenticated"]:
+        raise RuntimeError(f"Login de '{usuario}' recusado (rodou bench.gerador?)")
+
+
+def iteracao(args, os_aberta, tempos):
+    tecnico = AppTest.from_file(APP, default_timeout=args.timeout)
+    admin = AppTest.from_file(APP, default_timeout=args.timeout)
+
+    _entrar(tecnico, nome_usuario(args.tecnico), args.senha, tempos, "login")
+
+    _widget(tecnico.sidebar.button, "Minhas Tarefas").click()
+    _rodar(tecnico, tempos, "minhas_tarefas")
+
+    _widget(tecnico.sidebar.button, "Filtrar OS").click()
+    _rodar(tecnico, tempos, "filtro")
+    _widget(tecnico.button, "Aplicar Filtros").click()
+    _rodar(tecnico, tempos, "filtro_aplicar")
+
+    # O login do admin não entra nos tempos: o passo mede o Dashboard já com a sessão aberta
+    _entrar(admin, nome_usuario("admin"), args.senha, {}, "login_admin")
+    _widget(admin.sidebar.button, "Dashboard").click()
+    _rodar(admin, tempos, "dashboard")
+
+    _widget(tecnico.sidebar.button, "Dar Baixa").click()
+    tecnico.run()
+    tipo, numero = os_aberta
+    tecnico.selectbox(key="select_tipo_os_baixa").set_value(tipo)
+    tecnico.text_input(key="input_numero_os_baixa").input(numero)
+    _widget(tecnico.button, "Buscar OS").click()
+    _rodar(tecnico, tempos, "dar_baixa")
+    if "os_baixa_encontrada" not in tecnico.session_state or not tecnico.session_state["os_baixa_encontrada"]:
+        raise RuntimeError(f"dar_baixa: OS {numero} ({tipo}) não encontrada")
+
+
+def resumir(tempos):
+    resultado = {}
+    for passo in PASSOS:
+        valores = sorted(tempos.get(passo, []))
+        if not valores:
+            continue
+        resultado[passo] = {
+            "n": len(valores),
+            "p50_ms": round(_percentil(valores, 0.50), 1),
+            "p95_ms": round(_percentil(valores, 0.95), 1),
+            "p99_ms": round(_percentil(valores, 0.99), 1),
+            "max_ms": round(valores[-1], 1),
+        }
+    return resultado
+
+
+def comparar(atual, base, tolerancia):
+    """Imprime a variação do p50/p95 de cada passo; devolve os passos que pioraram."""
+    piores = []
+    print(f"{'passo':<16} {'p50 base':>10} {'p50':>10} {'var':>8} {'p95 base':>10} {'p95':>10} {'var':>8}")
+    for passo, medidas in atual.items():
+        anterior = base.get(passo)
+        if not anterior:
+            continue
+        var50 = medidas["p50_ms"] / anterior["p50_ms"] - 1
+        var95 = medidas["p95_ms"] / anterior["p95_ms"] - 1
+        marca = ""
+        if var50 > tolerancia or var95 > tolerancia:
+            piores.append(passo)
+            marca = "  ❌"
+        print(f"{passo:<16} {anterior['p50_ms']:>10.1f} {medidas['p50_ms']:>10.1f} {var50:>+8.0%} "
+              f"{anterior['p95_ms']:>10.1f} {medidas['p95_ms']:>10.1f} {var95:>+8.0%}{marca}")
+    return piores
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cenário completo da aplicação via AppTest")
+    parser.add_argument("--iteracoes", type=int, default=20)
+    parser.add_argument("--aquecimento", type=int, default=2, help="Iterações descartadas (caches frios)")
+    parser.add_argument("--tecnico", default=TECNICOS[0], help="Técnico (de config.TECNICOS) que percorre o cenário")
+    parser.add_argument("--senha", default=SENHA)
+    parser.add_argument("--timeout", type=float, default=60, help="Limite, em segundos, de cada rerun")
+    parser.add_argument("--salvar", help="Grava o resultado em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior (--salvar)")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora aceitável no p50/p95 (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    engine = criar_engine(pool_size=1, max_overflow=0)
+    try:
+        with engine.connect() as con:
+            os_aberta = con.execute(SQL_OS_ABERTA, {"tecnico": args.tecnico}).first()
+            total_os = con.execute(text("SELECT COUNT(*) FROM ordens_servico")).scalar()
+    finally:
+        engine.dispose()
+    if os_aberta is None:
+        print(f"❌ {args.tecnico} não tem OS abertas; gere os dados com python -m bench.gerador")
+        raise SystemExit(1)
+
+    print("=" * 90)
+    print(f"CENÁRIO COMPLETO - {args.iteracoes} iterações (+{args.aquecimento} de aquecimento), "
+          f"{total_os} OS no banco, técnico {args.tecnico}")
+    print("=" * 90)
+
+    tempos = {}
+    for i in range(args.aquecimento + args.iteracoes):
+        iteracao(args, tuple(os_aberta), tempos if i >= args.aquecimento else {})
+
+    resultado = resumir(tempos)
+    print(f"{'passo':<16} {'n':>5} {'p50 (ms)':>10} {'p95 (ms)':>10} {'p99 (ms)':>10} {'máx. (ms)':>10}")
+    for passo, medidas in resultado.items():
+        print(f"{passo:<16} {medidas['n']:>5} {medidas['p50_ms']:>10.1f} {medidas['p95_ms']:>10.1f} "
+              f"{medidas['p99_ms']:>10.1f} {medidas['max_ms']:>10.1f}")
+
+    print("-" * 90)
+    print("Consultas que mais somaram tempo no cenário:")
+    for consulta in resumo_consultas()[:5]:
+        print(f"  {consulta['total_ms']:>10.1f} ms  {consulta['execucoes']:>6}x  {consulta['nome'][:60]}")
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump({
+                "executado_em": datetime.now().isoformat(timespec="seconds"),
+                "iteracoes": args.iteracoes,
+                "total_os": total_os,
+                "passos": resultado,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"✅ Resultado gravado em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        print("-" * 90)
+        print(f"Comparação com {args.comparar} ({base['executado_em']}, {base['total_os']} OS)")
+        piores = comparar(resultado, base["passos"], args.tolerancia)
+        if piores:
+            print(f"❌ Pioraram mais de {args.tolerancia:.0%}: {', '.join(piores)}")
+            raise SystemExit(1)
+        print(f"✅ Nenhum passo piorou mais de {args.tolerancia:.0%}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+# Benchmark de concorrência da numeração de OS.
+#
+# Dispara N registros simultâneos de OS com W threads e verifica que os números
+# emitidos não têm buracos nem duplicatas. Compara o contador por ano
+# (contadores.py) com a estratégia antiga (LOCK TABLE + MAX(SPLIT_PART)).
+#
+# Uso:
+#   python -m bench.concorrencia_numeracao --registros 500 --workers 1,4,16,32
+#
+# Os registros são criados com o ano fictício de 2099 (sufixo -99) e removidos
+# ao final, para não interferir na numeração real.
+
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from sqlalchemy import text
+
+from bench import criar_engine
+from contadores import proximo_numero
+
+ANO_BENCH = datetime(2099, 1, 1)
+SUFIXO = f"-{ANO_BENCH.year % 100:02d}"
+MARCADOR = "bench-numeracao"
+
+SQL_INSERT = """
+    INSERT INTO {tabela} (numero, secretaria, setor, data, hora, solicitante, telefone,
+                          solicitacao_cliente, categoria, equipamento, status, tecnico, registrado_por)
+    VALUES (:numero, 'OUTROS', 'BENCH', CURRENT_DATE, CURRENT_TIME, 'bench', '0',
+            'benchmark de numeração', 'OUTROS', 'COMPUTADOR', 'EM ABERTO', NULL, :marcador)
+"""
+
+
+def _numero_legado(con, tabela):
+    """Estratégia anterior: bloqueio exclusivo da tabela + varredura do MAX do ano."""
+    con.execute(text(f"LOCK TABLE {tabela} IN ACCESS EXCLUSIVE MODE"))
+    resultado = con.execute(
+        text(f"""
+            SELECT COALESCE(MAX(CAST(SPLIT_PART(numero, '-', 1) AS INTEGER)), 0)
+            FROM {tabela}
+            WHERE numero LIKE :sufixo
+        """),
+        {"sufixo": f"%{SUFIXO}"},
+    ).scalar()
+    return f"{resultado + 1}{SUFIXO}"
+
+
+def _numero_contador(con, tabela):
+    return proximo_numero(con, tabela, agora=ANO_BENCH)
+
+
+def _registrar(engine, tabela, gerar_numero):
+    with engine.connect() as con:
+        with con.begin():
+            numero = gerar_numero(con, tabela)
+            con.execute(text(SQL_INSERT.format(tabela=tabela)), {"numero": numero, "marcador": MARCADOR})
+    return numero
+
+
+def _limpar(engine, tabela):
+    with engine.connect() as con:
+        with con.begin():
+            con.execute(
+                text(f"DELETE FROM {tabela} WHERE registrado_por = :marcador AND numero LIKE :sufixo"),
+                {"marcador": MARCADOR, "sufixo": f"%{SUFIXO}"},
+            )
+            con.execute(
+                text("DELETE FROM contadores_os WHERE tabela = :tabela AND ano = :ano"),
+                {"tabela": tabela, "ano": ANO_BENCH.year},
+            )
+
+
+def _maior_existente(engine, tabela):
+    with engine.connect() as con:
+        return con.execute(
+            text(f"""
+                SELECT COALESCE(MAX(CAST(SPLIT_PART(numero, '-', 1) AS INTEGER)), 0)
+                FROM {tabela} WHERE numero ~ :padrao
+            """),
+            {"padrao": f"^[0-9]+{SUFIXO}$"},
+        ).scalar()
+
+
+def executar(engine, tabela, estrategia, gerar_numero, registros, workers):
+    _limpar(engine, tabela)
+    base = _maior_existente(engine, tabela)
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        numeros = list(pool.map(lambda _: _registrar(engine, tabela, gerar_numero), range(registros)))
+    duracao = time.perf_counter() - inicio
+
+    sequenciais = sorted(int(n.split("-")[0]) for n in numeros)
+    duplicados = len(sequenciais) - len(set(sequenciais))
+    esperados = set(range(base + 1, base + registros + 1))
+    faltando = sorted(esperados - set(sequenciais))
+
+    ok = duplicados == 0 and not faltando
+    print(
+        f"{estrategia:<10} workers={workers:<3} registros={registros:<5} "
+        f"tempo={duracao:7.2f}s  vazão={registros / duracao:8.1f} OS/s  "
+        f"duplicados={duplicados}  buracos={len(faltando)}  {'✅' if ok else '❌'}"
+    )
+    _limpar(engine, tabela)
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de concorrência da numeração de OS")
+    parser.add_argument("--registros", type=int, default=500)
+    parser.add_argument("--workers", default="1,4,16,32", help="Lista de níveis de concorrência")
+    parser.add_argument("--tabela", default="os_interna", choices=["os_interna", "os_externa"])
+    parser.add_argument("--sem-legado", action="store_true", help="Não executa a estratégia antiga")
+    args = parser.parse_args()
+
+    niveis = [int(w) for w in args.workers.split(",")]
+    engine = criar_engine(pool_size=max(niveis), max_overflow=0)
+
+    print("=" * 90)
+    print(f"NUMERAÇÃO DE OS - {args.registros} registros em {args.tabela}")
+    print("=" * 90)
+
+    tudo_ok = True
+    for workers in niveis:
+        tudo_ok &= executar(engine, args.tabela, "contador", _numero_contador, args.registros, workers)
+        if not args.sem_legado:
+            tudo_ok &= executar(engine, args.tabela, "legado", _numero_legado, args.registros, workers)
+
+    engine.dispose()
+    if not tudo_ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
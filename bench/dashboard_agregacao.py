@@ -0,0 +1,153 @@
+# Benchmark do dashboard: pandas sobre todas as OS x agregação no banco.
+#
+# Semeia N OS sintéticas (padrão: 1 milhão), executa o caminho antigo
+# (pd.read_sql de todas as OS + cálculos em pandas) e o novo (dashboard_dados),
+# confere que os números batem e imprime tempo e memória de cada abordagem.
+# As OS sintéticas são removidas ao final.
+#
+# Uso:
+#   python -m bench.dashboard_agregacao --registros 1000000 --repeticoes 3
+
+import argparse
+import time
+import tracemalloc
+from datetime import date, timedelta
+
+import pandas as pd
+import pytz
+from sqlalchemy import text
+
+from bench import criar_engine, popular_os, limpar_os
+from dashboard_dados import carregar_indicadores_gerais, carregar_agregados_periodo
+
+MARCADOR = "bench-dashboard"
+
+
+def _legado(engine, data_inicio, data_fim):
+    """Caminho antigo do dashboard.render, reduzido aos cálculos."""
+    fuso_sp = pytz.timezone('America/Sao_Paulo')
+    df_base = pd.read_sql(
+        text("SELECT status, tecnico, data, secretaria, categoria, data_finalizada FROM ordens_servico"),
+        engine,
+    )
+    df_base['data'] = pd.to_datetime(df_base['data'], errors='coerce')
+    df_base['data_finalizada'] = (
+        pd.to_datetime(df_base['data_finalizada'], utc=True, errors='coerce')
+        .dt.tz_convert(fuso_sp).dt.tz_localize(None)
+    )
+
+    fin = df_base[pd.notna(df_base['data_finalizada'])].copy()
+    fin['dias'] = (fin['data_finalizada'] - fin['data']).dt.total_seconds() / (3600 * 24)
+    fin = fin[fin['dias'] >= 0]
+
+    df_filtrado = df_base[
+        (df_base['data'] >= pd.to_datetime(data_inicio)) &
+        (df_base['data'] <= pd.to_datetime(data_fim) + pd.Timedelta(days=1))
+    ]
+    fin_filtrado = df_filtrado[pd.notna(df_filtrado['data_finalizada'])].copy()
+    fin_filtrado['dias'] = (
+        fin_filtrado['data_finalizada'] - fin_filtrado['data']
+    ).dt.total_seconds() / (3600 * 24)
+    fin_filtrado = fin_filtrado[fin_filtrado['dias'] >= 0]
+
+    return {
+        "total": len(df_base),
+        "abertas": int((df_base['status'] == 'EM ABERTO').sum()),
+        "tma_dias": fin['dias'].mean(),
+        "total_periodo": len(df_filtrado),
+        "por_tecnico": df_filtrado['tecnico'].value_counts().to_dict(),
+        "tma_por_tecnico": fin_filtrado.groupby('tecnico')['dias'].mean().to_dict(),
+        "por_secretaria": df_filtrado['secretaria'].value_counts().to_dict(),
+    }
+
+
+def _novo(engine, data_inicio, data_fim):
+    indicadores = carregar_indicadores_gerais(engine)
+    agregados = carregar_agregados_periodo(engine, data_inicio, data_fim)
+    return {
+        "total": indicadores["total"],
+        "abertas": indicadores["abertas"],
+        "tma_dias": indicadores["tma_dias"],
+        "total_periodo": agregados["total"],
+        "por_tecnico": dict(zip(agregados["por_tecnico"]["tecnico"], agregados["por_tecnico"]["qtd"])),
+        "tma_por_tecnico": agregados["tma_por_tecnico"].to_dict(),
+        "por_secretaria": dict(zip(agregados["por_secretaria"]["secretaria"], agregados["por_secretaria"]["qtd"])),
+    }
+
+
+def _medir(funcao, repeticoes, *args):
+    tempos = []
+    pico = 0
+    resultado = None
+    for _ in range(repeticoes):
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        resultado = funcao(*args)
+        tempos.append(time.perf_counter() - inicio)
+        pico = max(pico, tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+    return resultado, min(tempos), pico
+
+
+def _iguais(a, b):
+    """Compara os resultados, tolerando diferenças de arredondamento no TMA."""
+    for chave in ("total", "abertas", "total_periodo", "por_tecnico", "por_secretaria"):
+        if a[chave] != b[chave]:
+            return False, chave
+    if abs((a["tma_dias"] or 0) - (b["tma_dias"] or 0)) > 1e-6:
+        return False, "tma_dias"
+    for tecnico, valor in a["tma_por_tecnico"].items():
+        if abs(valor - b["tma_por_tecnico"].get(tecnico, float("nan"))) > 1e-6:
+            return False, "tma_por_tecnico"
+    if set(a["tma_por_tecnico"]) != set(b["tma_por_tecnico"]):
+        return False, "tma_por_tecnico"
+    return True, None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da agregação do dashboard")
+    parser.add_argument("--registros", type=int, default=1000000)
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--dias", type=int, default=365, help="Tamanho do período filtrado")
+    args = parser.parse_args()
+
+    engine = criar_engine(pool_size=2, max_overflow=0)
+    data_fim = date.today()
+    data_inicio = data_fim - timedelta(days=args.dias)
+
+    print("=" * 90)
+    print(f"DASHBOARD - {args.registros} OS sintéticas, período de {args.dias} dias")
+    print("=" * 90)
+
+    try:
+        with engine.connect() as con:
+            with con.begin():
+                limpar_os(con, MARCADOR)
+                popular_os(con, args.registros, MARCADOR)
+            con.execute(text("ANALYZE ordens_servico"))
+            con.commit()
+
+        res_legado, t_legado, mem_legado = _medir(_legado, args.repeticoes, engine, data_inicio, data_fim)
+        res_novo, t_novo, mem_novo = _medir(_novo, args.repeticoes, engine, data_inicio, data_fim)
+
+        print(f"pandas (legado)  tempo={t_legado:7.3f}s  pico de memória={mem_legado / 1024 / 1024:8.1f} MiB")
+        print(f"SQL (agregados)  tempo={t_novo:7.3f}s  pico de memória={mem_novo / 1024 / 1024:8.1f} MiB")
+        print(f"ganho: {t_legado / t_novo:.1f}x mais rápido")
+
+        ok, divergencia = _iguais(res_legado, res_novo)
+        if ok:
+            print("✅ Os dois caminhos produzem os mesmos números.")
+        else:
+            print(f"❌ Divergência entre os caminhos em: {divergencia}")
+    finally:
+        with engine.connect() as con:
+            with con.begin():
+                limpar_os(con, MARCADOR)
+        engine.dispose()
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
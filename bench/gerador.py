@@ -0,0 +1,395 @@
+# Gerador de dados sintéticos para testes de carga.
+#
+# Produz OS, laudos, equipamentos, recargas e usuários com distribuições
+# próximas às de produção e grava tudo por COPY. Com a mesma semente, a mesma
+# data de referência e os mesmos volumes o resultado é idêntico em qualquer dia,
+# o que permite comparar execuções de bench.cenarios antes e depois de uma mudança.
+#
+#   - OS numeradas em ordem cronológica por tipo e ano ("SIN123-24"), abertas em
+#     horário de expediente e quase nunca no fim de semana; secretarias,
+#     categorias e equipamentos seguem uma cauda longa (poucas concentram a
+#     maioria das OS). O status depende da idade: OS recentes ainda estão
+#     abertas, as antigas quase todas foram entregues.
+#   - Laudos de uma amostra das OS, pendentes quando a OS é recente.
+#   - Equipamentos com IP/MAC únicos (nulos para os que não ficam em rede).
+#   - Recargas com o fluxo EM ABERTO -> AGUARDANDO INSUMO -> RECARGA FEITA.
+#   - Um usuário por técnico de config.TECNICOS (display_name igual ao nome,
+#     para Minhas Tarefas e Dar Baixa), além de admin, administrativo e
+#     técnico de recarga, todos com a mesma senha.
+#
+# Tudo leva o prefixo SIN (números, hostnames, usuários) e é removido com --limpar.
+#
+# Uso:
+#   python -m bench.gerador --os 1000000 --laudos 20000 --equipamentos 50000 --recargas 5000
+#   python -m bench.gerador --limpar
+
+import argparse
+import csv
+import io
+import math
+import random
+import time
+import unicodedata
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from bench import criar_engine
+from config import TECNICOS, SECRETARIAS, CATEGORIAS, EQUIPAMENTOS, CATEGORIAS_EQUIP
+
+PREFIXO = "SIN"
+MARCADOR = "bench-gerador"
+SENHA = "sintetico123"
+# "Hoje" dos dados gerados: idades, status e datas partem daqui, não do relógio
+DATA_REFERENCIA = "2025-06-30"
+TAMANHO_BLOCO = 50000
+
+NOMES = [
+    "ANA", "ANTÔNIO", "CARLOS", "CLÁUDIA", "FRANCISCO", "JOÃO", "JOSÉ", "LUCAS",
+    "LUÍZA", "MARCOS", "MARIA", "PAULO", "PEDRO", "RAIMUNDA", "SANDRA", "TERESA",
+]
+SOBRENOMES = [
+    "ALVES", "ARAÚJO", "BARBOSA", "CARVALHO", "COSTA", "FERREIRA", "GOMES", "LIMA",
+    "MARTINS", "OLIVEIRA", "PEREIRA", "RIBEIRO", "RODRIGUES", "SANTOS", "SILVA", "SOUSA",
+]
+SETORES = [
+    "ALMOXARIFADO", "ARQUIVO", "COMPRAS", "CONTABILIDADE", "DIRETORIA", "GABINETE",
+    "JURÍDICO", "PROTOCOLO", "RECEPÇÃO", "RECURSOS HUMANOS", "TESOURARIA", "TRIBUTOS",
+]
+PROBLEMAS = [
+    "NÃO LIGA", "LENTO", "SEM ACESSO À REDE", "TRAVANDO", "TELA AZUL", "SEM IMPRESSÃO",
+    "ATOLANDO PAPEL", "SEM SINAL", "SENHA BLOQUEADA", "INSTALAR PROGRAMA",
+]
+SERVICOS = [
+    "LIMPEZA E TROCA DE PASTA TÉRMICA", "FORMATAÇÃO E REINSTALAÇÃO DO SISTEMA",
+    "SUBSTITUIÇÃO DE CABO DE REDE", "TROCA DA FONTE", "CONFIGURAÇÃO DA IMPRESSORA",
+    "DESBLOQUEIO DE USUÁRIO", "TROCA DO SSD", "INSTALAÇÃO DE PROGRAMA",
+]
+INSUMOS = [
+    "TONER HP 85A", "TONER HP 12A", "TONER BROTHER TN-1060", "TONER SAMSUNG D111",
+    "CARTUCHO HP 664 PRETO", "CARTUCHO HP 664 COLORIDO", "CILINDRO BROTHER DR-1060",
+]
+ESTADOS_CONSERVACAO = ["Funcionando", "Com Defeito", "Danificado", "Para Reciclagem"]
+COMPLETUDE = ["Sim", "Não", "Parcialmente"]
+
+# Peso de cada hora de abertura (expediente com queda no almoço)
+PESOS_HORA = {7: 1, 8: 4, 9: 6, 10: 6, 11: 5, 12: 2, 13: 3, 14: 5, 15: 5, 16: 4, 17: 2}
+
+# Distribuição de status por idade da OS em dias: (idade máxima, pesos na ordem de STATUS_OS)
+STATUS_OS = ["EM ABERTO", "AGUARDANDO PEÇA(S)", "FINALIZADO", "AGUARDANDO RETIRADA", "ENTREGUE AO CLIENTE"]
+STATUS_POR_IDADE = [
+    (7, [55, 10, 15, 10, 10]),
+    (60, [10, 8, 12, 15, 55]),
+    (None, [1, 1, 3, 5, 90]),
+]
+STATUS_ENCERRADOS = ("FINALIZADO", "AGUARDANDO RETIRADA", "ENTREGUE AO CLIENTE")
+
+# Categorias de equipamento que não recebem IP/MAC
+SEM_REDE = {"MONITOR", "NOBREAK", "ESTABILIZADOR", "PERIFÉRICO", "SCANNER", "OUTRO"}
+
+COLUNAS_OS = [
+    "tipo", "numero", "secretaria", "setor", "data", "hora", "solicitante", "telefone",
+    "solicitacao_cliente", "categoria", "patrimonio", "equipamento", "servico_executado",
+    "status", "data_finalizada", "data_retirada", "retirada_por", "tecnico", "registrado_por",
+]
+COLUNAS_LAUDOS = [
+    "tipo_os", "numero_os", "estado_conservacao", "diagnostico", "equipamento_completo",
+    "observacoes", "tecnico", "status", "data_registro", "data_atendimento",
+]
+COLUNAS_EQUIPAMENTOS = [
+    "categoria", "patrimonio", "hostname", "especificacao", "secretaria", "setor",
+    "localizacao_fisica", "ip", "mac", "subrede", "gateway", "dns", "numero_serie",
+    "observacoes", "data_registro",
+]
+COLUNAS_RECARGAS = [
+    "numero_recarga", "data_abertura", "hora_abertura", "secretaria", "localizacao",
+    "insumo", "status", "responsavel", "data_atualizacao", "created_at",
+]
+
+SQL_USUARIO = text("""
+    INSERT INTO usuarios (username, password_hash, role, display_name)
+    VALUES (:username, :password_hash, :role, :display_name)
+    ON CONFLICT (username) DO UPDATE
+    SET password_hash = EXCLUDED.password_hash,
+        role = EXCLUDED.role,
+        display_name = EXCLUDED.display_name
+""")
+
+
+def nome_usuario(nome):
+    """Login gerado para um nome: 'DIEL BATISTA' -> 'sin.diel.batista'."""
+    sem_acento = unicodedata.normalize("NFKD", nome).encode("ascii", "ignore").decode()
+    return f"{PREFIXO.lower()}." + ".".join(sem_acento.lower().split())
+
+
+def usuarios_sinteticos():
+    """(username, role, display_name) de todos os usuários gerados."""
+    usuarios = [(nome_usuario("admin"), "admin", "ADMIN SINTÉTICO")]
+    usuarios += [(nome_usuario(f"administrativo {i}"), "administrativo", f"ADMINISTRATIVO {i}") for i in (1, 2)]
+    usuarios += [(nome_usuario(t), "tecnico", t) for t in TECNICOS]
+    usuarios += [(nome_usuario(f"recarga {i}"), "tecnico_recarga", f"TÉCNICO DE RECARGA {i}") for i in (1, 2)]
+    return usuarios
+
+
+def _pesos_cauda_longa(rng, valores):
+    """Pesos 1/k sobre uma ordem embaralhada pela semente (poucos valores dominam)."""
+    ordem = list(valores)
+    rng.shuffle(ordem)
+    return ordem, [1 / k for k in range(1, len(ordem) + 1)]
+
+
+class _Escolha:
+    """rng.choices com os pesos acumulados calculados uma única vez."""
+
+    def __init__(self, rng, valores, pesos):
+        self.rng = rng
+        self.valores = list(valores)
+        acumulado = 0
+        self.acumulados = []
+        for peso in pesos:
+            acumulado += peso
+            self.acumulados.append(acumulado)
+
+    def __call__(self):
+        return self.rng.choices(self.valores, cum_weights=self.acumulados)[0]
+
+
+def _pessoa(rng):
+    return f"{rng.choice(NOMES)} {rng.choice(SOBRENOMES)}"
+
+
+def _telefone(rng):
+    return f"(98) 9{rng.randint(8000, 9999)}-{rng.randint(0, 9999):04d}"
+
+
+def _dia_util(rng, hoje, anos):
+    """Dias atrás (0 = hoje) de uma data de abertura; fins de semana são raros."""
+    while True:
+        dias = int(rng.random() ** 1.3 * anos * 365)  # mais OS nos anos recentes
+        if (hoje - timedelta(days=dias)).weekday() < 5 or rng.random() < 0.05:
+            return dias
+
+
+def _copiar(con, tabela, colunas, linhas):
+    """Grava as linhas por COPY em blocos de TAMANHO_BLOCO; devolve a quantidade."""
+    sql = f"COPY {tabela} ({', '.join(colunas)}) FROM STDIN WITH (FORMAT csv)"
+    total = 0
+    cursor = con.connection.cursor()
+    try:
+        buffer = io.StringIO()
+        escritor = csv.writer(buffer)
+        for linha in linhas:
+            escritor.writerow(linha)
+            total += 1
+            if total % TAMANHO_BLOCO == 0:
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+                buffer = io.StringIO()
+                escritor = csv.writer(buffer)
+        if buffer.tell():
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+    finally:
+        cursor.close()
+    return total
+
+
+def gerar_os(rng, registros, anos, hoje, laudos, amostra):
+    """
+    Gera as linhas de OS em ordem cronológica. A lista `amostra` é preenchida,
+    por amostragem de reservatório, com as `laudos` OS que receberão laudo.
+    """
+    secretarias = _Escolha(rng, *_pesos_cauda_longa(rng, SECRETARIAS))
+    categorias = _Escolha(rng, *_pesos_cauda_longa(rng, CATEGORIAS))
+    equipamentos = _Escolha(rng, *_pesos_cauda_longa(rng, EQUIPAMENTOS))
+    tecnicos = _Escolha(rng, TECNICOS, [rng.uniform(0.5, 1.5) for _ in TECNICOS])
+    horas = _Escolha(rng, PESOS_HORA, PESOS_HORA.values())
+    status_por_idade = [(limite, _Escolha(rng, STATUS_OS, pesos)) for limite, pesos in STATUS_POR_IDADE]
+
+    idades = sorted((_dia_util(rng, hoje, anos) for _ in range(registros)), reverse=True)
+    sequencias = {}
+    agora = datetime.combine(hoje, datetime.max.time()).replace(microsecond=0)
+    for g, idade in enumerate(idades):
+        tipo = "Interna" if rng.random() < 0.6 else "Externa"
+        data = hoje - timedelta(days=idade)
+        aberta_em = datetime.combine(data, datetime.min.time()).replace(hour=horas(), minute=rng.randrange(60))
+        seq = sequencias[(tipo, data.year)] = sequencias.get((tipo, data.year), 0) + 1
+        numero = f"{PREFIXO}{seq}-{data.year % 100:02d}"
+        status = next(escolha for limite, escolha in status_por_idade if limite is None or idade <= limite)()
+        tecnico = tecnicos()
+        equipamento = equipamentos()
+
+        finalizada = retirada = retirada_por = servico = None
+        if status in STATUS_ENCERRADOS:
+            # Mediana de 2 dias até a finalização, com cauda longa
+            finalizada = min(aberta_em + timedelta(days=rng.lognormvariate(math.log(2), 1.0)), agora)
+            servico = rng.choice(SERVICOS)
+            if status == "ENTREGUE AO CLIENTE":
+                retirada = min(finalizada + timedelta(days=rng.expovariate(1 / 3)), agora)
+                retirada_por = _pessoa(rng)
+
+        yield (
+            tipo, numero, secretarias(), rng.choice(SETORES), data, aberta_em.time(), _pessoa(rng),
+            _telefone(rng), f"{equipamento} {rng.choice(PROBLEMAS)}", categorias(),
+            str(rng.randint(10000, 99999)) if rng.random() < 0.6 else None, equipamento, servico,
+            status, finalizada, retirada, retirada_por, tecnico, MARCADOR,
+        )
+
+        # Amostragem de reservatório: cada OS tem a mesma chance de receber laudo
+        if laudos:
+            item = (tipo, numero, tecnico, aberta_em, idade)
+            if g < laudos:
+                amostra.append(item)
+            else:
+                j = rng.randrange(g + 1)
+                if j < laudos:
+                    amostra[j] = item
+
+
+def gerar_laudos(rng, amostra):
+    """Um laudo por OS da amostra; o das OS recentes ainda aguarda avaliação."""
+    for tipo, numero, tecnico, aberta_em, idade in amostra:
+        registro = aberta_em + timedelta(hours=rng.uniform(2, 72))
+        if idade <= 30 and rng.random() < 0.7:
+            status, atendimento = "PENDENTE", None
+        else:
+            status = "APROVADO" if rng.random() < 0.7 else "NEGADO"
+            atendimento = registro + timedelta(days=rng.expovariate(1 / 5))
+        yield (
+            tipo, numero, rng.choice(ESTADOS_CONSERVACAO), f"{rng.choice(PROBLEMAS)}. {rng.choice(SERVICOS)}",
+            rng.choice(COMPLETUDE), None, tecnico, status, registro, atendimento,
+        )
+
+
+def gerar_equipamentos(rng, registros, hoje):
+    secretarias = _Escolha(rng, *_pesos_cauda_longa(rng, SECRETARIAS))
+    categorias = _Escolha(rng, *_pesos_cauda_longa(rng, CATEGORIAS_EQUIP))
+    for i in range(1, registros + 1):
+        categoria = categorias()
+        secretaria = secretarias()
+        em_rede = categoria not in SEM_REDE
+        # IP e MAC derivados do contador: únicos sem precisar de consulta
+        # (sub-redes /24 com 250 hosts, do .2 ao .251; o .1 é o gateway)
+        rede = f"10.{(i // 250 >> 8) & 255}.{i // 250 & 255}"
+        ip = f"{rede}.{i % 250 + 2}" if em_rede else None
+        mac = f"02:53:49:{(i >> 16) & 255:02X}:{(i >> 8) & 255:02X}:{i & 255:02X}" if em_rede else None
+        sigla = "".join(p[0] for p in secretaria.split())[:4]
+        yield (
+            categoria, str(rng.randint(10000, 99999)) if rng.random() < 0.8 else None,
+            f"{PREFIXO}-{sigla}-{i:06d}", f"{categoria} {rng.choice(['BÁSICO', 'INTERMEDIÁRIO', 'AVANÇADO'])}",
+            secretaria, rng.choice(SETORES), f"SALA {rng.randint(1, 40)}", ip, mac,
+            "255.255.255.0" if em_rede else None,
+            f"{rede}.1" if em_rede else None,
+            "8.8.8.8" if em_rede else None,
+            f"{PREFIXO}{rng.getrandbits(40):010X}", MARCADOR,
+            datetime.combine(hoje - timedelta(days=rng.randrange(365 * 5)), datetime.min.time()),
+        )
+
+
+def gerar_recargas(rng, registros, anos, hoje):
+    secretarias = _Escolha(rng, *_pesos_cauda_longa(rng, SECRETARIAS))
+    insumos = _Escolha(rng, *_pesos_cauda_longa(rng, INSUMOS))
+    responsaveis = [d for _, role, d in usuarios_sinteticos() if role == "tecnico_recarga"]
+    idades = sorted((_dia_util(rng, hoje, anos) for _ in range(registros)), reverse=True)
+    sequencias = {}
+    for idade in idades:
+        data = hoje - timedelta(days=idade)
+        seq = sequencias[data.year] = sequencias.get(data.year, 0) + 1
+        aberta_em = datetime.combine(data, datetime.min.time()).replace(hour=rng.randint(7, 17), minute=rng.randrange(60))
+        if idade > 30 or rng.random() < 0.5:
+            status = "RECARGA FEITA"
+        else:
+            status = "AGUARDANDO INSUMO" if rng.random() < 0.4 else "EM ABERTO"
+        atualizada = aberta_em if status == "EM ABERTO" else aberta_em + timedelta(days=rng.expovariate(1 / 4))
+        yield (
+            f"{PREFIXO}{data.year}-{seq:06d}", data, aberta_em.time(), secretarias(), rng.choice(SETORES),
+            insumos(), status, None if status == "EM ABERTO" else rng.choice(responsaveis),
+            atualizada, aberta_em,
+        )
+
+
+def gravar_usuarios(con, senha):
+    # Um único hash para todos (bcrypt é caro de propósito)
+    from auth import hash_password
+    password_hash = hash_password(senha)
+    for username, role, display_name in usuarios_sinteticos():
+        con.execute(SQL_USUARIO, {
+            "username": username, "password_hash": password_hash, "role": role, "display_name": display_name,
+        })
+    return len(usuarios_sinteticos())
+
+
+def limpar(con):
+    """Remove tudo o que foi gerado (pelo prefixo e pelo marcador)."""
+    padrao = f"{PREFIXO}%"
+    con.execute(text("DELETE FROM laudos WHERE numero_os LIKE :padrao"), {"padrao": padrao})
+    con.execute(text("DELETE FROM ordens_servico WHERE registrado_por = :marcador"), {"marcador": MARCADOR})
+    con.execute(text("DELETE FROM equipamentos WHERE observacoes = :marcador"), {"marcador": MARCADOR})
+    con.execute(text("DELETE FROM recargas WHERE numero_recarga LIKE :padrao"), {"padrao": padrao})
+    con.execute(text("DELETE FROM usuarios WHERE username LIKE :padrao"), {"padrao": f"{PREFIXO.lower()}.%"})
+
+
+def _etapa(descricao, funcao):
+    inicio = time.perf_counter()
+    quantidade = funcao()
+    tempo = time.perf_counter() - inicio
+    print(f"{descricao:<14} {quantidade:>10} linhas  {tempo:8.1f}s  ({quantidade / max(tempo, 1e-9):,.0f} linhas/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera dados sintéticos para testes de carga")
+    parser.add_argument("--os", type=int, default=100000)
+    parser.add_argument("--laudos", type=int, default=20000)
+    parser.add_argument("--equipamentos", type=int, default=50000)
+    parser.add_argument("--recargas", type=int, default=5000)
+    parser.add_argument("--anos", type=int, default=5, help="Período coberto pelas OS e recargas")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--data-referencia", default=DATA_REFERENCIA, type=date.fromisoformat,
+                        help="Data (AAAA-MM-DD) tratada como hoje pelos dados gerados")
+    parser.add_argument("--senha", default=SENHA, help="Senha de todos os usuários gerados")
+    parser.add_argument("--limpar", action="store_true", help="Só remove os dados gerados anteriormente")
+    args = parser.parse_args()
+
+    engine = criar_engine(pool_size=1, max_overflow=0)
+    hoje = args.data_referencia
+    rng = random.Random(args.semente)
+
+    print("=" * 90)
+    if args.limpar:
+        print("REMOVENDO DADOS SINTÉTICOS")
+    else:
+        print(f"DADOS SINTÉTICOS - semente {args.semente}, referência {hoje:%d/%m/%Y}: {args.os} OS, {min(args.laudos, args.os)} laudos, "
+              f"{args.equipamentos} equipamentos, {args.recargas} recargas")
+    print("=" * 90)
+
+    try:
+        with engine.connect() as con:
+            with con.begin():
+                limpar(con)
+                if not args.limpar:
+                    amostra = []
+                    _etapa("usuários", lambda: gravar_usuarios(con, args.senha))
+                    _etapa("OS", lambda: _copiar(
+                        con, "ordens_servico", COLUNAS_OS,
+                        gerar_os(rng, args.os, args.anos, hoje, args.laudos, amostra)))
+                    _etapa("laudos", lambda: _copiar(con, "laudos", COLUNAS_LAUDOS, gerar_laudos(rng, amostra)))
+                    _etapa("equipamentos", lambda: _copiar(
+                        con, "equipamentos", COLUNAS_EQUIPAMENTOS, gerar_equipamentos(rng, args.equipamentos, hoje)))
+                    _etapa("recargas", lambda: _copiar(
+                        con, "recargas", COLUNAS_RECARGAS, gerar_recargas(rng, args.recargas, args.anos, hoje)))
+            if not args.limpar:
+                # Estatísticas atualizadas antes de medir qualquer coisa
+                con.execute(text("ANALYZE ordens_servico, laudos, equipamentos, recargas, usuarios"))
+                con.commit()
+    finally:
+        engine.dispose()
+
+    if args.limpar:
+        print("✅ Dados sintéticos removidos.")
+    else:
+        print(f"✅ Dados gravados. Usuários: {nome_usuario('admin')}, {nome_usuario(TECNICOS[0])}, ... "
+              f"(senha '{args.senha}')")
+
+
+if __name__ == "__main__":
+    main()
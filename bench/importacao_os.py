@@ -0,0 +1,151 @@
+# Benchmark da importação de OS legadas.
+#
+# Gera uma planilha CSV no formato legado (duas linhas de título e o cabeçalho)
+# com N OS, das quais uma fração já existe no banco, e compara o caminho antigo
+# (set com todos os números + isin + to_sql) com import_export.importar_os
+# (COPY para tabela temporária + INSERT ... ON CONFLICT DO NOTHING).
+# Os dois caminhos precisam gravar as mesmas OS; tudo é removido ao final.
+#
+# Uso:
+#   python -m bench.importacao_os --registros 200000 --existentes 0.2
+
+import argparse
+import io
+import time
+import tracemalloc
+
+import pandas as pd
+from sqlalchemy import text
+
+import database
+from bench import criar_engine
+from import_export import importar_os, _RENAME_OS, _KEEP_COLS_OS, _strip_all, _to_date_str, _to_time_str
+
+MARCADOR = "bench-importacao"
+PREFIXO = "BENCHIMP-"
+
+
+def _gerar_planilha(registros):
+    linhas = [
+        "CONTROLE DE ORDENS DE SERVIÇO;;;;;;;;;;",
+        "Planilha gerada pelo benchmark;;;;;;;;;;",
+        "OS;SECRETARIA;SETOR;DATA;HORA;SOLICITANTE;TELEFONE;TÉCNICO;EQUIPAMENTO;DESCRIÇÃO;STATUS",
+    ]
+    for g in range(1, registros + 1):
+        linhas.append(
+            f"{PREFIXO}{g};OUTROS;BENCH;{2015 + g % 10}-{1 + g % 12:02d}-{1 + g % 28:02d};"
+            f"{7 + g % 10:02d}:{g % 60:02d}:00;bench;0;BENCH;COMPUTADOR;carga sintética {g};ENTREGUE AO CLIENTE"
+        )
+    return "\n".join(linhas).encode("utf-8")
+
+
+def _popular_existentes(engine, existentes):
+    with engine.connect() as con:
+        with con.begin():
+            _limpar_con(con)
+            con.execute(text("""
+                INSERT INTO ordens_servico (tipo, numero, secretaria, data, solicitante, status, registrado_por)
+                SELECT 'Interna', :prefixo || g, 'OUTROS', CURRENT_DATE, 'bench', 'ENTREGUE AO CLIENTE', :marcador
+                FROM generate_series(1, :n) g
+            """), {"n": existentes, "prefixo": PREFIXO, "marcador": MARCADOR})
+
+
+def _remover_importadas(engine):
+    with engine.connect() as con:
+        with con.begin():
+            con.execute(text("""
+                DELETE FROM ordens_servico
+                WHERE numero LIKE :padrao AND registrado_por IS NULL
+            """), {"padrao": f"{PREFIXO}%"})
+
+
+def _limpar_con(con):
+    con.execute(text("DELETE FROM ordens_servico WHERE numero LIKE :padrao"), {"padrao": f"{PREFIXO}%"})
+
+
+def _legado(engine, conteudo):
+    """Caminho antigo: leitura inteira, set de todos os números e to_sql."""
+    raw = pd.read_csv(io.BytesIO(conteudo), sep=None, engine="python")
+    raw.columns = raw.iloc[1]
+    df = _strip_all(raw.iloc[2:].reset_index(drop=True))
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    df = df.rename(columns=_RENAME_OS)
+    for col in _KEEP_COLS_OS:
+        if col not in df.columns:
+            df[col] = None
+    df = df[_KEEP_COLS_OS]
+    df["data"] = _to_date_str(df["data"])
+    df["hora"] = _to_time_str(df["hora"])
+
+    existing = pd.read_sql("SELECT numero FROM os_interna WHERE numero IS NOT NULL", engine)
+    existing_set = set(existing["numero"].dropna().astype(str))
+    df["numero"] = df["numero"].astype("string")
+    df = df.loc[~df["numero"].isin(existing_set) | df["numero"].isna()]
+    df = df.dropna(how="all", subset=["numero"])
+    df["tipo"] = "Interna"
+    df.to_sql("ordens_servico", engine, if_exists="append", index=False)
+    return len(df)
+
+
+def _novo(engine, conteudo):
+    inseridas, _ = importar_os(io.BytesIO(conteudo), "Interna")
+    return inseridas
+
+
+def _medir(funcao, engine, conteudo):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    resultado = funcao(engine, conteudo)
+    tempo = time.perf_counter() - inicio
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    _remover_importadas(engine)
+    return resultado, tempo, pico
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da importação de OS legadas")
+    parser.add_argument("--registros", type=int, default=200000)
+    parser.add_argument("--existentes", type=float, default=0.2, help="Fração de números já cadastrados")
+    args = parser.parse_args()
+
+    engine = criar_engine(pool_size=2, max_overflow=0)
+    # importar_os usa o engine da aplicação
+    database._engine = engine
+    existentes = int(args.registros * args.existentes)
+    conteudo = _gerar_planilha(args.registros)
+
+    print("=" * 90)
+    print(f"IMPORTAÇÃO DE OS - {args.registros} linhas, {existentes} já cadastradas "
+          f"({len(conteudo) / 1024 / 1024:.1f} MiB de CSV)")
+    print("=" * 90)
+
+    ok = False
+    try:
+        _popular_existentes(engine, existentes)
+        res_legado, t_legado, mem_legado = _medir(_legado, engine, conteudo)
+        res_novo, t_novo, mem_novo = _medir(_novo, engine, conteudo)
+
+        print(f"set + to_sql (legado)   inseridas={res_legado:<8} tempo={t_legado:7.2f}s  "
+              f"pico de memória={mem_legado / 1024 / 1024:8.1f} MiB")
+        print(f"COPY + ON CONFLICT      inseridas={res_novo:<8} tempo={t_novo:7.2f}s  "
+              f"pico de memória={mem_novo / 1024 / 1024:8.1f} MiB")
+        print(f"ganho: {t_legado / t_novo:.1f}x mais rápido")
+
+        ok = res_legado == res_novo == args.registros - existentes
+        if ok:
+            print("✅ Os dois caminhos gravam as mesmas OS.")
+        else:
+            print(f"❌ Esperadas {args.registros - existentes} inserções.")
+    finally:
+        with engine.connect() as con:
+            with con.begin():
+                _limpar_con(con)
+        engine.dispose()
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
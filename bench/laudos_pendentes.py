@@ -0,0 +1,119 @@
+# Benchmark da aba "Pendentes de Laudo" (Minhas Tarefas).
+#
+# Compara a verificação antiga (1 consulta das OS + 1 consulta de laudos por OS,
+# cada uma em sua própria conexão) com o NOT EXISTS único de consultas.py,
+# variando a quantidade de OS aguardando peça(s) do técnico. Metade das OS
+# recebe laudo; os dois caminhos precisam devolver as mesmas OS.
+#
+# Uso:
+#   python -m bench.laudos_pendentes --pendentes 10,40,160 --repeticoes 5
+
+import argparse
+import time
+
+from sqlalchemy import text
+
+from bench import criar_engine
+from consultas import SQL_PENDENTES_LAUDO_TECNICO
+
+TECNICO = "BENCH LAUDOS"
+MARCADOR = "bench-laudos"
+
+
+def _popular(engine, pendentes):
+    with engine.connect() as con:
+        with con.begin():
+            _limpar_con(con)
+            con.execute(text("""
+                INSERT INTO ordens_servico (tipo, numero, secretaria, data, hora, solicitante, equipamento,
+                                            status, tecnico, registrado_por)
+                SELECT CASE WHEN g % 2 = 0 THEN 'Interna' ELSE 'Externa' END,
+                       :marcador || '-' || g, 'OUTROS', CURRENT_DATE - g, CURRENT_TIME, 'bench', 'COMPUTADOR',
+                       'AGUARDANDO PEÇA(S)', :tecnico, :marcador
+                FROM generate_series(1, :n) g
+            """), {"n": pendentes, "tecnico": TECNICO, "marcador": MARCADOR})
+            con.execute(text("""
+                INSERT INTO laudos (tipo_os, numero_os, diagnostico, tecnico)
+                SELECT tipo, numero, 'bench', :tecnico
+                FROM ordens_servico
+                WHERE registrado_por = :marcador AND split_part(numero, '-', 3)::int % 4 < 2
+            """), {"tecnico": TECNICO, "marcador": MARCADOR})
+
+
+def _limpar_con(con):
+    con.execute(text("DELETE FROM laudos WHERE tecnico = :tecnico"), {"tecnico": TECNICO})
+    con.execute(text("DELETE FROM ordens_servico WHERE registrado_por = :marcador"), {"marcador": MARCADOR})
+
+
+def _legado(engine):
+    """Caminho antigo: N+1 consultas, uma conexão por verificação de laudo."""
+    with engine.connect() as con:
+        linhas = con.execute(text("""
+            SELECT id, numero, tipo, secretaria, equipamento, status, data
+            FROM ordens_servico WHERE tecnico = :tecnico AND status = 'AGUARDANDO PEÇA(S)'
+            ORDER BY data DESC
+        """), {"tecnico": TECNICO}).fetchall()
+
+    sem_laudo = []
+    for linha in linhas:
+        with engine.connect() as con:
+            total = con.execute(text("""
+                SELECT COUNT(*) FROM laudos
+                WHERE numero_os = :numero AND (tipo_os = :tipo OR tipo_os = :tipo_simples)
+            """), {"numero": linha.numero, "tipo": f"OS {linha.tipo}", "tipo_simples": linha.tipo}).scalar()
+        if total == 0:
+            sem_laudo.append((linha.tipo, linha.id))
+    return sem_laudo
+
+
+def _novo(engine):
+    with engine.connect() as con:
+        return [(r.tipo, r.id) for r in con.execute(SQL_PENDENTES_LAUDO_TECNICO, {"tecnico": TECNICO})]
+
+
+def _medir(funcao, engine, repeticoes):
+    tempos = []
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao(engine)
+        tempos.append(time.perf_counter() - inicio)
+    return resultado, min(tempos)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark da verificação de OS pendentes de laudo")
+    parser.add_argument("--pendentes", default="10,40,160", help="Quantidades de OS aguardando peça(s)")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    engine = criar_engine(pool_size=5, max_overflow=0)
+    print("=" * 90)
+    print("PENDENTES DE LAUDO - N+1 consultas x NOT EXISTS")
+    print("=" * 90)
+
+    tudo_ok = True
+    try:
+        for pendentes in [int(n) for n in args.pendentes.split(",")]:
+            _popular(engine, pendentes)
+            res_legado, t_legado = _medir(_legado, engine, args.repeticoes)
+            res_novo, t_novo = _medir(_novo, engine, args.repeticoes)
+            ok = sorted(res_legado) == sorted(res_novo)
+            tudo_ok &= ok
+            print(
+                f"pendentes={pendentes:<5} sem laudo={len(res_novo):<5} "
+                f"N+1={t_legado * 1000:8.1f} ms  NOT EXISTS={t_novo * 1000:7.1f} ms  "
+                f"({t_legado / t_novo:5.1f}x)  {'✅' if ok else '❌'}"
+            )
+    finally:
+        with engine.connect() as con:
+            with con.begin():
+                _limpar_con(con)
+        engine.dispose()
+
+    if not tudo_ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
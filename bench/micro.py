@@ -0,0 +1,286 @@
+# Micro-benchmarks das funções puras que rodam sobre blocos inteiros ou por linha.
+#
+# Cada caso é medido com timeit (melhor de N repetições) sobre entradas
+# sintéticas de 1 mil, 100 mil e 1 milhão de linhas. Quando a função foi
+# vetorizada, a versão anterior (por linha) também é medida e as duas precisam
+# produzir o mesmo resultado. Os tempos podem ser gravados em JSON e comparados
+# com uma execução anterior na mesma máquina.
+#
+# Uso:
+#   python -m bench.micro --salvar bench_micro.json
+#   python -m bench.micro --comparar bench_micro.json
+#   python -m bench.micro --casos normalize_mac,to_time_str --tamanhos 1000000
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import tempfile
+import timeit
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from equipamentos import is_valid_ip, is_valid_mac, is_valid_cidr
+from exportacao import TAMANHO_LOTE, _escrever_csv, _escrever_xlsx
+from import_export import _normalize_mac, _to_date_str, _to_time_str, _strip_all
+from laudos import gerar_pdf_laudo
+
+TAMANHOS = [1000, 100000, 1000000]
+
+
+# --- Versões anteriores, para comparação ---
+
+def _normalize_mac_legado(series):
+    def normalizar(mac):
+        if pd.isna(mac) or not isinstance(mac, str) or mac.strip() == '':
+            return None
+        mac_normalized = str(mac).replace('-', ':').replace('.', ':').upper().strip()
+        if mac_normalized in ["00:00:00:00:00:00", "FF:FF:FF:FF:FF:FF"]:
+            return None
+        if re.match(r"^([0-9A-F]{2}[:-]){5}([0-9A-F]{2})$", mac_normalized):
+            return mac_normalized
+        return None
+    return series.apply(normalizar)
+
+
+def _to_date_str_legado(series):
+    s = pd.to_datetime(series, errors="coerce").dt.date.astype("string")
+    return s.where(~s.isna(), None)
+
+
+def _to_time_str_legado(series):
+    t = pd.to_datetime(series, errors="coerce").dt.time
+    return t.where(pd.notna(t)).map(lambda x: x.strftime("%H:%M:%S") if pd.notna(x) else None)
+
+
+def _strip_all_legado(df):
+    df = df.copy()
+    df = df.dropna(how="all")
+    for col in df.columns:
+        if pd.api.types.is_string_dtype(df[col]):
+            df[col] = df[col].astype("string").str.strip()
+    return df
+
+
+def _validar_legado(padrao):
+    def validar(valor):
+        if not valor:
+            return True
+        return re.match(padrao, valor)
+    return validar
+
+
+# --- Entradas sintéticas (mesma semente em toda execução) ---
+
+def _macs(rng, n):
+    formatos = [
+        lambda b: ":".join(b), lambda b: "-".join(b).lower(), lambda b: " " + ":".join(b) + " ",
+        lambda b: "".join(b[:2]) + "." + "".join(b[2:4]) + "." + "".join(b[4:]),
+    ]
+    valores = []
+    for _ in range(n):
+        r = rng.random()
+        if r < 0.05:
+            valores.append(None)
+        elif r < 0.08:
+            valores.append(rng.choice(["", "00:00:00:00:00:00", "ff-ff-ff-ff-ff-ff", "não tem", 12345]))
+        else:
+            valores.append(rng.choice(formatos)([f"{rng.randrange(256):02X}" for _ in range(6)]))
+    return pd.Series(valores, dtype=object)
+
+
+def _datas(rng, n):
+    inicio = datetime(2015, 1, 1)
+    return pd.Series([
+        None if rng.random() < 0.03 else (inicio + timedelta(days=rng.randrange(3650))).strftime("%Y-%m-%d")
+        for _ in range(n)
+    ], dtype=object)
+
+
+def _horas(rng, n):
+    return pd.Series([
+        None if rng.random() < 0.03 else f"{rng.randint(7, 17):02d}:{rng.randrange(60):02d}:{rng.randrange(60):02d}"
+        for _ in range(n)
+    ], dtype=object)
+
+
+def _planilha(rng, n):
+    colunas = ["secretaria", "setor", "solicitante", "equipamento", "descricao"]
+    return pd.DataFrame(
+        [[f"  valor {rng.randrange(1000)} " if rng.random() > 0.02 else None for _ in colunas] for _ in range(n)],
+        columns=colunas, dtype=object,
+    )
+
+
+def _enderecos(rng, n):
+    return [
+        rng.choice([
+            f"192.168.{rng.randrange(256)}.{rng.randrange(256)}",
+            f"10.{rng.randrange(256)}.0.0/{rng.randint(8, 30)}",
+            ":".join(f"{rng.randrange(256):02x}" for _ in range(6)),
+            "", "inválido",
+        ])
+        for _ in range(n)
+    ]
+
+
+def _lotes_exportacao(rng, n):
+    agora = datetime(2024, 6, 1, 14, 30)
+    linhas = [
+        [i, f"{i}-24", "EDUCAÇÃO", agora.date(), agora.time(), "ENTREGUE AO CLIENTE",
+         agora - timedelta(minutes=rng.randrange(100000)), f"descrição da OS {i}"]
+        for i in range(n)
+    ]
+    colunas = ["id", "numero", "secretaria", "data", "hora", "status", "data_finalizada", "descricao"]
+    return colunas, [linhas[i:i + TAMANHO_LOTE] for i in range(0, n, TAMANHO_LOTE)]
+
+
+LAUDO = {
+    "tipo_os": "Interna", "numero_os": "123-24", "estado_conservacao": "Com Defeito",
+    "diagnostico": "Fonte queimada; substituição recomendada. " * 5, "equipamento_completo": "Sim",
+    "observacoes": "Equipamento retirado pelo setor.", "tecnico": "DIEL BATISTA", "status": "APROVADO",
+    "data_registro": datetime(2024, 6, 1, 14, 30).astimezone(),
+}
+
+
+# --- Casos: nome -> (preparo(rng, n), função, versão anterior, maior tamanho medido) ---
+
+def _por_elemento(funcao):
+    return lambda valores: sum(1 for v in valores if funcao(v))
+
+
+def _exportar(escrever):
+    def exportar(entrada):
+        colunas, lotes = entrada
+        fd, caminho = tempfile.mkstemp()
+        os.close(fd)
+        try:
+            escrever(caminho, ((colunas, lote) for lote in lotes))
+        finally:
+            os.remove(caminho)
+    return exportar
+
+
+CASOS = {
+    "normalize_mac": (_macs, _normalize_mac, _normalize_mac_legado, None),
+    "to_date_str": (_datas, _to_date_str, _to_date_str_legado, None),
+    "to_time_str": (_horas, _to_time_str, _to_time_str_legado, None),
+    "strip_all": (_planilha, _strip_all, _strip_all_legado, None),
+    "is_valid_ip": (_enderecos, _por_elemento(is_valid_ip),
+                    _por_elemento(_validar_legado(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$")), None),
+    "is_valid_mac": (_enderecos, _por_elemento(is_valid_mac),
+                     _por_elemento(_validar_legado(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$")), None),
+    "is_valid_cidr": (_enderecos, _por_elemento(is_valid_cidr),
+                      _por_elemento(_validar_legado(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}/\d{1,2}$")), None),
+    "exportar_csv": (_lotes_exportacao, _exportar(_escrever_csv), None, None),
+    "exportar_xlsx": (_lotes_exportacao, _exportar(lambda c, l: _escrever_xlsx(c, [("Dados", l)])), None, 100000),
+    # Aqui o tamanho é a quantidade de PDFs gerados
+    "gerar_pdf_laudo": (lambda rng, n: n, lambda n: [gerar_pdf_laudo(LAUDO) for _ in range(n)], None, 1000),
+}
+
+
+def _medir(funcao, entrada, repeticoes):
+    """Melhor tempo, em segundos, de uma chamada."""
+    timer = timeit.Timer(lambda: funcao(entrada))
+    numero, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeticoes, number=numero)) / numero
+
+
+def _normalizar_resultado(resultado):
+    if isinstance(resultado, pd.DataFrame):
+        return resultado.astype(object).where(resultado.notna(), None).values.tolist()
+    if isinstance(resultado, pd.Series):
+        return [None if pd.isna(v) else v for v in resultado]
+    return resultado
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Micro-benchmarks das funções puras")
+    parser.add_argument("--casos", help=f"Separados por vírgula (padrão: todos). Opções: {', '.join(CASOS)}")
+    parser.add_argument("--tamanhos", default=",".join(map(str, TAMANHOS)))
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--salvar", help="Grava os tempos em JSON")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior (--salvar)")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="Piora aceitável (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    casos = args.casos.split(",") if args.casos else list(CASOS)
+    desconhecidos = [c for c in casos if c not in CASOS]
+    if desconhecidos:
+        parser.error(f"casos desconhecidos: {', '.join(desconhecidos)}")
+    tamanhos = [int(t) for t in args.tamanhos.split(",")]
+
+    print("=" * 90)
+    print(f"MICRO-BENCHMARKS - Python {platform.python_version()}, pandas {pd.__version__}, "
+          f"melhor de {args.repeticoes}")
+    print("=" * 90)
+    print(f"{'caso':<18} {'linhas':>9} {'atual (ms)':>12} {'ns/linha':>10} {'anterior (ms)':>14} {'ganho':>7}")
+
+    resultados = {}
+    divergentes = []
+    for caso in casos:
+        preparar, funcao, anterior, maximo = CASOS[caso]
+        for tamanho in tamanhos:
+            if maximo is not None and tamanho > maximo:
+                continue
+            entrada = preparar(random.Random(args.semente), tamanho)
+            tempo = _medir(funcao, entrada, args.repeticoes)
+            resultados.setdefault(caso, {})[str(tamanho)] = tempo
+            linha = f"{caso:<18} {tamanho:>9} {tempo * 1000:>12.2f} {tempo / tamanho * 1e9:>10.0f}"
+            if anterior is not None:
+                if _normalizar_resultado(funcao(entrada)) != _normalizar_resultado(anterior(entrada)):
+                    divergentes.append(f"{caso} ({tamanho})")
+                tempo_anterior = _medir(anterior, entrada, args.repeticoes)
+                linha += f" {tempo_anterior * 1000:>14.2f} {tempo_anterior / tempo:>6.1f}x"
+            print(linha)
+
+    ok = not divergentes
+    if divergentes:
+        print(f"❌ Resultado diferente da versão anterior: {', '.join(divergentes)}")
+    else:
+        print("✅ As versões vetorizadas produzem o mesmo resultado das anteriores.")
+
+    if args.salvar:
+        with open(args.salvar, "w", encoding="utf-8") as f:
+            json.dump({
+                "executado_em": datetime.now().isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "pandas": pd.__version__,
+                "segundos": resultados,
+            }, f, ensure_ascii=False, indent=2)
+        print(f"✅ Tempos gravados em {args.salvar}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            base = json.load(f)
+        print("-" * 90)
+        print(f"Comparação com {args.comparar} ({base['executado_em']})")
+        piores = []
+        for caso, por_tamanho in resultados.items():
+            for tamanho, tempo in por_tamanho.items():
+                anterior = base["segundos"].get(caso, {}).get(tamanho)
+                if anterior is None:
+                    continue
+                variacao = tempo / anterior - 1
+                marca = ""
+                if variacao > args.tolerancia:
+                    piores.append(f"{caso} ({tamanho})")
+                    marca = "  ❌"
+                print(f"{caso:<18} {tamanho:>9} {anterior * 1000:>12.2f} -> {tempo * 1000:>10.2f} ms "
+                      f"{variacao:>+7.0%}{marca}")
+        if piores:
+            print(f"❌ Pioraram mais de {args.tolerancia:.0%}: {', '.join(piores)}")
+            ok = False
+        else:
+            print(f"✅ Nenhum caso piorou mais de {args.tolerancia:.0%}.")
+
+    if not ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+# Verificação dos planos das consultas mais frequentes de ordens_servico.
+#
+# Popula a tabela com um volume sintético grande, atualiza as estatísticas e
+# confere via EXPLAIN (FORMAT JSON) que cada consulta de consultas.py usa um
+# índice, sem Seq Scan nas partições. Tudo roda em uma única transação que é
+# desfeita ao final: nenhum dado sintético fica no banco.
+#
+# Uso:
+#   python -m bench.verificar_indices --registros 200000
+
+import argparse
+import json
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import text
+
+from bench import criar_engine, popular_os
+from config import TECNICOS
+from consultas import (
+    SQL_TAREFAS_TECNICO,
+    SQL_PENDENTES_LAUDO_TECNICO,
+    SQL_FINALIZADAS_RECENTES_TECNICO,
+    SQL_CARGA_TRABALHO_TECNICO,
+    SQL_CONTAR_STATUS,
+    SQL_LISTAR_AGUARDANDO_PECAS,
+    SQL_FILTRO_LISTAGEM,
+    SQL_FILTRO_ORDEM,
+    SQL_FILTRO_ORDEM_INVERSA,
+    SQL_BUSCA_CONDICAO,
+    SQL_BUSCA_LISTAGEM,
+    SQL_BUSCA_ORDEM,
+)
+
+
+def _casos():
+    """(nome, consulta, parâmetros, partições esperadas) de cada consulta verificada."""
+    tecnico = TECNICOS[0]
+    hoje = date.today()
+    filtro_periodo = (
+        SQL_FILTRO_LISTAGEM + " WHERE data >= :data_inicio AND data <= :data_fim" + SQL_FILTRO_ORDEM + " LIMIT 10"
+    )
+    filtro_periodo_tipo = (
+        SQL_FILTRO_LISTAGEM + " WHERE data >= :data_inicio AND data <= :data_fim AND tipo = :tipo"
+        + SQL_FILTRO_ORDEM + " LIMIT 10"
+    )
+    periodo = {"data_inicio": hoje - timedelta(days=30), "data_fim": hoje}
+    pagina_seguinte = SQL_FILTRO_LISTAGEM + " WHERE (ordenacao, id) < (:k_ordenacao, :k_id)" + SQL_FILTRO_ORDEM + " LIMIT 10"
+    pagina_anterior = (
+        SQL_FILTRO_LISTAGEM + " WHERE (ordenacao, id) > (:k_ordenacao, :k_id)" + SQL_FILTRO_ORDEM_INVERSA + " LIMIT 10"
+    )
+    busca_livre = SQL_BUSCA_LISTAGEM + " WHERE " + SQL_BUSCA_CONDICAO + SQL_BUSCA_ORDEM + " LIMIT 10"
+    chave = {"k_ordenacao": datetime.combine(hoje - timedelta(days=400), datetime.min.time()), "k_id": 0}
+    return [
+        ("minhas_tarefas.tarefas", SQL_TAREFAS_TECNICO.text, {"tecnico": tecnico}, None),
+        ("minhas_tarefas.pendentes_laudo", SQL_PENDENTES_LAUDO_TECNICO.text, {"tecnico": tecnico}, None),
+        ("minhas_tarefas.finalizadas_recentes", SQL_FINALIZADAS_RECENTES_TECNICO.text,
+         {"tecnico": tecnico, "limite": 5}, None),
+        ("minhas_tarefas.carga_trabalho", SQL_CARGA_TRABALHO_TECNICO.text,
+         {"tecnico": tecnico, "limite": 5, "tarefas_limite": 5, "tarefas_offset": 0}, None),
+        ("dashboard.contar_aguardando_pecas", SQL_CONTAR_STATUS.text, {"status": "AGUARDANDO PEÇA(S)"}, None),
+        ("dashboard.listar_aguardando_pecas", SQL_LISTAR_AGUARDANDO_PECAS.text, {}, None),
+        ("filtro.periodo", filtro_periodo, periodo, None),
+        ("filtro.pagina_seguinte", pagina_seguinte, chave, None),
+        ("filtro.pagina_anterior", pagina_anterior, chave, None),
+        ("filtro.periodo_tipo", filtro_periodo_tipo, {**periodo, "tipo": "Externa"}, {"ordens_servico_externa"}),
+        ("filtro.busca_livre", busca_livre, {"busca": "impressora saúde"}, None),
+    ]
+
+
+def _nos(plano):
+    """Percorre recursivamente os nós de um plano do EXPLAIN."""
+    yield plano
+    for filho in plano.get("Plans", []):
+        yield from _nos(filho)
+
+
+def verificar(con, nome, sql, params, particoes_esperadas):
+    resultado = con.execute(text("EXPLAIN (FORMAT JSON) " + sql), params).scalar()
+    if isinstance(resultado, str):
+        resultado = json.loads(resultado)
+    plano = resultado[0]["Plan"]
+
+    nos = list(_nos(plano))
+    seq_scans = [
+        n["Relation Name"] for n in nos
+        if n["Node Type"] == "Seq Scan" and n.get("Relation Name", "").startswith("ordens_servico")
+    ]
+    indices = sorted({n["Index Name"] for n in nos if "Index Name" in n})
+    particoes = {n["Relation Name"] for n in nos if n.get("Relation Name", "").startswith("ordens_servico")}
+
+    problemas = []
+    if seq_scans:
+        problemas.append(f"Seq Scan em {', '.join(sorted(set(seq_scans)))}")
+    if particoes_esperadas is not None and particoes != particoes_esperadas:
+        problemas.append(f"partições lidas: {', '.join(sorted(particoes))}")
+
+    ok = not problemas
+    detalhe = ", ".join(indices) if ok else "; ".join(problemas)
+    print(f"{'✅' if ok else '❌'} {nome:<40} {detalhe}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Confere os planos das consultas frequentes de OS")
+    parser.add_argument("--registros", type=int, default=200000)
+    args = parser.parse_args()
+
+    engine = criar_engine(pool_size=1, max_overflow=0)
+    print("=" * 90)
+    print(f"PLANOS DAS CONSULTAS DE OS - {args.registros} registros sintéticos")
+    print("=" * 90)
+
+    tudo_ok = True
+    with engine.connect() as con:
+        trans = con.begin()
+        try:
+            popular_os(con, args.registros, "bench-indices")
+            con.execute(text("ANALYZE ordens_servico"))
+            for nome, sql, params, particoes in _casos():
+                tudo_ok &= verificar(con, nome, sql, params, particoes)
+        finally:
+            # Desfaz a carga sintética (e as estatísticas coletadas sobre ela)
+            trans.rollback()
+
+    engine.dispose()
+    if not tudo_ok:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
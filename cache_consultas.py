@@ -0,0 +1,123 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/cache_consultas.py
+# Cache de consultas compartilhado entre sessões, invalidado por versão de tabela.
+#
+# Cada resultado é guardado sob (consulta, parâmetros, versões das tabelas lidas).
+# As versões ficam em versoes_dados ('tabela:<nome>') e são incrementadas por
+# trigger a cada comando que altera a tabela (migracoes/0010_versoes_tabelas.sql).
+# Assim todas as sessões (e todas as réplicas, pois a versão está no banco)
+# reaproveitam o resultado até a próxima gravação relevante, pagando apenas a
+# leitura das versões por chave primária.
+#
+# A versão é lida antes da consulta: se uma gravação ocorrer no meio, o dado
+# novo fica sob a versão antiga e a próxima leitura simplesmente refaz a
+# consulta. O cache nunca devolve um resultado mais velho que a versão lida.
+
+import copy
+import threading
+from collections import OrderedDict
+
+from sqlalchemy import text
+
+MAX_ITENS = 512
+
+SQL_VERSOES_TABELAS = text("SELECT chave, versao FROM versoes_dados WHERE chave = ANY(:chaves)")
+
+
+class _CacheLRU:
+    """Dicionário limitado por quantidade de itens, descartando o menos usado."""
+
+    def __init__(self, max_itens):
+        self.max_itens = max_itens
+        self.itens = OrderedDict()
+        self.lock = threading.Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave):
+        with self.lock:
+            if chave in self.itens:
+                self.itens.move_to_end(chave)
+                self.acertos += 1
+                return True, self.itens[chave]
+            self.falhas += 1
+            return False, None
+
+    def guardar(self, chave, valor):
+        with self.lock:
+            self.itens[chave] = valor
+            self.itens.move_to_end(chave)
+            while len(self.itens) > self.max_itens:
+                self.itens.popitem(last=False)
+
+    def limpar(self):
+        with self.lock:
+            self.itens.clear()
+
+
+_cache = _CacheLRU(MAX_ITENS)
+
+
+def _congelar(params):
+    """Parâmetros em forma hasheável (listas viram tuplas)."""
+    if not params:
+        return ()
+    return tuple(sorted(
+        (nome, tuple(valor) if isinstance(valor, list) else valor) for nome, valor in params.items()
+    ))
+
+
+def versoes_tabelas(conn, tabelas):
+    """Versão atual de cada tabela (0 se ainda não alterada desde a migração)."""
+    chaves = [f"tabela:{t}" for t in tabelas]
+    with conn.connect() as con:
+        atuais = dict(con.execute(SQL_VERSOES_TABELAS, {"chaves": chaves}).fetchall())
+    return tuple(atuais.get(c, 0) for c in chaves)
+
+
+def em_cache(conn, tabelas, chave, carregar):
+    """
+    Devolve carregar() do cache enquanto nenhuma das tabelas mudar.
+    `chave` identifica a consulta e seus parâmetros; o resultado é copiado
+    na saída para que quem chama possa alterá-lo livremente.
+    """
+    chave_completa = (chave, tuple(tabelas), versoes_tabelas(conn, tabelas))
+    encontrado, valor = _cache.obter(chave_completa)
+    if not encontrado:
+        valor = carregar()
+        _cache.guardar(chave_completa, valor)
+    return copy.deepcopy(valor)
+
+
+def consultar(conn, tabelas, sql, params=None):
+    """Executa (ou reaproveita) a consulta e devolve a lista de linhas como dicts."""
+    consulta = sql if not isinstance(sql, str) else text(sql)
+
+    def carregar():
+        with conn.connect() as con:
+            return [dict(r) for r in con.execute(consulta, params or {}).mappings()]
+
+    return em_cache(conn, tabelas, (str(consulta), _congelar(params)), carregar)
+
+
+def consultar_escalar(conn, tabelas, sql, params=None):
+    """Primeira coluna da primeira linha da consulta, com cache."""
+    linhas = consultar(conn, tabelas, sql, params)
+    return next(iter(linhas[0].values())) if linhas else None
+
+
+def estatisticas():
+    """Acertos, falhas e ocupação do cache deste processo."""
+    with _cache.lock:
+        total = _cache.acertos + _cache.falhas
+        return {
+            "acertos": _cache.acertos,
+            "falhas": _cache.falhas,
+            "taxa_acerto": _cache.acertos / total if total else None,
+            "itens": len(_cache.itens),
+            "max_itens": _cache.max_itens,
+        }
+
+
+def limpar():
+    """Descarta todos os resultados guardados (os contadores são mantidos)."""
+    _cache.limpar()
@@ -0,0 +1,47 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/carga_trabalho.py
+# Carga de trabalho do técnico (cabeçalho e abas de Minhas Tarefas).
+#
+# Tudo vem de uma única consulta (SQL_CARGA_TRABALHO_TECNICO). O resultado fica
+# em cache por técnico e página, associado à versão 'tecnico:<nome>' de
+# versoes_dados (migracoes/0009_versoes_dados.sql): enquanto nenhuma OS ou laudo
+# do técnico mudar, os reruns da página não voltam ao banco para a carga.
+
+import pandas as pd
+import streamlit as st
+
+from consultas import SQL_CARGA_TRABALHO_TECNICO, SQL_VERSAO_DADOS
+
+
+def _versao_tecnico(conn, tecnico):
+    with conn.connect() as con:
+        return con.execute(SQL_VERSAO_DADOS, {"chave": f"tecnico:{tecnico}"}).scalar()
+
+
+@st.cache_data(max_entries=200, show_spinner=False)
+def _carregar(_conn, tecnico, versao, offset, limite, limite_finalizadas):
+    # A versão entra apenas na chave do cache: muda quando os dados do técnico mudam
+    with _conn.connect() as con:
+        row = con.execute(SQL_CARGA_TRABALHO_TECNICO, {
+            "tecnico": tecnico,
+            "tarefas_limite": limite,
+            "tarefas_offset": offset,
+            "limite": limite_finalizadas,
+        }).mappings().one()
+    return {
+        "abertas": row["abertas"],
+        "aguardando_pecas": row["aguardando_pecas"],
+        "total_tarefas": row["total_tarefas"],
+        "tarefas": pd.DataFrame(row["tarefas"]),
+        "pendentes_laudo": pd.DataFrame(row["pendentes_laudo"]),
+        "finalizadas": pd.DataFrame(row["finalizadas"]),
+    }
+
+
+def carregar_carga_trabalho(conn, tecnico, pagina, itens_por_pagina, limite_finalizadas=5):
+    """
+    Contagens do cabeçalho, página `pagina` das tarefas pendentes, OS pendentes
+    de laudo e últimas finalizadas do técnico, em uma ida ao banco (ou do cache).
+    """
+    versao = _versao_tecnico(conn, tecnico)
+    offset = (max(pagina, 1) - 1) * itens_por_pagina
+    return _carregar(conn, tecnico, versao, offset, itens_por_pagina, limite_finalizadas)
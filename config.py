@@ -8,6 +8,28 @@ DB_USER = os.getenv("DB_USER", "postgres")
 DB_PASSWORD = os.getenv("DB_PASSWORD", "1234")
 DB_PORT = os.getenv("DB_PORT", "5432")
 
+# Pool de conexões do engine compartilhado (ver database.py)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "3600"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Tempo máximo de cada comando SQL (ms); 0 desativa
+DB_STATEMENT_TIMEOUT_MS = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", "60000"))
+# Nome da aplicação em pg_stat_activity
+DB_APPLICATION_NAME = os.getenv("DB_APPLICATION_NAME", "sistema_os")
+
+# ============ MÉTRICAS DE DESEMPENHO ============
+# Grava as amostras também na tabela metricas_desempenho (além da memória)
+METRICAS_PERSISTIR = os.getenv("METRICAS_PERSISTIR", "0") == "1"
+METRICAS_RETENCAO_DIAS = int(os.getenv("METRICAS_RETENCAO_DIAS", "14"))
+# Porta do servidor de /healthz e /metrics (ver monitoramento.py)
+MONITORAMENTO_PORTA = int(os.getenv("MONITORAMENTO_PORTA", "9101"))
+
+# ============ EXPORTAÇÃO ============
+# Maior arquivo entregue pelo st.download_button (MiB): o arquivo inteiro vai
+# para a memória do processo antes de ser enviado ao navegador
+EXPORTACAO_LIMITE_MB = int(os.getenv("EXPORTACAO_LIMITE_MB", "200"))
+
 # ============ APPLICATION CONFIG ============
 SECRET_KEY = os.getenv("SECRET_KEY", "sua_chave_secreta_aqui")
 
@@ -0,0 +1,136 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/consultas.py
+# Consultas mais frequentes sobre ordens_servico, com nome.
+#
+# Ficam centralizadas aqui para que as páginas e bench/verificar_indices.py
+# usem exatamente o mesmo SQL: cada consulta tem um índice desenhado para ela
+# (migracoes/0005_indices_os.sql) e o harness confere que não há Seq Scan.
+
+from sqlalchemy import text
+
+# --- Minhas Tarefas ---
+
+# Colunas exibidas nos cards de OS
+_COLUNAS_CARD_OS = """
+    id, tipo, numero, secretaria, setor, data, hora, solicitante, solicitacao_cliente, categoria,
+    patrimonio, equipamento, descricao, servico_executado, status, data_finalizada, tecnico
+"""
+
+# Mesmo predicado do índice parcial idx_ordens_servico_pendentes_tecnico
+SQL_TAREFAS_TECNICO = text(f"""
+    SELECT {_COLUNAS_CARD_OS} FROM ordens_servico
+    WHERE tecnico = :tecnico AND status NOT IN ('ENTREGUE AO CLIENTE', 'AGUARDANDO RETIRADA', 'FINALIZADO')
+    ORDER BY data DESC, hora DESC
+""")
+
+# OS aguardando peça(s) ainda sem laudo (anti-join; laudos.tipo_os usa os mesmos valores de tipo)
+SQL_PENDENTES_LAUDO_TECNICO = text("""
+    SELECT os.id, os.numero, os.tipo, os.secretaria, os.equipamento, os.status, os.data
+    FROM ordens_servico os
+    WHERE os.status = 'AGUARDANDO PEÇA(S)' AND os.tecnico = :tecnico
+      AND NOT EXISTS (
+          SELECT 1 FROM laudos l
+          WHERE l.numero_os = os.numero AND l.tipo_os = os.tipo
+      )
+    ORDER BY os.data DESC
+""")
+
+SQL_FINALIZADAS_RECENTES_TECNICO = text(f"""
+    SELECT {_COLUNAS_CARD_OS} FROM ordens_servico
+    WHERE tecnico = :tecnico AND status IN ('FINALIZADO', 'AGUARDANDO RETIRADA', 'ENTREGUE AO CLIENTE')
+    ORDER BY data_finalizada DESC LIMIT :limite
+""")
+
+# Carga de trabalho completa do técnico em uma única ida ao banco: contagens do
+# cabeçalho, página da lista de tarefas, pendentes de laudo e últimas finalizadas.
+# As partes reutilizam as consultas acima (e, portanto, os mesmos índices).
+SQL_CARGA_TRABALHO_TECNICO = text(f"""
+    WITH tarefas AS MATERIALIZED ({SQL_TAREFAS_TECNICO.text}),
+    contagens AS (
+        SELECT
+            COUNT(*) FILTER (WHERE status = 'EM ABERTO') AS abertas,
+            COUNT(*) FILTER (WHERE status = 'AGUARDANDO PEÇA(S)') AS aguardando_pecas,
+            COUNT(*) AS total_tarefas
+        FROM tarefas
+    )
+    SELECT
+        c.abertas,
+        c.aguardando_pecas,
+        c.total_tarefas,
+        (SELECT COALESCE(json_agg(t), '[]') FROM (
+            SELECT * FROM tarefas ORDER BY data DESC, hora DESC LIMIT :tarefas_limite OFFSET :tarefas_offset
+        ) t) AS tarefas,
+        (SELECT COALESCE(json_agg(p), '[]') FROM ({SQL_PENDENTES_LAUDO_TECNICO.text}) p) AS pendentes_laudo,
+        (SELECT COALESCE(json_agg(f), '[]') FROM ({SQL_FINALIZADAS_RECENTES_TECNICO.text}) f) AS finalizadas
+    FROM contagens c
+""")
+
+# Versão atual de uma chave de versoes_dados (0 se nunca incrementada)
+SQL_VERSAO_DADOS = text("SELECT COALESCE((SELECT versao FROM versoes_dados WHERE chave = :chave), 0)")
+
+# --- Dashboard ---
+
+SQL_CONTAR_STATUS = text("SELECT COUNT(*) FROM ordens_servico WHERE status = :status")
+
+SQL_LISTAR_AGUARDANDO_PECAS = text("""
+    SELECT numero, tipo, secretaria, setor, solicitante, equipamento, tecnico, data, status
+    FROM ordens_servico
+    WHERE status = 'AGUARDANDO PEÇA(S)'
+    ORDER BY data DESC
+""")
+
+# --- Filtro ---
+# A cláusula WHERE é montada pela página. A listagem é paginada por keyset sobre
+# (ordenacao, id), servida por idx_ordens_servico_ordenacao; os detalhes da OS
+# são buscados por id apenas quando um modal é aberto.
+
+SQL_FILTRO_EXPORTACAO = """
+    SELECT id, tipo, numero, secretaria, setor, data, hora, solicitante, telefone,
+           solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+           status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+           laudo_visualizado
+    FROM ordens_servico
+"""
+# Exportação completa (auditoria): todas as OS, uma aba por tipo no XLSX
+SQL_EXPORTACAO_COMPLETA = """
+    SELECT numero, secretaria, setor, data, hora, solicitante,
+           telefone, equipamento, descricao, status,
+           data_finalizada, data_retirada, retirada_por, tecnico, tipo
+    FROM ordens_servico
+"""
+SQL_FILTRO_LISTAGEM = "SELECT id, tipo, numero, secretaria, solicitante, status, data, ordenacao FROM ordens_servico"
+SQL_FILTRO_CONTAGEM = "SELECT COUNT(*) FROM ordens_servico"
+SQL_FILTRO_ORDEM = " ORDER BY ordenacao DESC, id DESC"
+SQL_FILTRO_ORDEM_INVERSA = " ORDER BY ordenacao ASC, id ASC"
+
+# Busca livre sobre a coluna gerada `busca` (migração 0013, índice GIN). A frase
+# aceita a sintaxe de buscador (aspas, OR, -palavra); todas as palavras precisam
+# aparecer. Com busca, a listagem é ordenada pela relevância e o keyset passa a
+# ser (relevância, ordenacao, id).
+SQL_BUSCA_CONSULTA = "websearch_to_tsquery('busca_pt', :busca)"
+SQL_BUSCA_CONDICAO = f"busca @@ {SQL_BUSCA_CONSULTA}"
+SQL_BUSCA_RELEVANCIA = f"ts_rank(busca, {SQL_BUSCA_CONSULTA})"
+SQL_BUSCA_LISTAGEM = (
+    "SELECT id, tipo, numero, secretaria, solicitante, status, data, ordenacao, "
+    f"{SQL_BUSCA_RELEVANCIA} AS relevancia FROM ordens_servico"
+)
+SQL_BUSCA_ORDEM = f" ORDER BY {SQL_BUSCA_RELEVANCIA} DESC, ordenacao DESC, id DESC"
+SQL_BUSCA_ORDEM_INVERSA = f" ORDER BY {SQL_BUSCA_RELEVANCIA} ASC, ordenacao ASC, id ASC"
+
+SQL_OS_POR_ID = text("SELECT * FROM ordens_servico WHERE tipo = :tipo AND id = :id")
+
+
+# --- Equipamentos ---
+
+SQL_ESTATISTICAS_EQUIPAMENTOS = text("""
+    SELECT COUNT(*) AS total,
+           COUNT(DISTINCT categoria) AS categorias,
+           COUNT(DISTINCT secretaria) AS secretarias
+    FROM equipamentos
+""")
+
+# --- Recargas ---
+
+SQL_CONTAGEM_STATUS_RECARGAS = text("""
+    SELECT status, COUNT(*) AS count FROM recargas
+    GROUP BY status ORDER BY count DESC
+""")
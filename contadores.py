@@ -0,0 +1,81 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/contadores.py
+# Numeração sequencial de OS por (tabela, ano) sem LOCK TABLE.
+#
+# Cada tabela de OS tem uma linha por ano em `contadores_os`. O número é
+# avançado com UPDATE ... RETURNING dentro da mesma transação do INSERT da OS:
+# registros concorrentes disputam apenas o lock daquela linha (leitores das
+# tabelas de OS não são bloqueados) e um ROLLBACK devolve o número, sem buracos.
+
+from datetime import datetime
+from sqlalchemy import text
+
+TABELAS_OS = ("os_interna", "os_externa")
+
+SQL_AVANCAR = text("""
+    UPDATE contadores_os
+    SET ultimo_numero = ultimo_numero + 1
+    WHERE tabela = :tabela AND ano = :ano
+    RETURNING ultimo_numero
+""")
+
+
+def _validar_tabela(table_name):
+    if table_name not in TABELAS_OS:
+        raise ValueError(f"Tabela de OS inválida para numeração: {table_name}")
+
+
+def _padrao_ano(ano):
+    """Regex que casa números no formato SEQ-AA do ano informado."""
+    return f"^[0-9]+-{ano % 100:02d}$"
+
+
+def _semear_contador(con, table_name, ano):
+    """Cria o contador do ano a partir do maior número já emitido (executado uma única vez por ano)."""
+    con.execute(
+        text(f"""
+            INSERT INTO contadores_os (tabela, ano, ultimo_numero)
+            SELECT :tabela, :ano, COALESCE(MAX(CAST(SPLIT_PART(numero, '-', 1) AS INTEGER)), 0)
+            FROM {table_name}
+            WHERE numero ~ :padrao
+            ON CONFLICT (tabela, ano) DO NOTHING
+        """),
+        {"tabela": table_name, "ano": ano, "padrao": _padrao_ano(ano)},
+    )
+
+
+def proximo_numero(con, table_name, agora=None):
+    """
+    Reserva o próximo número de OS (formato SEQ-AA) para a tabela.
+    Deve ser chamado dentro da transação que insere a OS.
+    """
+    _validar_tabela(table_name)
+    ano = (agora or datetime.now()).year
+    params = {"tabela": table_name, "ano": ano}
+
+    sequencial = con.execute(SQL_AVANCAR, params).scalar()
+    if sequencial is None:
+        # Primeiro registro do ano (ou primeiro uso do contador): semeia e avança
+        _semear_contador(con, table_name, ano)
+        sequencial = con.execute(SQL_AVANCAR, params).scalar()
+
+    return f"{sequencial}-{ano % 100:02d}"
+
+
+def sincronizar_contador(con, table_name):
+    """
+    Ajusta os contadores já existentes da tabela ao maior número presente nos dados.
+    Usado após importações de planilhas legadas, que inserem números sem passar pelo contador.
+    """
+    _validar_tabela(table_name)
+    con.execute(
+        text(f"""
+            UPDATE contadores_os c
+            SET ultimo_numero = GREATEST(c.ultimo_numero, COALESCE((
+                SELECT MAX(CAST(SPLIT_PART(numero, '-', 1) AS INTEGER))
+                FROM {table_name}
+                WHERE numero ~ ('^[0-9]+-' || LPAD((c.ano % 100)::text, 2, '0') || '$')
+            ), 0))
+            WHERE c.tabela = :tabela
+        """),
+        {"tabela": table_name},
+    )
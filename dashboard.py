@@ -2,6 +2,9 @@
 import streamlit as st
 import pandas as pd
 from database import get_connection
+from consultas import SQL_CONTAR_STATUS, SQL_LISTAR_AGUARDANDO_PECAS
+from dashboard_dados import carregar_indicadores_gerais, listar_tecnicos_com_os, carregar_agregados_periodo
+from cache_consultas import em_cache, consultar, consultar_escalar
 from sqlalchemy import text
 from datetime import datetime, date
 import pytz
@@ -17,45 +20,25 @@ def render():
     is_admin_role = role in ["admin", "administrativo"]
 
     try:
-        # --- 1. QUERY ATUALIZADA ---
-        # Buscamos também 'data_finalizada' para calcular o TMA
-        query = text("""
-            SELECT status, tecnico, data, secretaria, categoria, data_finalizada FROM os_interna
-            UNION ALL
-            SELECT status, tecnico, data, secretaria, categoria, data_finalizada FROM os_externa
-        """)
-
-        df_base = pd.read_sql(query, conn)
+        # --- 1. INDICADORES GERAIS (AGREGADOS NO BANCO) ---
+        # Os agregados só mudam quando alguma OS é gravada: cache compartilhado por versão da tabela
+        indicadores = em_cache(conn, ["ordens_servico"], "dashboard.indicadores_gerais",
+                               lambda: carregar_indicadores_gerais(conn))
         
-        if df_base.empty:
+        if indicadores["total"] == 0:
             st.info("Ainda não há Ordens de Serviço registradas no sistema.")
             st.stop()
 
-        # --- 2. PREPARAÇÃO INICIAL DOS DADOS ---
-        # Converte colunas de data/hora, tratando fuso horário e erros
-        df_base['data'] = pd.to_datetime(df_base['data'], errors='coerce')
-        df_base['data_finalizada'] = pd.to_datetime(df_base['data_finalizada'], utc=True, errors='coerce').dt.tz_convert(fuso_sp).dt.tz_localize(None)
-
-        # --- 3. CÁLCULO DAS MÉTRICAS GERAIS (SEM FILTRO) ---
-        total_os = len(df_base)
-        os_abertas = len(df_base[df_base['status'] == 'EM ABERTO'])
-        os_finalizadas_count = len(df_base[df_base['status'].isin(['FINALIZADO', 'AGUARDANDO RETIRADA', 'ENTREGUE AO CLIENTE'])])
-        os_aguardando_peca = len(df_base[df_base['status'] == 'AGUARDANDO PEÇA(S)'])
+        # --- 2/3. MÉTRICAS GERAIS (SEM FILTRO) ---
+        total_os = indicadores["total"]
+        os_abertas = indicadores["abertas"]
+        os_finalizadas_count = indicadores["finalizadas"]
+        os_aguardando_peca = indicadores["aguardando_peca"]
 
-        # Cálculo do TMA geral
-        df_finalizadas_tma_geral = df_base[pd.notna(df_base['data_finalizada'])].copy()
-        
         tma_display = "N/A"
-        if not df_finalizadas_tma_geral.empty:
-            df_finalizadas_tma_geral['tempo_atendimento_dias'] = (
-                df_finalizadas_tma_geral['data_finalizada'] - df_finalizadas_tma_geral['data']
-            ).dt.total_seconds() / (3600 * 24)
-            
-            df_finalizadas_tma_geral = df_finalizadas_tma_geral[df_finalizadas_tma_geral['tempo_atendimento_dias'] >= 0]
-            
-            tma_dias = df_finalizadas_tma_geral['tempo_atendimento_dias'].mean()
-            if pd.notna(tma_dias):
-                tma_display = f"{tma_dias:.1f} dias"
+        tma_dias = indicadores["tma_dias"]
+        if tma_dias is not None:
+            tma_display = f"{tma_dias:.1f} dias"
 
         # --- 4. EXIBIÇÃO DAS MÉTRICAS GERAIS ---
         st.markdown("---")
@@ -77,14 +60,9 @@ def render():
         # --- 5. VERIFICAÇÃO DE OSs AGUARDANDO PEÇAS (APÓS MÉTRICAS) ---
         if is_admin_role:
             try:
-                with conn.connect() as con:
-                    total_aguardando_pecas_interna = con.execute(
-                        text("SELECT COUNT(*) FROM os_interna WHERE status = 'AGUARDANDO PEÇA(S)'")
-                    ).scalar()
-                    total_aguardando_pecas_externa = con.execute(
-                        text("SELECT COUNT(*) FROM os_externa WHERE status = 'AGUARDANDO PEÇA(S)'")
-                    ).scalar()
-                    total_aguardando_pecas = total_aguardando_pecas_interna + total_aguardando_pecas_externa
+                total_aguardando_pecas = consultar_escalar(
+                    conn, ["ordens_servico"], SQL_CONTAR_STATUS, {"status": "AGUARDANDO PEÇA(S)"}
+                )
                 
                 # Botão de alerta para OSs laudadas
                 if total_aguardando_pecas > 0:
@@ -108,43 +86,13 @@ def render():
                 if st.session_state.get("mostrar_os_laudadas", False):
                     with st.expander("📋 Ordens de Serviço Aguardando Peça(s)", expanded=True):
                         # QUERY ATUALIZADA COM SETOR (DEPARTAMENTO)
-                        query_laudadas = text("""
-                            SELECT 
-                                numero,
-                                'Interna' as tipo,
-                                secretaria,
-                                setor,
-                                solicitante,
-                                equipamento,
-                                tecnico,
-                                data,
-                                status
-                            FROM os_interna
-                            WHERE status = 'AGUARDANDO PEÇA(S)'
-                            
-                            UNION ALL
-                            
-                            SELECT 
-                                numero,
-                                'Externa' as tipo,
-                                secretaria,
-                                setor,
-                                solicitante,
-                                equipamento,
-                                tecnico,
-                                data,
-                                status
-                            FROM os_externa
-                            WHERE status = 'AGUARDANDO PEÇA(S)'
-                            
-                            ORDER BY data DESC
-                        """)
+                        query_laudadas = SQL_LISTAR_AGUARDANDO_PECAS
                         
-                        with conn.connect() as con:
-                            result = con.execute(query_laudadas)
-                            rows = result.fetchall()
-                            columns = result.keys()
-                            df_laudadas = pd.DataFrame(rows, columns=columns)
+                        df_laudadas = pd.DataFrame(
+                            consultar(conn, ["ordens_servico"], query_laudadas),
+                            columns=["numero", "tipo", "secretaria", "setor", "solicitante",
+                                     "equipamento", "tecnico", "data", "status"],
+                        )
                         
                         if not df_laudadas.empty:
                             st.info(f"📊 Total: {len(df_laudadas)} OS(s) aguardando peça(s)")
@@ -290,8 +238,8 @@ def render():
         
         with col_f1:
             # Define o range de datas com base nos dados
-            data_min = df_base['data'].min().date() if not df_base['data'].isnull().all() else date.today()
-            data_max = df_base['data'].max().date() if not df_base['data'].isnull().all() else date.today()
+            data_min = indicadores["data_min"] or date.today()
+            data_max = indicadores["data_max"] or date.today()
             
             data_inicio = st.date_input("Data de Início", data_min, format="DD/MM/YYYY")
         
@@ -300,7 +248,9 @@ def render():
         
         with col_f3:
             # Popula o filtro de técnico com base nos dados reais
-            tecnicos_disponiveis = ["Todos"] + sorted(list(df_base['tecnico'].dropna().unique()))
+            tecnicos_disponiveis = ["Todos"] + em_cache(
+                conn, ["ordens_servico"], "dashboard.tecnicos_com_os", lambda: listar_tecnicos_com_os(conn)
+            )
             tecnico_selecionado = st.selectbox("Filtrar por Técnico", tecnicos_disponiveis)
 
         # Validação de datas
@@ -309,28 +259,16 @@ def render():
             st.stop()
 
         # --- 7. APLICAÇÃO DOS FILTROS (APENAS PARA GRÁFICOS) ---
-        df_filtrado = df_base[
-            (df_base['data'] >= pd.to_datetime(data_inicio)) &
-            (df_base['data'] <= pd.to_datetime(data_fim) + pd.Timedelta(days=1))
-        ]
-        
-        if tecnico_selecionado != "Todos":
-            df_filtrado = df_filtrado[df_filtrado['tecnico'] == tecnico_selecionado]
+        tecnico_filtro = None if tecnico_selecionado == "Todos" else tecnico_selecionado
+        agregados = em_cache(
+            conn, ["ordens_servico"], ("dashboard.agregados_periodo", data_inicio, data_fim, tecnico_filtro),
+            lambda: carregar_agregados_periodo(conn, data_inicio, data_fim, tecnico=tecnico_filtro),
+        )
 
-        if df_filtrado.empty:
+        if agregados["total"] == 0:
             st.warning("Nenhum dado encontrado para os filtros selecionados.")
             st.stop()
 
-        # Cálculo do TMA filtrado para o gráfico
-        df_finalizadas_tma = df_filtrado[pd.notna(df_filtrado['data_finalizada'])].copy()
-        
-        if not df_finalizadas_tma.empty:
-            df_finalizadas_tma['tempo_atendimento_dias'] = (
-                df_finalizadas_tma['data_finalizada'] - df_finalizadas_tma['data']
-            ).dt.total_seconds() / (3600 * 24)
-            
-            df_finalizadas_tma = df_finalizadas_tma[df_finalizadas_tma['tempo_atendimento_dias'] >= 0]
-
         st.markdown("---")
 
         # --- 8. GRÁFICOS VISUAIS (COM FILTROS APLICADOS) ---
@@ -343,7 +281,7 @@ def render():
             todos_tecnicos = sorted(TECNICOS)
             df_tecnicos = pd.DataFrame(todos_tecnicos, columns=['Técnico'])
             
-            contagem_os_tecnicos = df_filtrado['tecnico'].value_counts().reset_index()
+            contagem_os_tecnicos = agregados["por_tecnico"].copy()
             contagem_os_tecnicos.columns = ['Técnico', 'Quantidade de OS']
             
             df_final_tecnicos = pd.merge(df_tecnicos, contagem_os_tecnicos, on='Técnico', how='left')
@@ -361,11 +299,10 @@ def render():
 
             # GRÁFICO 2: TMA por Técnico
             st.markdown("##### Tempo Médio de Atendimento por Técnico (em dias)")
-            if df_finalizadas_tma.empty:
+            if agregados["qtd_tma"] == 0:
                 st.info("Nenhuma OS finalizada para calcular o TMA por técnico.")
             else:
-                tma_por_tecnico = df_finalizadas_tma.groupby('tecnico')['tempo_atendimento_dias'].mean().sort_values()
-                st.bar_chart(tma_por_tecnico)
+                st.bar_chart(agregados["tma_por_tecnico"])
 
         with col_graf_2:
             # GRÁFICO 3: OS por Secretaria
@@ -373,7 +310,7 @@ def render():
             todas_secretarias = sorted(SECRETARIAS)
             df_secretarias = pd.DataFrame(todas_secretarias, columns=['Secretaria'])
 
-            contagem_os_secretarias = df_filtrado['secretaria'].value_counts().reset_index()
+            contagem_os_secretarias = agregados["por_secretaria"].copy()
             contagem_os_secretarias.columns = ['Secretaria', 'Quantidade de OS']
             
             df_final_secretarias = pd.merge(df_secretarias, contagem_os_secretarias, on='Secretaria', how='left')
@@ -392,7 +329,7 @@ def render():
             todas_categorias = sorted(CATEGORIAS)
             df_categorias = pd.DataFrame(todas_categorias, columns=['Categoria'])
             
-            contagem_os_categorias = df_filtrado['categoria'].value_counts().reset_index()
+            contagem_os_categorias = agregados["por_categoria"].copy()
             contagem_os_categorias.columns = ['Categoria', 'Quantidade de OS']
             
             df_final_categorias = pd.merge(df_categorias, contagem_os_categorias, on='Categoria', how='left')
@@ -407,7 +344,4 @@ def render():
                 st.bar_chart(df_chart_categorias['Quantidade de OS'])
 
     except Exception as e:
-        st.error(f"Ocorreu um erro ao carregar os dados do dashboard: {e}")
-    finally:
-        if 'conn' in locals():
-            conn.dispose()
\ No newline at end of file
+        st.error(f"Ocorreu um erro ao carregar os dados do dashboard: {e}")
\ No newline at end of file
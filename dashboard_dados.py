@@ -0,0 +1,113 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/dashboard_dados.py
+# Camada de dados do dashboard: o banco devolve apenas os agregados.
+#
+# Antes o dashboard carregava todas as OS em um DataFrame e calculava tudo em
+# pandas a cada rerun. As funções abaixo reproduzem exatamente os mesmos
+# números (inclusive as regras de filtro e de TMA) com SUM/GROUP BY.
+
+import pandas as pd
+from datetime import timedelta
+from sqlalchemy import text
+
+# Os agregados vêm do consolidado kpi_diario (migracoes/0006_kpi_diario.sql),
+# mantido por trigger a cada alteração de OS e, portanto, sempre atualizado
+# inclusive para o dia corrente. Nele as dimensões nulas são gravadas como ''
+# e a data nula como -infinity.
+
+SQL_INDICADORES_GERAIS = text("""
+    SELECT
+        COALESCE(SUM(qtd), 0)::bigint AS total,
+        COALESCE(SUM(qtd) FILTER (WHERE status = 'EM ABERTO'), 0)::bigint AS abertas,
+        COALESCE(SUM(qtd) FILTER (
+            WHERE status IN ('FINALIZADO', 'AGUARDANDO RETIRADA', 'ENTREGUE AO CLIENTE')
+        ), 0)::bigint AS finalizadas,
+        COALESCE(SUM(qtd) FILTER (WHERE status = 'AGUARDANDO PEÇA(S)'), 0)::bigint AS aguardando_peca,
+        SUM(soma_tma_dias) / NULLIF(SUM(qtd_tma), 0) AS tma_dias,
+        MIN(dia) FILTER (WHERE dia <> '-infinity') AS data_min,
+        MAX(dia) FILTER (WHERE dia <> '-infinity') AS data_max
+    FROM kpi_diario
+""")
+
+SQL_TECNICOS_COM_OS = text("SELECT DISTINCT tecnico FROM kpi_diario WHERE tecnico <> ''")
+
+# Uma única leitura para os quatro gráficos: GROUPING SETS devolve as
+# contagens por técnico, secretaria e categoria, o TMA por técnico e o total.
+SQL_AGREGADOS_PERIODO = """
+    SELECT
+        GROUPING(tecnico, secretaria, categoria) AS grupo,
+        tecnico, secretaria, categoria,
+        COALESCE(SUM(qtd), 0)::bigint AS qtd,
+        COALESCE(SUM(qtd_tma), 0)::bigint AS qtd_tma,
+        SUM(soma_tma_dias) / NULLIF(SUM(qtd_tma), 0) AS tma_dias
+    FROM (
+        SELECT NULLIF(tecnico, '') AS tecnico, NULLIF(secretaria, '') AS secretaria,
+               NULLIF(categoria, '') AS categoria, qtd, qtd_tma, soma_tma_dias
+        FROM kpi_diario
+        WHERE {where}
+    ) base
+    GROUP BY GROUPING SETS ((tecnico), (secretaria), (categoria), ())
+"""
+
+# Valores de GROUPING(tecnico, secretaria, categoria) para cada conjunto
+_GRUPO_TECNICO = 0b011
+_GRUPO_SECRETARIA = 0b101
+_GRUPO_CATEGORIA = 0b110
+_GRUPO_TOTAL = 0b111
+
+
+def carregar_indicadores_gerais(conn):
+    """Totais, TMA geral e intervalo de datas de todas as OS (sem filtro)."""
+    with conn.connect() as con:
+        row = con.execute(SQL_INDICADORES_GERAIS).mappings().one()
+    indicadores = dict(row)
+    if indicadores["tma_dias"] is not None:
+        indicadores["tma_dias"] = float(indicadores["tma_dias"])
+    return indicadores
+
+
+def listar_tecnicos_com_os(conn):
+    """Técnicos que possuem ao menos uma OS, em ordem alfabética."""
+    with conn.connect() as con:
+        return sorted(r[0] for r in con.execute(SQL_TECNICOS_COM_OS))
+
+
+def carregar_agregados_periodo(conn, data_inicio, data_fim, tecnico=None):
+    """
+    Agregados dos gráficos para o período (e técnico, se informado).
+    Retorna um dict com total, qtd_tma e os DataFrames/Series por técnico,
+    TMA por técnico, por secretaria e por categoria.
+    """
+    # Mesma regra do filtro original: a data final avança um dia
+    where = ["dia >= :data_inicio", "dia <= :data_fim"]
+    params = {"data_inicio": data_inicio, "data_fim": data_fim + timedelta(days=1)}
+    if tecnico:
+        where.append("tecnico = :tecnico")
+        params["tecnico"] = tecnico
+
+    query = text(SQL_AGREGADOS_PERIODO.format(where=" AND ".join(where)))
+    with conn.connect() as con:
+        df = pd.DataFrame(con.execute(query, params).mappings().all(),
+                          columns=["grupo", "tecnico", "secretaria", "categoria", "qtd", "qtd_tma", "tma_dias"])
+
+    total = df[df["grupo"] == _GRUPO_TOTAL]
+    por_tecnico = df[(df["grupo"] == _GRUPO_TECNICO) & df["tecnico"].notna()]
+    por_secretaria = df[(df["grupo"] == _GRUPO_SECRETARIA) & df["secretaria"].notna()]
+    por_categoria = df[(df["grupo"] == _GRUPO_CATEGORIA) & df["categoria"].notna()]
+
+    # TMA por técnico no mesmo formato do groupby original (índice ordenado, depois por valor)
+    tma = por_tecnico[por_tecnico["qtd_tma"] > 0]
+    tma_por_tecnico = (
+        pd.Series(tma["tma_dias"].astype(float).values, index=pd.Index(tma["tecnico"].values, name="tecnico"),
+                  name="tempo_atendimento_dias")
+        .sort_index()
+        .sort_values()
+    )
+
+    return {
+        "total": int(total["qtd"].iloc[0]) if not total.empty else 0,
+        "qtd_tma": int(total["qtd_tma"].iloc[0]) if not total.empty else 0,
+        "por_tecnico": por_tecnico[["tecnico", "qtd"]].reset_index(drop=True),
+        "tma_por_tecnico": tma_por_tecnico,
+        "por_secretaria": por_secretaria[["secretaria", "qtd"]].reset_index(drop=True),
+        "por_categoria": por_categoria[["categoria", "qtd"]].reset_index(drop=True),
+    }
@@ -1,13 +1,137 @@
 # CÓDIGO COMPLETO E CORRIGIDO PARA: sistema_os_crud-main/database.py
+#
+# Engine único do processo. As páginas recebem sempre o mesmo engine por
+# get_connection() e apenas emprestam conexões do pool (with conn.connect()):
+# nunca chamam dispose(), que descartaria as conexões de todas as sessões.
+# Tamanho do pool, statement_timeout e application_name vêm de config.py (env).
 
-import os
+import threading
 import time
-from sqlalchemy import create_engine, text
-from sqlalchemy.orm import sessionmaker, Session
-from sqlalchemy.exc import OperationalError
+from collections import deque
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL
+from sqlalchemy.exc import OperationalError, TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
 from datetime import datetime
+from contadores import proximo_numero
+from config import (
+    DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT,
+    DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_RECYCLE, DB_POOL_TIMEOUT,
+    DB_STATEMENT_TIMEOUT_MS, DB_APPLICATION_NAME,
+)
 
 _engine = None
+_lock_inicializacao = threading.Lock()
+
+
+class _MetricasPool:
+    """Contadores do pool alimentados pelos eventos do SQLAlchemy."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.conexoes_criadas = 0
+        self.invalidadas = 0
+        self.esgotamentos = 0
+        # Tempo para obter uma conexão (fila do pool + pre_ping + conexão nova)
+        self.esperas = deque(maxlen=1000)
+
+    def registrar_espera(self, segundos):
+        with self.lock:
+            self.esperas.append(segundos)
+
+
+_metricas = _MetricasPool()
+
+
+class _PoolMedido(QueuePool):
+    """QueuePool que mede o tempo de obtenção de cada conexão e conta os esgotamentos."""
+
+    def connect(self):
+        inicio = time.perf_counter()
+        try:
+            con = super().connect()
+        except PoolTimeoutError:
+            with _metricas.lock:
+                _metricas.esgotamentos += 1
+            raise
+        _metricas.registrar_espera(time.perf_counter() - inicio)
+        return con
+
+
+def _contar(atributo):
+    def ouvinte(*_):
+        with _metricas.lock:
+            setattr(_metricas, atributo, getattr(_metricas, atributo) + 1)
+    return ouvinte
+
+
+def criar_engine():
+    """Cria o engine compartilhado com o pool e os parâmetros de sessão do config."""
+    url = URL.create(
+        "postgresql+psycopg2",
+        username=DB_USER,
+        password=DB_PASSWORD,
+        host=DB_HOST,
+        port=int(DB_PORT),
+        database=DB_NAME,
+    )
+    engine = create_engine(
+        url,
+        poolclass=_PoolMedido,
+        pool_pre_ping=True,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_recycle=DB_POOL_RECYCLE,
+        pool_timeout=DB_POOL_TIMEOUT,
+        connect_args={
+            "application_name": DB_APPLICATION_NAME,
+            "options": f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}",
+        },
+    )
+    event.listen(engine.pool, "connect", _contar("conexoes_criadas"))
+    event.listen(engine.pool, "checkout", _contar("checkouts"))
+    event.listen(engine.pool, "invalidate", _contar("invalidadas"))
+    return engine
+
+
+def inicializar_engine(tentativas=10, intervalo=2):
+    """
+    Cria o engine, aguarda o banco responder, aplica as migrações pendentes e
+    liga a medição dos comandos SQL.
+    """
+    with _lock_inicializacao:
+        # Já criado por outra chamada (app.py ou /healthz do monitoramento)
+        if _engine is not None:
+            return _engine
+        return _inicializar(tentativas, intervalo)
+
+
+def _inicializar(tentativas, intervalo):
+    global _engine
+    for i in range(tentativas):
+        try:
+            engine = criar_engine()
+            with engine.connect() as connection:
+                connection.execute(text("SELECT 1"))
+
+            from migrador import aplicar_migracoes
+            aplicar_migracoes(engine)
+
+            # Depois das migrações: a tabela de métricas já existe
+            from instrumentacao import instalar_ganchos_sql
+            instalar_ganchos_sql(engine)
+
+            _engine = engine
+            return engine
+        except OperationalError as e:
+            # A próxima tentativa cria outro engine: fecha o pool desta
+            engine.dispose()
+            print(f"Tentativa {i + 1} de {tentativas} falhou: {e}")
+            if i < tentativas - 1:
+                time.sleep(intervalo)
+            else:
+                raise
 
 
 def get_connection():
@@ -16,18 +140,41 @@ def get_connection():
     return _engine
 
 
+def _percentil_ms(valores_ordenados, p):
+    if not valores_ordenados:
+        return None
+    indice = min(len(valores_ordenados) - 1, int(round(p * (len(valores_ordenados) - 1))))
+    return round(valores_ordenados[indice] * 1000, 2)
+
+
+def metricas_pool():
+    """Situação atual do pool e contadores acumulados, para monitoramento."""
+    pool = get_connection().pool
+    with _metricas.lock:
+        esperas = sorted(_metricas.esperas)
+        contadores = {
+            "checkouts": _metricas.checkouts,
+            "conexoes_criadas": _metricas.conexoes_criadas,
+            "invalidadas": _metricas.invalidadas,
+            "esgotamentos": _metricas.esgotamentos,
+        }
+    return {
+        "tamanho": pool.size(),
+        "em_uso": pool.checkedout(),
+        "ociosas": pool.checkedin(),
+        # overflow() é negativo enquanto o pool não enche
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": DB_MAX_OVERFLOW,
+        **contadores,
+        "espera_p50_ms": _percentil_ms(esperas, 0.50),
+        "espera_p95_ms": _percentil_ms(esperas, 0.95),
+        "espera_max_ms": _percentil_ms(esperas, 1.0),
+    }
+
+
 def gerar_proximo_numero_os(con, table_name):
-    ano_atual = datetime.now().strftime('%y')
-    sufixo_ano = f"%-{ano_atual}"
-    query = text(f"""
-        SELECT COALESCE(MAX(CAST(SPLIT_PART(numero, '-', 1) AS INTEGER)), 0)
-        FROM {table_name}
-        WHERE numero LIKE :sufixo
-    """)
-    resultado = con.execute(query, {"sufixo": sufixo_ano}).scalar()
-    proximo_sequencial = resultado + 1
-    novo_numero_os = f"{proximo_sequencial}-{ano_atual}"
-    return novo_numero_os
+    """Gera o próximo número de OS (formato SEQUENCIAL-AA) usando o contador por ano."""
+    return proximo_numero(con, table_name)
 
 
 def gerar_proximo_numero_recarga(con):
@@ -43,167 +190,3 @@ def gerar_proximo_numero_recarga(con):
     proximo_sequencial = resultado + 1
     novo_numero = f"{ano_atual}-{proximo_sequencial:04d}"
     return novo_numero
-
-
-def init_db(engine):
-    try:
-        with Session(engine) as session:
-            # --- 1. CRIAÇÃO DAS TABELAS EXISTENTES ---
-            session.execute(text("""
-                CREATE TABLE IF NOT EXISTS os_interna (
-                    id SERIAL PRIMARY KEY,
-                    numero VARCHAR(255) UNIQUE,
-                    secretaria VARCHAR(255),
-                    setor VARCHAR(255),
-                    data DATE,
-                    hora TIME,
-                    solicitante VARCHAR(255),
-                    telefone VARCHAR(255),
-                    solicitacao_cliente TEXT,
-                    categoria VARCHAR(255),
-                    patrimonio VARCHAR(255),
-                    equipamento VARCHAR(255),
-                    descricao TEXT,
-                    servico_executado TEXT,
-                    status VARCHAR(255),
-                    data_finalizada TIMESTAMP WITH TIME ZONE,
-                    data_retirada TIMESTAMP WITH TIME ZONE,
-                    retirada_por VARCHAR(255),
-                    tecnico VARCHAR(255),
-                    registrado_por VARCHAR(100),
-                    laudo_filename VARCHAR(255),
-                    laudo_pdf BYTEA
-                )
-            """))
-
-            session.execute(text("""
-                CREATE TABLE IF NOT EXISTS os_externa (
-                    id SERIAL PRIMARY KEY,
-                    numero VARCHAR(255) UNIQUE,
-                    secretaria VARCHAR(255),
-                    setor VARCHAR(255),
-                    data DATE,
-                    hora TIME,
-                    solicitante VARCHAR(255),
-                    telefone VARCHAR(255),
-                    solicitacao_cliente TEXT,
-                    categoria VARCHAR(255),
-                    patrimonio VARCHAR(255),
-                    equipamento VARCHAR(255),
-                    descricao TEXT,
-                    servico_executado TEXT,
-                    status VARCHAR(255),
-                    data_finalizada TIMESTAMP WITH TIME ZONE,
-                    data_retirada TIMESTAMP WITH TIME ZONE,
-                    retirada_por VARCHAR(255),
-                    tecnico VARCHAR(255),
-                    registrado_por VARCHAR(100),
-                    laudo_filename VARCHAR(255),
-                    laudo_pdf BYTEA
-                )
-            """))
-
-            session.execute(text("""
-                CREATE TABLE IF NOT EXISTS equipamentos (
-                    id SERIAL PRIMARY KEY,
-                    categoria VARCHAR(255) NOT NULL,
-                    patrimonio VARCHAR(255),
-                    hostname VARCHAR(255) NOT NULL,
-                    especificacao TEXT NOT NULL,
-                    secretaria VARCHAR(255) NOT NULL,
-                    setor VARCHAR(255),
-                    localizacao_fisica VARCHAR(255),
-                    ip VARCHAR(255) UNIQUE,
-                    mac VARCHAR(255) UNIQUE,
-                    subrede VARCHAR(255),
-                    gateway VARCHAR(255),
-                    dns VARCHAR(255),
-                    numero_serie VARCHAR(255),
-                    observacoes TEXT,
-                    data_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                )
-            """))
-
-            session.execute(text("""
-                CREATE TABLE IF NOT EXISTS laudos (
-                    id SERIAL PRIMARY KEY,
-                    tipo_os VARCHAR(50) NOT NULL,
-                    numero_os VARCHAR(255) NOT NULL,
-                    estado_conservacao VARCHAR(50),
-                    diagnostico TEXT,
-                    equipamento_completo VARCHAR(20),
-                    observacoes TEXT,
-                    tecnico VARCHAR(255) NOT NULL,
-                    status VARCHAR(100) NOT NULL DEFAULT 'PENDENTE',
-                    data_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                    data_atendimento TIMESTAMP WITH TIME ZONE
-                )
-            """))
-
-            session.execute(text("""
-                CREATE TABLE IF NOT EXISTS usuarios (
-                    id SERIAL PRIMARY KEY,
-                    username VARCHAR(100) UNIQUE NOT NULL,
-                    password_hash TEXT NOT NULL,
-                    role VARCHAR(50) NOT NULL CHECK (role IN ('admin', 'tecnico', 'administrativo', 'tecnico_recarga')),
-                    display_name VARCHAR(255),
-                    data_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                )
-            """))
-
-            # --- RECRIAR TABELA RECARGAS (dropar a antiga e criar a nova) ---
-            session.execute(text("DROP TABLE IF EXISTS recargas CASCADE"))
-            session.execute(text("""
-                CREATE TABLE IF NOT EXISTS recargas (
-                    id SERIAL PRIMARY KEY,
-                    numero_recarga VARCHAR(50) UNIQUE NOT NULL,
-                    -- Data e hora de abertura (automáticas)
-                    data_abertura DATE NOT NULL,
-                    hora_abertura TIME NOT NULL,
-                    -- Localização
-                    secretaria VARCHAR(100) NOT NULL,
-                    localizacao VARCHAR(255) NOT NULL,
-                    -- Insumo
-                    insumo VARCHAR(255) NOT NULL,
-                    -- Status simplificado
-                    status VARCHAR(50) NOT NULL DEFAULT 'EM ABERTO'
-                        CHECK (status IN ('EM ABERTO', 'AGUARDANDO INSUMO', 'RECARGA FEITA')),
-                    -- Responsável e metadados
-                    responsavel VARCHAR(100),
-                    data_atualizacao TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-                    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
-                )
-            """))
-
-            # --- 2. MIGRAÇÕES AUTOMÁTICAS ---
-            session.execute(text("ALTER TABLE os_interna ADD COLUMN IF NOT EXISTS registrado_por VARCHAR(100);"))
-            session.execute(text("ALTER TABLE os_externa ADD COLUMN IF NOT EXISTS registrado_por VARCHAR(100);"))
-            session.execute(text("ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS display_name VARCHAR(255);"))
-
-            # NOVA MIGRAÇÃO: Campo para marcar laudos como visualizados
-            session.execute(text("ALTER TABLE os_interna ADD COLUMN IF NOT EXISTS laudo_visualizado BOOLEAN DEFAULT FALSE;"))
-            session.execute(text("ALTER TABLE os_externa ADD COLUMN IF NOT EXISTS laudo_visualizado BOOLEAN DEFAULT FALSE;"))
-
-            # Migração da tabela LAUDOS
-            session.execute(text("ALTER TABLE laudos DROP COLUMN IF EXISTS componente;"))
-            session.execute(text("ALTER TABLE laudos DROP COLUMN IF EXISTS especificacao;"))
-            session.execute(text("ALTER TABLE laudos DROP COLUMN IF EXISTS link_compra;"))
-            session.execute(text("ALTER TABLE laudos ADD COLUMN IF NOT EXISTS tipo_os VARCHAR(50);"))
-            session.execute(text("ALTER TABLE laudos ADD COLUMN IF NOT EXISTS numero_os VARCHAR(255);"))
-            session.execute(text("ALTER TABLE laudos ADD COLUMN IF NOT EXISTS estado_conservacao VARCHAR(50);"))
-            session.execute(text("ALTER TABLE laudos ADD COLUMN IF NOT EXISTS diagnostico TEXT;"))
-            session.execute(text("ALTER TABLE laudos ADD COLUMN IF NOT EXISTS equipamento_completo VARCHAR(20);"))
-
-            # --- 3. CRIAÇÃO DE ÍNDICES ---
-            session.execute(text("CREATE INDEX IF NOT EXISTS idx_laudos_numero_os ON laudos (numero_os, tipo_os)"))
-            session.execute(text("CREATE INDEX IF NOT EXISTS idx_recargas_numero ON recargas (numero_recarga)"))
-            session.execute(text("CREATE INDEX IF NOT EXISTS idx_recargas_status ON recargas (status)"))
-            session.execute(text("CREATE INDEX IF NOT EXISTS idx_recargas_data ON recargas (data_abertura)"))
-            session.execute(text("CREATE INDEX IF NOT EXISTS idx_recargas_secretaria ON recargas (secretaria)"))
-
-            session.commit()
-            print("✅ Banco de dados inicializado com sucesso!")
-
-    except Exception as e:
-        print(f"❌ ERRO AO CRIAR AS TABELAS: {e}")
-        raise e
\ No newline at end of file
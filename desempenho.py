@@ -0,0 +1,141 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/desempenho.py
+# Página "Desempenho" (somente admin): tempos por página e por consulta SQL.
+#
+# Os números em memória são deste processo desde a última reinicialização
+# (buffers de instrumentacao.py). Com METRICAS_PERSISTIR=1 a aba Histórico lê
+# a tabela metricas_desempenho, que junta todas as réplicas.
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from cache_consultas import estatisticas
+from database import get_connection, metricas_pool
+from instrumentacao import resumo, resumo_consultas, consultas_mais_lentas, persistencia_ativa
+
+PERIODOS_HISTORICO = {"Última hora": 1, "Últimas 24 horas": 24, "Últimos 7 dias": 24 * 7}
+
+SQL_HISTORICO = text("""
+    SELECT tipo, nome,
+           COUNT(*) AS execucoes,
+           ROUND(percentile_cont(0.5) WITHIN GROUP (ORDER BY duracao_ms)::numeric, 1) AS p50_ms,
+           ROUND(percentile_cont(0.95) WITHIN GROUP (ORDER BY duracao_ms)::numeric, 1) AS p95_ms,
+           ROUND(MAX(duracao_ms)::numeric, 1) AS max_ms,
+           ROUND(SUM(duracao_ms)::numeric, 1) AS total_ms
+    FROM metricas_desempenho
+    WHERE registrado_em >= CURRENT_TIMESTAMP - make_interval(hours => :horas)
+    GROUP BY tipo, nome
+    ORDER BY total_ms DESC
+    LIMIT 200
+""")
+
+_COLUNAS_TEMPOS = {
+    "nome": st.column_config.TextColumn("Trecho"),
+    "execucoes": st.column_config.NumberColumn("Execuções"),
+    "p50_ms": st.column_config.NumberColumn("p50 (ms)"),
+    "p95_ms": st.column_config.NumberColumn("p95 (ms)"),
+    "max_ms": st.column_config.NumberColumn("Máx. (ms)"),
+    "total_ms": st.column_config.NumberColumn("Total (ms)"),
+}
+
+
+def _tabela_tempos(linhas, rotulo_nome="Trecho"):
+    if not linhas:
+        st.caption("Nenhuma medição ainda.")
+        return
+    colunas = dict(_COLUNAS_TEMPOS, nome=st.column_config.TextColumn(rotulo_nome, width="large"))
+    st.dataframe(
+        pd.DataFrame(linhas),
+        column_order=list(_COLUNAS_TEMPOS),
+        column_config=colunas,
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def render_paginas():
+    tempos = resumo()
+    st.markdown("##### Páginas")
+    st.caption("`pagina:` é o script inteiro (menu lateral + página); `render:` só a página.")
+    _tabela_tempos([t for t in tempos if t["nome"].startswith(("pagina:", "render:"))])
+    st.markdown("##### Fragmentos")
+    _tabela_tempos([t for t in tempos if t["nome"].startswith("fragmento:")])
+
+
+def render_consultas():
+    st.caption("Consultas agrupadas pela impressão digital (SQL sem literais), das que mais somam tempo.")
+    _tabela_tempos(resumo_consultas(), rotulo_nome="Consulta")
+
+
+def render_mais_lentas():
+    lentas = consultas_mais_lentas()
+    if not lentas:
+        st.caption("Nenhuma consulta medida ainda.")
+        return
+    st.dataframe(
+        pd.DataFrame(lentas),
+        column_config={
+            "momento": st.column_config.DatetimeColumn("Momento", format="DD/MM/YYYY HH:mm:ss"),
+            "duracao_ms": st.column_config.NumberColumn("Duração (ms)"),
+            "pagina": st.column_config.TextColumn("Página"),
+            "papel": st.column_config.TextColumn("Perfil"),
+            "consulta": st.column_config.TextColumn("Consulta", width="large"),
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def render_conexoes():
+    col1, col2 = st.columns(2)
+    with col1:
+        st.markdown("##### Pool de conexões")
+        st.dataframe(
+            [{"métrica": k, "valor": v} for k, v in metricas_pool().items()],
+            hide_index=True,
+            use_container_width=True,
+        )
+    with col2:
+        st.markdown("##### Cache de consultas")
+        st.dataframe(
+            [{"métrica": k, "valor": v} for k, v in estatisticas().items()],
+            hide_index=True,
+            use_container_width=True,
+        )
+
+
+def render_historico():
+    if not persistencia_ativa():
+        st.info("A gravação no banco está desativada (defina METRICAS_PERSISTIR=1 no ambiente).")
+        return
+    periodo = st.selectbox("Período", list(PERIODOS_HISTORICO), key="desempenho_periodo")
+    try:
+        with get_connection().connect() as con:
+            linhas = [dict(r) for r in con.execute(SQL_HISTORICO, {"horas": PERIODOS_HISTORICO[periodo]}).mappings()]
+    except Exception as e:
+        st.error(f"Erro ao carregar o histórico: {e}")
+        return
+    st.markdown("##### Páginas")
+    _tabela_tempos([l for l in linhas if l["tipo"] == "trecho"])
+    st.markdown("##### Consultas")
+    _tabela_tempos([l for l in linhas if l["tipo"] == "consulta"], rotulo_nome="Consulta")
+
+
+def render():
+    st.markdown("<h3 style='text-align: left;'>Desempenho</h3>", unsafe_allow_html=True)
+    if st.button("🔄 Atualizar"):
+        st.rerun()
+
+    tab_paginas, tab_consultas, tab_lentas, tab_conexoes, tab_historico = st.tabs(
+        ["Páginas", "Consultas", "Mais lentas", "Conexões e cache", "Histórico"]
+    )
+    with tab_paginas:
+        render_paginas()
+    with tab_consultas:
+        render_consultas()
+    with tab_lentas:
+        render_mais_lentas()
+    with tab_conexoes:
+        render_conexoes()
+    with tab_historico:
+        render_historico()
@@ -3,25 +3,34 @@ import streamlit as st
 import pandas as pd
 from sqlalchemy import text
 from database import get_connection
+from consultas import SQL_ESTATISTICAS_EQUIPAMENTOS
+from cache_consultas import consultar, consultar_escalar
+from instrumentacao import medido
+from tabela import selecionar_linha, barra_de_acoes
 from config import SECRETARIAS, CATEGORIAS_EQUIP
 import re
 import math
 
 # --- Funções de Validação ---
+# Expressões compiladas uma vez (bench/micro.py mede as três funções)
+_RE_IP = re.compile(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$")
+_RE_MAC = re.compile(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$")
+_RE_CIDR = re.compile(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}/\d{1,2}$")
+
 def is_valid_ip(ip):
     if not ip:
         return True
-    return re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}$", ip)
+    return _RE_IP.match(ip)
 
 def is_valid_mac(mac):
     if not mac:
         return True
-    return re.match(r"^([0-9A-Fa-f]{2}[:-]){5}([0-9A-Fa-f]{2})$", mac)
+    return _RE_MAC.match(mac)
 
 def is_valid_cidr(cidr):
     if not cidr:
         return True
-    return re.match(r"^\d{1,3}\.\d{1,3}\.\d{1,3}\.\d{1,3}/\d{1,2}$", cidr)
+    return _RE_CIDR.match(cidr)
 
 def check_duplicate(conn, field, value, current_id=None):
     if not value:
@@ -339,14 +348,18 @@ def render_tab_registro(conn):
             st.rerun()
 
 # --- ABA 2: CONSULTA ---
+# A aba de consulta é um fragmento: paginar e abrir modais não refaz a página inteira
+@st.fragment
+@medido("fragmento:equipamentos.consulta")
 def render_tab_consulta(conn):
     st.markdown("### Consulta de Equipamentos")
     
     try:
-        with conn.connect() as con:
-            total_count = con.execute(text("SELECT COUNT(*) FROM equipamentos")).scalar()
-            categorias_count = con.execute(text("SELECT COUNT(DISTINCT categoria) FROM equipamentos")).scalar()
-            secretarias_count = con.execute(text("SELECT COUNT(DISTINCT secretaria) FROM equipamentos")).scalar()
+        # Uma leitura para as três métricas, compartilhada até a próxima gravação em equipamentos
+        estatisticas = consultar(conn, ["equipamentos"], SQL_ESTATISTICAS_EQUIPAMENTOS)[0]
+        total_count = estatisticas["total"]
+        categorias_count = estatisticas["categorias"]
+        secretarias_count = estatisticas["secretarias"]
         
         col1, col2, col3 = st.columns(3)
         with col1:
@@ -409,8 +422,7 @@ def render_tab_consulta(conn):
     
     try:
         count_query = f"SELECT COUNT(*) FROM ({query_base}) as sub"
-        with conn.connect() as con:
-            total_items = con.execute(text(count_query), params).scalar()
+        total_items = consultar_escalar(conn, ["equipamentos"], count_query, params)
         
     except Exception as e:
         st.error(f"Erro ao contar equipamentos filtrados: {e}")
@@ -445,46 +457,35 @@ def render_tab_consulta(conn):
         
         st.markdown("---")
         
-        cols_header = st.columns((1, 1.5, 1.5, 1.5, 1.5, 2, 2))
-        headers = ["Hostname", "Categoria", "Secretaria", "IP", "MAC", "Modelo (resumo)", "Ações"]
-        
-        for col, header in zip(cols_header, headers):
-            col.markdown(f"**{header}**")
+        linha = selecionar_linha(
+            df_equip,
+            f"equip_tabela_{st.session_state.equip_page}",
+            ordem=["hostname", "categoria", "secretaria", "ip", "mac", "especificacao"],
+            colunas={
+                "hostname": "Hostname",
+                "categoria": "Categoria",
+                "secretaria": "Secretaria",
+                "ip": "IP",
+                "mac": "MAC",
+                "especificacao": st.column_config.TextColumn("Modelo (resumo)", width="medium"),
+            },
+        )
         
-        st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
+        acao = barra_de_acoes(
+            linha,
+            [("👁️ Visualizar", "Visualizar"), ("✏️ Editar", "Editar"), ("🗑️ Deletar", "Deletar")],
+            "equip_acoes",
+        )
         
-        for idx, row in df_equip.iterrows():
-            equip_id = row['id']
-            cols_row = st.columns((1, 1.5, 1.5, 1.5, 1.5, 2, 2))
-            
-            cols_row[0].write(str(row.get('hostname', 'N/A')))
-            cols_row[1].write(str(row.get('categoria', 'N/A')))
-            cols_row[2].write(str(row.get('secretaria', 'N/A')))
-            cols_row[3].write(str(row.get('ip', 'N/A')))
-            cols_row[4].write(str(row.get('mac', 'N/A')))
-            
-            spec = str(row.get('especificacao', 'N/A'))
-            spec_resumida = spec[:30] + "..." if len(spec) > 30 else spec
-            cols_row[5].write(spec_resumida)
-            
-            action_col = cols_row[6]
-            col_b1, col_b2, col_b3 = action_col.columns(3)
-            
-            if col_b1.button("👁️", key=f"view_{equip_id}_{idx}", use_container_width=True, help="Visualizar"):
-                show_equipment_details(dict(row))
-            
-            if col_b2.button("✏️", key=f"edit_{equip_id}_{idx}", use_container_width=True, help="Editar"):
-                st.session_state.edit_equip_id = equip_id
-                if 'form_data' in st.session_state:
-                    del st.session_state.form_data
-                st.rerun()
-            
-            if col_b3.button("🗑️", key=f"del_{equip_id}_{idx}", use_container_width=True, type="secondary", help="Deletar"):
-                st.session_state.delete_equip_id = equip_id
-                st.session_state.delete_equip_data = dict(row)
-                st.rerun()
-            
-            st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
+        if acao == "👁️ Visualizar":
+            show_equipment_details(linha)
+        elif acao == "✏️ Editar":
+            st.session_state.edit_equip_id = linha["id"]
+            if 'form_data' in st.session_state:
+                del st.session_state.form_data
+            st.rerun()
+        elif acao == "🗑️ Deletar":
+            confirmar_exclusao(conn, linha["id"], linha)
         
         st.markdown("---")
         if total_pages > 1:
@@ -492,48 +493,36 @@ def render_tab_consulta(conn):
             
             if col_nav1.button("← Anterior", key="prev_equip", disabled=(st.session_state.equip_page <= 1)):
                 st.session_state.equip_page -= 1
-                st.rerun()
+                st.rerun(scope="fragment")
             
             col_nav2.markdown(f"**Página {st.session_state.equip_page} de {total_pages}**")
             
             if col_nav3.button("Próxima →", key="next_equip", disabled=(st.session_state.equip_page >= total_pages)):
                 st.session_state.equip_page += 1
-                st.rerun()
+                st.rerun(scope="fragment")
     
     except Exception as e:
         st.error(f"Erro ao consultar equipamentos: {e}")
         st.exception(e)
 
 # --- MODAL DE CONFIRMAÇÃO ---
-def render_delete_confirmation(conn):
-    if 'delete_equip_id' in st.session_state:
-        equip_id = st.session_state.delete_equip_id
-        equip_data = st.session_state.get('delete_equip_data', {})
-        
-        st.warning("Confirmação de Exclusão")
-        st.write(f"Tem certeza que deseja deletar o equipamento **{equip_data.get('hostname', 'N/A')}** (ID: {equip_id})?")
-        
-        col1, col2 = st.columns(2)
-        if col1.button("Sim, Deletar", type="primary", use_container_width=True):
-            if f_deletar_equipamento(conn, equip_id):
-                del st.session_state.delete_equip_id
-                if 'delete_equip_data' in st.session_state:
-                    del st.session_state.delete_equip_data
-                st.rerun()
-        
-        if col2.button("Cancelar", use_container_width=True):
-            del st.session_state.delete_equip_id
-            if 'delete_equip_data' in st.session_state:
-                del st.session_state.delete_equip_data
+@st.dialog("Confirmação de Exclusão")
+def confirmar_exclusao(conn, equip_id, equip_data):
+    st.write(f"Tem certeza que deseja deletar o equipamento **{equip_data.get('hostname', 'N/A')}** (ID: {equip_id})?")
+    
+    col1, col2 = st.columns(2)
+    if col1.button("Sim, Deletar", type="primary", use_container_width=True):
+        if f_deletar_equipamento(conn, equip_id):
             st.rerun()
+    
+    if col2.button("Cancelar", use_container_width=True):
+        st.rerun()
 
 # --- FUNÇÃO PRINCIPAL ---
 def render():
     conn = get_connection()
     st.title("Gerenciamento de Equipamentos")
     
-    render_delete_confirmation(conn)
-    
     tab1, tab2 = st.tabs(["Registro de Equipamentos", "Consulta de Equipamentos"])
     
     with tab1:
@@ -0,0 +1,234 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/exportacao.py
+# Exportação de consultas em streaming (XLSX, CSV, CSV compactado e Parquet).
+#
+# A consulta é lida por um cursor no servidor (stream_results/yield_per) e as
+# linhas são gravadas em lotes direto em um arquivo temporário: a memória usada
+# não depende do tamanho do resultado. O arquivo é entregue com st.download_button,
+# que exige os bytes completos: nessa etapa o arquivo inteiro fica em memória,
+# por isso ler_e_remover recusa arquivos acima de EXPORTACAO_LIMITE_MB.
+# Só são usadas conexões emprestadas do pool; o engine nunca é descartado aqui.
+
+import csv
+import gzip
+import itertools
+import os
+import tempfile
+from datetime import datetime, date, time
+from decimal import Decimal
+
+import pytz
+import xlsxwriter
+from sqlalchemy import text
+
+from config import EXPORTACAO_LIMITE_MB
+from consultas import SQL_EXPORTACAO_COMPLETA
+from instrumentacao import cronometrar
+
+FORMATOS = {
+    "xlsx": ("Excel (.xlsx)", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+    "csv": ("CSV (.csv)", "text/csv"),
+    "csv.gz": ("CSV compactado (.csv.gz)", "application/gzip"),
+    "parquet": ("Parquet (.parquet)", "application/octet-stream"),
+}
+
+TAMANHO_LOTE = 2000
+
+FUSO_SP = pytz.timezone("America/Sao_Paulo")
+
+
+class ArquivoGrandeDemais(ValueError):
+    """Exportação maior que EXPORTACAO_LIMITE_MB; o temporário já foi removido."""
+
+
+def _normalizar(valor):
+    """Datas com fuso viram horário de São Paulo sem fuso (como na tela); Decimal vira float."""
+    if isinstance(valor, datetime) and valor.tzinfo is not None:
+        return valor.astimezone(FUSO_SP).replace(tzinfo=None)
+    if isinstance(valor, Decimal):
+        return float(valor)
+    return valor
+
+
+def _lotes(conn, sql, params):
+    """Gera (colunas, lote de linhas) lendo a consulta com cursor no servidor."""
+    with conn.connect() as con:
+        result = con.execution_options(yield_per=TAMANHO_LOTE).execute(text(sql), params or {})
+        colunas = list(result.keys())
+        vazio = True
+        for lote in result.partitions():
+            vazio = False
+            yield colunas, [[_normalizar(v) for v in linha] for linha in lote]
+        if vazio:
+            # Sem linhas: o arquivo ainda leva o cabeçalho
+            yield colunas, []
+
+
+def _escrever_xlsx(caminho, planilhas):
+    """`planilhas` é uma lista de (nome da aba, lotes), gravadas uma após a outra."""
+    workbook = xlsxwriter.Workbook(caminho, {"constant_memory": True})
+    formatos = {
+        datetime: workbook.add_format({"num_format": "dd/mm/yyyy hh:mm:ss"}),
+        date: workbook.add_format({"num_format": "dd/mm/yyyy"}),
+        time: workbook.add_format({"num_format": "hh:mm:ss"}),
+    }
+    negrito = workbook.add_format({"bold": True})
+    try:
+        for nome_planilha, lotes in planilhas:
+            worksheet = workbook.add_worksheet(nome_planilha)
+            linha_atual = 0
+            for colunas, lote in lotes:
+                # constant_memory exige escrita linha a linha, em ordem
+                if linha_atual == 0:
+                    worksheet.write_row(0, 0, colunas, negrito)
+                    linha_atual = 1
+                for linha in lote:
+                    for c, valor in enumerate(linha):
+                        if valor is None:
+                            continue
+                        formato = formatos.get(type(valor))
+                        if formato is not None:
+                            worksheet.write_datetime(linha_atual, c, valor, formato)
+                        else:
+                            worksheet.write(linha_atual, c, valor)
+                    linha_atual += 1
+    finally:
+        workbook.close()
+
+
+def _escrever_csv(caminho, lotes, compactado=False):
+    # utf-8-sig para que o Excel reconheça a acentuação ao abrir o CSV
+    abrir = gzip.open if compactado else open
+    with abrir(caminho, "wt", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        cabecalho = False
+        for colunas, lote in lotes:
+            if not cabecalho:
+                writer.writerow(colunas)
+                cabecalho = True
+            writer.writerows(lote)
+
+
+def _tipo_arrow(pa, valores):
+    """Tipo Arrow da coluna a partir do primeiro valor não nulo (texto se indefinido)."""
+    for valor in valores:
+        if valor is None:
+            continue
+        if isinstance(valor, bool):
+            return pa.bool_()
+        if isinstance(valor, int):
+            return pa.int64()
+        if isinstance(valor, float):
+            return pa.float64()
+        if isinstance(valor, datetime):
+            return pa.timestamp("us")
+        if isinstance(valor, date):
+            return pa.date32()
+        if isinstance(valor, time):
+            return pa.time64("us")
+        break
+    return pa.string()
+
+
+def _escrever_parquet(caminho, lotes):
+    # pyarrow só é necessário para esta opção
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    schema = None
+    colunas_vazias = None
+    try:
+        for colunas, lote in lotes:
+            if not lote:
+                # Lote vazio não define tipos: o esquema espera o primeiro com linhas
+                colunas_vazias = colunas_vazias or colunas
+                continue
+            colunas_valores = list(zip(*lote))
+            if schema is None:
+                schema = pa.schema([(nome, _tipo_arrow(pa, valores)) for nome, valores in zip(colunas, colunas_valores)])
+                writer = pq.ParquetWriter(caminho, schema)
+            arrays = []
+            for campo, valores in zip(schema, colunas_valores):
+                if pa.types.is_string(campo.type):
+                    valores = [None if v is None else str(v) for v in valores]
+                arrays.append(pa.array(valores, type=campo.type))
+            writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        if writer is None and colunas_vazias is not None:
+            # Nenhuma linha: arquivo só com as colunas, como texto
+            schema = pa.schema([(nome, pa.string()) for nome in colunas_vazias])
+            writer = pq.ParquetWriter(caminho, schema)
+            writer.write_table(schema.empty_table())
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+def exportar_planilhas(conn, planilhas, formato):
+    """
+    Grava várias consultas em um arquivo temporário no formato pedido.
+    `planilhas` é uma lista de (nome, sql, params): no XLSX cada uma vira uma aba;
+    nos demais formatos os resultados são concatenados (mesmas colunas).
+    Retorna o caminho do arquivo; quem chama é responsável por removê-lo.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+
+    fd, caminho = tempfile.mkstemp(suffix=f".{formato}", prefix="exportacao_")
+    os.close(fd)
+    # Geradores: cada consulta só é aberta quando o escritor chega nela
+    abas = [(nome, _lotes(conn, sql, params)) for nome, sql, params in planilhas]
+    lotes = itertools.chain.from_iterable(l for _, l in abas)
+    try:
+        with cronometrar("exportacao_segundos", formato=formato):
+            if formato == "xlsx":
+                _escrever_xlsx(caminho, abas)
+            elif formato in ("csv", "csv.gz"):
+                _escrever_csv(caminho, lotes, compactado=formato == "csv.gz")
+            else:
+                _escrever_parquet(caminho, lotes)
+    except Exception:
+        os.remove(caminho)
+        raise
+    return caminho
+
+
+def exportar_consulta(conn, sql, params, formato, nome_planilha="Dados"):
+    """
+    Executa a consulta e grava o resultado em um arquivo temporário no formato pedido.
+    Retorna o caminho do arquivo; quem chama é responsável por removê-lo.
+    """
+    return exportar_planilhas(conn, [(nome_planilha, sql, params)], formato)
+
+
+def exportar_todas_os(conn, formato):
+    """
+    Exportação completa das OS: no XLSX, abas 'OS Interna' e 'OS Externa';
+    nos demais formatos, um único arquivo ordenado por tipo (coluna 'tipo').
+    """
+    if formato == "xlsx":
+        planilhas = [
+            (f"OS {tipo}", SQL_EXPORTACAO_COMPLETA + " WHERE tipo = :tipo ORDER BY id", {"tipo": tipo})
+            for tipo in ("Interna", "Externa")
+        ]
+    else:
+        planilhas = [("Ordens de Serviço", SQL_EXPORTACAO_COMPLETA + " ORDER BY tipo, id", None)]
+    return exportar_planilhas(conn, planilhas, formato)
+
+
+def ler_e_remover(caminho):
+    """
+    Lê o arquivo gerado para o st.download_button e remove o temporário.
+    O arquivo é lido inteiro para a memória: acima de EXPORTACAO_LIMITE_MB
+    levanta ArquivoGrandeDemais em vez de ler.
+    """
+    try:
+        tamanho_mb = os.path.getsize(caminho) / (1024 * 1024)
+        if tamanho_mb > EXPORTACAO_LIMITE_MB:
+            raise ArquivoGrandeDemais(
+                f"O arquivo gerado tem {tamanho_mb:.0f} MB, acima do limite de {EXPORTACAO_LIMITE_MB} MB. "
+                "Use o CSV compactado ou o Parquet, ou restrinja a consulta."
+            )
+        with open(caminho, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(caminho)
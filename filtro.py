@@ -3,6 +3,9 @@
 import streamlit as st
 import pandas as pd
 from database import get_connection
+from cache_consultas import consultar_escalar
+from instrumentacao import medido
+from tabela import selecionar_linha, barra_de_acoes
 from sqlalchemy import text
 from config import (
     SECRETARIAS,
@@ -11,8 +14,21 @@ from config import (
     EQUIPAMENTOS,
     CATEGORIAS,
 )
-from import_export import exportar_filtrados_para_excel
-import base64
+from exportacao import FORMATOS, ArquivoGrandeDemais, exportar_consulta, ler_e_remover
+from anexos import listar_anexos, ler_anexo
+from consultas import (
+    SQL_FILTRO_EXPORTACAO,
+    SQL_FILTRO_LISTAGEM,
+    SQL_FILTRO_CONTAGEM,
+    SQL_FILTRO_ORDEM,
+    SQL_FILTRO_ORDEM_INVERSA,
+    SQL_BUSCA_CONDICAO,
+    SQL_BUSCA_RELEVANCIA,
+    SQL_BUSCA_LISTAGEM,
+    SQL_BUSCA_ORDEM,
+    SQL_BUSCA_ORDEM_INVERSA,
+    SQL_OS_POR_ID,
+)
 import math
 import pytz
 from datetime import datetime
@@ -64,6 +80,102 @@ def f_atualizar_os(conn, table_name, os_id, dados):
         return False
 
 
+ITENS_POR_PAGINA = 10
+
+
+def _montar_consulta(base, spec, extra_where=None):
+    """Aplica a especificação do filtro (cláusulas WHERE + parâmetros) a uma consulta base."""
+    where = list(spec["where"]) + (extra_where or [])
+    if where:
+        return base + " WHERE " + " AND ".join(where)
+    return base
+
+
+def f_contar_os(conn, spec):
+    """Total de OS que atendem ao filtro."""
+    return consultar_escalar(conn, ["ordens_servico"], _montar_consulta(SQL_FILTRO_CONTAGEM, spec), spec["params"])
+
+
+def f_buscar_pagina(conn, spec, modo, chave=None, limite=ITENS_POR_PAGINA):
+    """
+    Busca uma página da listagem por keyset sobre (ordenacao, id), ou sobre
+    (relevância, ordenacao, id) quando há busca livre (ver _chave).
+    modo: 'primeira', 'ultima', 'depois' (página seguinte à chave) ou 'antes' (anterior à chave).
+    """
+    params = dict(spec["params"])
+    if "busca" in params:
+        base, ordem, ordem_inversa = SQL_BUSCA_LISTAGEM, SQL_BUSCA_ORDEM, SQL_BUSCA_ORDEM_INVERSA
+        colunas_chave = f"({SQL_BUSCA_RELEVANCIA}, ordenacao, id)"
+        valores_chave = "(CAST(:k_relevancia AS real), CAST(:k_ordenacao AS timestamp), :k_id)"
+        nomes_chave = ("k_relevancia", "k_ordenacao", "k_id")
+    else:
+        base, ordem, ordem_inversa = SQL_FILTRO_LISTAGEM, SQL_FILTRO_ORDEM, SQL_FILTRO_ORDEM_INVERSA
+        colunas_chave, valores_chave = "(ordenacao, id)", "(CAST(:k_ordenacao AS timestamp), :k_id)"
+        nomes_chave = ("k_ordenacao", "k_id")
+
+    extra_where = []
+    if modo == "depois":
+        extra_where.append(f"{colunas_chave} < {valores_chave}")
+    elif modo == "antes":
+        extra_where.append(f"{colunas_chave} > {valores_chave}")
+    if chave is not None:
+        params.update(zip(nomes_chave, chave))
+
+    # Para trás (anterior/última) a consulta percorre o índice no sentido inverso
+    invertida = modo in ("antes", "ultima")
+    query = _montar_consulta(base, spec, extra_where)
+    query += (ordem_inversa if invertida else ordem) + " LIMIT :limite"
+    params["limite"] = limite
+
+    with conn.connect() as con:
+        linhas = [dict(r._mapping) for r in con.execute(text(query), params)]
+    if invertida:
+        linhas.reverse()
+    return linhas
+
+
+def f_buscar_os(conn, tipo, os_id):
+    """Dados completos de uma OS (usado ao abrir os modais)."""
+    with conn.connect() as con:
+        row = con.execute(SQL_OS_POR_ID, {"tipo": tipo, "id": int(os_id)}).fetchone()
+    return dict(row._mapping) if row else None
+
+
+def carregar_pagina_filtro(conn, modo, chave=None):
+    """Atualiza contagem e página atual do filtro na sessão (a página é refeita do mesmo ponto ao recarregar)."""
+    spec = st.session_state.filtro_spec
+    total = f_contar_os(conn, spec)
+    total_pages = max(1, math.ceil(total / ITENS_POR_PAGINA))
+
+    if modo == "ultima":
+        limite = total - (total_pages - 1) * ITENS_POR_PAGINA or ITENS_POR_PAGINA
+        pagina = f_buscar_pagina(conn, spec, modo, limite=limite)
+    else:
+        pagina = f_buscar_pagina(conn, spec, modo, chave)
+
+    # Registros removidos podem esvaziar a página: volta para o início
+    if not pagina and modo != "primeira":
+        modo, chave = "primeira", None
+        st.session_state.filtro_page = 1
+        pagina = f_buscar_pagina(conn, spec, modo)
+
+    st.session_state.filtro_total = total
+    st.session_state.filtro_pagina = pagina
+    st.session_state.filtro_consulta_pagina = {"modo": modo, "chave": chave}
+
+
+def _chave(linha):
+    # OS sem data têm ordenacao = 'infinity', que o psycopg2 devolve como
+    # datetime.max; enviado de volta, viraria 9999-12-31 23:59:59.999999,
+    # abaixo de 'infinity', e a página seguinte pularia as demais OS sem data
+    ordenacao = linha["ordenacao"]
+    if ordenacao == datetime.max:
+        ordenacao = "infinity"
+    if "relevancia" in linha:
+        return (linha["relevancia"], ordenacao, linha["id"])
+    return (ordenacao, linha["id"])
+
+
 # ============================================================================
 # FUNÇÃO DE LIMPEZA DE ESTADOS DOS MODAIS
 # ============================================================================
@@ -72,17 +184,20 @@ def limpar_estados_modais():
     """Limpa todos os estados relacionados aos modais para evitar conflitos."""
     if "view_os_id" in st.session_state:
         del st.session_state.view_os_id
-    if "edit_os_data" in st.session_state:
-        del st.session_state.edit_os_data
-    if "delete_os_data" in st.session_state:
-        del st.session_state.delete_os_data
+    if "edit_os_id" in st.session_state:
+        del st.session_state.edit_os_id
+    if "delete_os_id" in st.session_state:
+        del st.session_state.delete_os_id
+    # PDFs carregados nos detalhes: não ficam na sessão depois que o modal fecha
+    for chave in [c for c in st.session_state if str(c).startswith("anexo_bytes_")]:
+        del st.session_state[chave]
 
 
 # ============================================================================
 # FUNÇÕES DE EXIBIÇÃO
 # ============================================================================
 
-def display_os_details(os_data):
+def display_os_details(os_data, conn):
     """Exibe os detalhes de uma OS."""
     st.markdown(f"#### Detalhes Completos da OS: {os_data.get('numero', 'N/A')}")
 
@@ -158,20 +273,26 @@ def display_os_details(os_data):
         if pd.notna(retirada_por):
             st.write(f"**Nome do recebedor:** {retirada_por}")
 
-    if os_data.get("laudo_pdf") is not None and len(os_data.get("laudo_pdf")) > 0:
+    anexos = listar_anexos(conn, os_data.get("tipo"), os_data.get("id"))
+    if anexos:
         st.markdown("---")
         st.markdown("#### Laudo Técnico (Anexo PDF Antigo)")
-        pdf_data = (
-            bytes(os_data["laudo_pdf"])
-            if isinstance(os_data["laudo_pdf"], memoryview)
-            else os_data["laudo_pdf"]
-        )
-        st.download_button(
-            label=f"Baixar Laudo PDF ({os_data.get('laudo_filename')})",
-            data=pdf_data,
-            file_name=os_data.get('laudo_filename'),
-            mime="application/pdf",
-        )
+        for anexo in anexos:
+            # Dois passos: "Carregar" lê o conteúdo do banco e o guarda na sessão,
+            # "Baixar" entrega o arquivo. Os bytes saem da sessão quando o modal
+            # é fechado ou outra ação é escolhida (limpar_estados_modais)
+            chave = f"anexo_bytes_{anexo['id']}"
+            if chave not in st.session_state:
+                if st.button(f"Carregar Laudo PDF ({anexo['nome_arquivo']})", key=f"anexo_{anexo['id']}"):
+                    st.session_state[chave] = ler_anexo(conn, anexo["id"])
+            if chave in st.session_state:
+                st.download_button(
+                    label=f"💾 Baixar Laudo PDF ({anexo['nome_arquivo']})",
+                    data=st.session_state[chave],
+                    file_name=anexo["nome_arquivo"],
+                    mime=anexo["mime"],
+                    key=f"salvar_anexo_{anexo['id']}",
+                )
 
 
 # ============================================================================
@@ -181,7 +302,7 @@ def display_os_details(os_data):
 @st.dialog("Detalhes Completos da Ordem de Serviço", width="large")
 def modal_detalhes(os_data, conn):
     """Modal para exibir detalhes completos da OS."""
-    display_os_details(os_data)
+    display_os_details(os_data, conn)
     st.markdown("---")
     st.markdown("#### Laudos de Avaliação Associados")
 
@@ -357,7 +478,7 @@ def modal_editar(os_data, conn):
 
                 if f_atualizar_os(conn, table_name, os_data.get("id"), dados_atualizacao):
                     limpar_estados_modais()
-                    st.session_state.df_filtrado = pd.DataFrame()
+                    st.session_state.filtro_recarregar = True
                     st.rerun()
 
     st.markdown("---")
@@ -381,7 +502,7 @@ def modal_excluir(os_data, conn):
     if col1.button("Confirmar Exclusão", type="primary", use_container_width=True):
         if f_deletar_os(conn, os_data.get("id"), os_data.get("tipo")):
             limpar_estados_modais()
-            st.session_state.df_filtrado = pd.DataFrame()
+            st.session_state.filtro_recarregar = True
             st.rerun()
 
     if col2.button("Cancelar", use_container_width=True, key="cancel_delete"):
@@ -409,6 +530,12 @@ def render():
             placeholder="Digite o número da OS para buscar diretamente",
             help="Filtrar por número específico da Ordem de Serviço"
         )
+        f_busca = st.text_input(
+            "Busca livre",
+            placeholder="Ex: impressora atolando papel saúde",
+            help="Procura as palavras no pedido, descrição, serviço executado, equipamento e secretaria "
+                 "(sem diferenciar acentos). Resultados ordenados pela relevância."
+        )
 
         col1, col2 = st.columns(2)
 
@@ -437,6 +564,7 @@ def render():
     # Criar snapshot dos filtros atuais
     filtros_atuais = {
         "numero_os": f_numero_os,
+        "busca": f_busca,
         "tipo": f_tipo,
         "status": tuple(f_status) if f_status else (),
         "secretaria": tuple(f_secretaria) if f_secretaria else (),
@@ -456,217 +584,205 @@ def render():
         st.session_state.filtros_anteriores = filtros_atuais
 
     # Executar filtro
-    if filtrar or "df_filtrado" in st.session_state:
-        if filtrar:
-            # Limpar estados dos modais ao aplicar novos filtros
-            limpar_estados_modais()
+    if filtrar:
+        # Limpar estados dos modais ao aplicar novos filtros
+        limpar_estados_modais()
 
-            where_clauses = []
-            params = {}
-
-            if f_numero_os and f_numero_os.strip():
-                where_clauses.append("numero = :numero_os")
-                params["numero_os"] = f_numero_os.strip()
-
-            if f_status:
-                placeholders = ",".join([f":st{i}" for i in range(len(f_status))])
-                where_clauses.append(f"status IN ({placeholders})")
-                for i, st_val in enumerate(f_status):
-                    params[f"st{i}"] = st_val
-
-            if f_secretaria:
-                placeholders = ",".join([f":sec{i}" for i in range(len(f_secretaria))])
-                where_clauses.append(f"secretaria IN ({placeholders})")
-                for i, sec in enumerate(f_secretaria):
-                    params[f"sec{i}"] = sec
-
-            if f_tecnico:
-                placeholders = ",".join([f":tec{i}" for i in range(len(f_tecnico))])
-                where_clauses.append(f"tecnico IN ({placeholders})")
-                for i, tec in enumerate(f_tecnico):
-                    params[f"tec{i}"] = tec
-
-            if f_categoria:
-                placeholders = ",".join([f":cat{i}" for i in range(len(f_categoria))])
-                where_clauses.append(f"categoria IN ({placeholders})")
-                for i, cat in enumerate(f_categoria):
-                    params[f"cat{i}"] = cat
-
-            if f_equipamento:
-                placeholders = ",".join([f":eq{i}" for i in range(len(f_equipamento))])
-                where_clauses.append(f"equipamento IN ({placeholders})")
-                for i, eq in enumerate(f_equipamento):
-                    params[f"eq{i}"] = eq
-
-            # Filtros de data (só aplicar se não houver busca por número)
-            if not (f_numero_os and f_numero_os.strip()):
-                if f_data_inicio:
-                    where_clauses.append("data >= :data_inicio")
-                    params["data_inicio"] = f_data_inicio
-
-                if f_data_fim:
-                    where_clauses.append("data <= :data_fim")
-                    params["data_fim"] = f_data_fim
-
-            where_str = ""
-            if where_clauses:
-                where_str = " WHERE " + " AND ".join(where_clauses)
-
-            query_interna_base = "SELECT *, 'Interna' as tipo FROM os_interna"
-            query_externa_base = "SELECT *, 'Externa' as tipo FROM os_externa"
-            queries_to_union = []
-
-            if f_tipo == "Interna" or f_tipo == "Todos":
-                queries_to_union.append(f"({query_interna_base}{where_str})")
-
-            if f_tipo == "Externa" or f_tipo == "Todos":
-                queries_to_union.append(f"({query_externa_base}{where_str})")
-
-            if not queries_to_union:
-                st.warning("Nenhuma OS encontrada para o tipo selecionado.")
-                st.session_state.df_filtrado = pd.DataFrame()
-                st.session_state.filtro_page = 1
-                return
+        where_clauses = []
+        params = {}
+
+        if f_numero_os and f_numero_os.strip():
+            where_clauses.append("numero = :numero_os")
+            params["numero_os"] = f_numero_os.strip()
+
+        if f_busca and f_busca.strip():
+            where_clauses.append(SQL_BUSCA_CONDICAO)
+            params["busca"] = f_busca.strip()
+
+        if f_status:
+            placeholders = ",".join([f":st{i}" for i in range(len(f_status))])
+            where_clauses.append(f"status IN ({placeholders})")
+            for i, st_val in enumerate(f_status):
+                params[f"st{i}"] = st_val
+
+        if f_secretaria:
+            placeholders = ",".join([f":sec{i}" for i in range(len(f_secretaria))])
+            where_clauses.append(f"secretaria IN ({placeholders})")
+            for i, sec in enumerate(f_secretaria):
+                params[f"sec{i}"] = sec
+
+        if f_tecnico:
+            placeholders = ",".join([f":tec{i}" for i in range(len(f_tecnico))])
+            where_clauses.append(f"tecnico IN ({placeholders})")
+            for i, tec in enumerate(f_tecnico):
+                params[f"tec{i}"] = tec
+
+        if f_categoria:
+            placeholders = ",".join([f":cat{i}" for i in range(len(f_categoria))])
+            where_clauses.append(f"categoria IN ({placeholders})")
+            for i, cat in enumerate(f_categoria):
+                params[f"cat{i}"] = cat
+
+        if f_equipamento:
+            placeholders = ",".join([f":eq{i}" for i in range(len(f_equipamento))])
+            where_clauses.append(f"equipamento IN ({placeholders})")
+            for i, eq in enumerate(f_equipamento):
+                params[f"eq{i}"] = eq
+
+        # Filtros de data (só aplicar se não houver busca por número)
+        if not (f_numero_os and f_numero_os.strip()):
+            if f_data_inicio:
+                where_clauses.append("data >= :data_inicio")
+                params["data_inicio"] = f_data_inicio
+
+            if f_data_fim:
+                where_clauses.append("data <= :data_fim")
+                params["data_fim"] = f_data_fim
+
+        # Tabela única particionada por tipo: o filtro de tipo vira poda de partição
+        if f_tipo in ("Interna", "Externa"):
+            where_clauses.append("tipo = :tipo")
+            params["tipo"] = f_tipo
+
+        # Na sessão ficam apenas a especificação do filtro e a página atual
+        st.session_state.filtro_spec = {"where": where_clauses, "params": params}
+        st.session_state.filtro_page = 1
+        try:
+            carregar_pagina_filtro(conn, "primeira")
+        except Exception as e:
+            st.error(f"Erro ao executar filtro: {e}")
+            st.exception(e)
+            del st.session_state.filtro_spec
+            return
 
-            query_final = " UNION ALL ".join(queries_to_union)
-            query_final += " ORDER BY data DESC, hora DESC"
+    elif st.session_state.pop("filtro_recarregar", False) and "filtro_spec" in st.session_state:
+        # Após editar/excluir, refaz a página atual a partir do mesmo ponto
+        consulta = st.session_state.filtro_consulta_pagina
+        try:
+            carregar_pagina_filtro(conn, consulta["modo"], consulta["chave"])
+        except Exception as e:
+            st.error(f"Erro ao executar filtro: {e}")
+            return
 
-            try:
-                with conn.connect() as con:
-                    result = con.execute(text(query_final), params)
-                    rows = result.fetchall()
-                    columns = result.keys()
-                    df = pd.DataFrame(rows, columns=columns)
+    render_resultados(conn, pode_editar, pode_deletar)
 
-                st.session_state.df_filtrado = df
-                st.session_state.filtro_page = 1
-            except Exception as e:
-                st.error(f"Erro ao executar filtro: {e}")
-                st.exception(e)
-                return
 
-        df = st.session_state.df_filtrado
+# Paginação, ações por linha e modais rodam só este fragmento, sem refazer a
+# página inteira (filtros e menu lateral). Gravações ainda refazem o app todo.
+@st.fragment
+@medido("fragmento:filtro.resultados")
+def render_resultados(conn, pode_editar, pode_deletar):
+    if "filtro_spec" in st.session_state:
+        spec = st.session_state.filtro_spec
+        pagina = st.session_state.filtro_pagina
+        total_items = st.session_state.filtro_total
 
-        if df.empty:
+        if total_items == 0:
             st.info("Nenhuma OS encontrada com os filtros aplicados.")
             return
 
-        st.success(f"**{len(df)} OS(s) encontrada(s)**")
-
-        # Exportar para Excel
-        if len(df) > 0:
-            excel_data = exportar_filtrados_para_excel(df)
-            if excel_data:
-                b64 = base64.b64encode(excel_data).decode()
-                href = (
-                    f'<a href="data:application/vnd.openxmlformats-'
-                    f'officedocument.spreadsheetml.sheet;base64,{b64}" '
-                    f'download="os_filtradas.xlsx">Baixar Excel</a>'
-                )
-                st.markdown(href, unsafe_allow_html=True)
+        st.success(f"**{total_items} OS(s) encontrada(s)**")
+
+        # Exportação: ação explícita, a consulta completa é refeita em streaming
+        # (o arquivo final passa pela memória; limite em EXPORTACAO_LIMITE_MB)
+        with st.expander("📥 Exportar resultado"):
+            col_fmt, col_btn = st.columns([2, 1])
+            formato = col_fmt.radio(
+                "Formato",
+                list(FORMATOS),
+                format_func=lambda f: FORMATOS[f][0],
+                horizontal=True,
+                label_visibility="collapsed",
+            )
+            if col_btn.button("Gerar arquivo", use_container_width=True):
+                try:
+                    with st.spinner("Gerando arquivo..."):
+                        caminho = exportar_consulta(
+                            conn,
+                            _montar_consulta(SQL_FILTRO_EXPORTACAO, spec)
+                            + (SQL_BUSCA_ORDEM if "busca" in spec["params"] else SQL_FILTRO_ORDEM),
+                            spec["params"],
+                            formato,
+                            nome_planilha="Dados Filtrados",
+                        )
+                        dados = ler_e_remover(caminho)
+                    st.download_button(
+                        f"Baixar {FORMATOS[formato][0]}",
+                        data=dados,
+                        file_name=f"os_filtradas.{formato}",
+                        mime=FORMATOS[formato][1],
+                        type="primary",
+                    )
+                except ArquivoGrandeDemais as e:
+                    st.warning(str(e))
+                except Exception as e:
+                    st.error(f"Erro ao exportar: {e}")
 
         # Paginação
         if "filtro_page" not in st.session_state:
             st.session_state.filtro_page = 1
 
-        ITEMS_PER_PAGE = 10
-        total_items = len(df)
-        total_pages = math.ceil(total_items / ITEMS_PER_PAGE)
-
-        if st.session_state.filtro_page > total_pages:
-            st.session_state.filtro_page = total_pages
-        if st.session_state.filtro_page < 1:
-            st.session_state.filtro_page = 1
-
-        start_idx = (st.session_state.filtro_page - 1) * ITEMS_PER_PAGE
-        end_idx = start_idx + ITEMS_PER_PAGE
-        df_page = df.iloc[start_idx:end_idx]
+        total_pages = math.ceil(total_items / ITENS_POR_PAGINA)
 
         st.markdown("---")
         st.info(
-            f"Exibindo **{len(df_page)}** de **{total_items}** OS "
+            f"Exibindo **{len(pagina)}** de **{total_items}** OS "
             f"(Página {st.session_state.filtro_page}/{total_pages})"
         )
 
-        # Cabeçalho da tabela
-        if pode_editar:
-            cols_header = st.columns((1, 1, 1.5, 1.5, 1, 1.5, 2))
-            headers = ["Número", "Tipo", "Secretaria", "Solicitante", "Status", "Data", "Ações"]
-        else:
-            cols_header = st.columns((1, 1, 1.5, 1.5, 1, 1.5, 1))
-            headers = ["Número", "Tipo", "Secretaria", "Solicitante", "Status", "Data", "Ações"]
-
-        for col, header in zip(cols_header, headers):
-            col.markdown(f"**{header}**")
-
-        st.markdown("---")
-
-        # Renderizar linhas
-        for idx, row in df_page.iterrows():
-            if pode_editar:
-                cols = st.columns((1, 1, 1.5, 1.5, 1, 1.5, 2))
-            else:
-                cols = st.columns((1, 1, 1.5, 1.5, 1, 1.5, 1))
-
-            cols[0].write(str(row["numero"]))
-            cols[1].write(str(row["tipo"]))
-            cols[2].write(str(row["secretaria"]))
-            cols[3].write(str(row["solicitante"]))
-
-            status_val = str(row["status"])
-            if status_val == "EM ABERTO":
-                cols[4].markdown(f"🔴 {status_val}")
-            elif status_val == "AGUARDANDO PEÇA(S)":
-                cols[4].markdown(f"🟠 {status_val}")
-            elif status_val == "FINALIZADO":
-                cols[4].markdown(f"🟢 {status_val}")
-            else:
-                cols[4].write(status_val)
-
-            try:
-                data_formatada = pd.to_datetime(row["data"]).strftime("%d/%m/%Y")
-                cols[5].write(data_formatada)
-            except Exception:
-                cols[5].write(str(row["data"]))
-
-            # Ações
-            if pode_editar:
-                col_a, col_b, col_c = cols[6].columns(3)
-
-                if col_a.button("👁️", key=f"view_{idx}", help="Visualizar detalhes"):
-                    limpar_estados_modais()
-                    st.session_state.view_os_id = idx
-                    st.rerun()
+        # Tabela da página: dados enviados uma vez, ações sobre a linha selecionada
+        icones_status = {"EM ABERTO": "🔴", "AGUARDANDO PEÇA(S)": "🟠", "FINALIZADO": "🟢"}
+        df_pagina = pd.DataFrame(pagina)
+        df_pagina["status"] = [
+            f"{icones_status[s]} {s}" if s in icones_status else s for s in df_pagina["status"]
+        ]
+        linha = selecionar_linha(
+            df_pagina,
+            f"filtro_tabela_{st.session_state.filtro_page}",
+            ordem=["numero", "tipo", "secretaria", "solicitante", "status", "data"],
+            colunas={
+                "numero": "Número",
+                "tipo": "Tipo",
+                "secretaria": "Secretaria",
+                "solicitante": "Solicitante",
+                "status": "Status",
+                "data": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+            },
+        )
 
-                if col_b.button("✏️", key=f"edit_{idx}", help="Editar OS"):
-                    limpar_estados_modais()
-                    st.session_state.edit_os_data = row.to_dict()
-                    st.rerun()
+        acoes = [("👁️ Visualizar", "Visualizar detalhes")]
+        if pode_editar:
+            acoes.append(("✏️ Editar", "Editar OS"))
+        if pode_deletar:
+            acoes.append(("🗑️ Deletar", "Deletar OS"))
+        acao = barra_de_acoes(linha, acoes, "filtro_acoes")
 
-                if pode_deletar:
-                    if col_c.button("🗑️", key=f"del_{idx}", help="Deletar OS"):
-                        limpar_estados_modais()
-                        st.session_state.delete_os_data = row.to_dict()
-                        st.rerun()
+        if acao is not None:
+            limpar_estados_modais()
+            ref = (linha["tipo"], linha["id"])
+            if acao == "👁️ Visualizar":
+                st.session_state.view_os_id = ref
+            elif acao == "✏️ Editar":
+                st.session_state.edit_os_id = ref
             else:
-                if cols[6].button("👁️", key=f"view_{idx}", help="Visualizar detalhes"):
-                    limpar_estados_modais()
-                    st.session_state.view_os_id = idx
-                    st.rerun()
+                st.session_state.delete_os_id = ref
+            st.rerun(scope="fragment")
 
-        # Controles de paginação
+        # Controles de paginação (keyset: a partir da primeira/última linha da página atual)
         st.markdown("---")
         col1, col2, col3, col4, col5 = st.columns([1, 1, 2, 1, 1])
 
         with col1:
             if st.button("⏮️ Primeira", disabled=(st.session_state.filtro_page == 1)):
                 st.session_state.filtro_page = 1
-                st.rerun()
+                carregar_pagina_filtro(conn, "primeira")
+                st.rerun(scope="fragment")
 
         with col2:
             if st.button("◀️ Anterior", disabled=(st.session_state.filtro_page == 1)):
                 st.session_state.filtro_page -= 1
-                st.rerun()
+                carregar_pagina_filtro(conn, "antes", _chave(pagina[0]))
+                st.rerun(scope="fragment")
 
         with col3:
             st.markdown(
@@ -678,29 +794,34 @@ def render():
         with col4:
             if st.button("▶️ Próxima", disabled=(st.session_state.filtro_page >= total_pages)):
                 st.session_state.filtro_page += 1
-                st.rerun()
+                carregar_pagina_filtro(conn, "depois", _chave(pagina[-1]))
+                st.rerun(scope="fragment")
 
         with col5:
             if st.button("⏭️ Última", disabled=(st.session_state.filtro_page >= total_pages)):
                 st.session_state.filtro_page = total_pages
-                st.rerun()
+                carregar_pagina_filtro(conn, "ultima")
+                st.rerun(scope="fragment")
 
     # ============================================================================
     # RENDERIZAÇÃO DOS MODAIS - NO FINAL PARA EVITAR CONFLITOS
     # ============================================================================
 
-    # Renderizar apenas UM modal por vez com verificação exclusiva
-    if "view_os_id" in st.session_state and st.session_state.view_os_id is not None:
-        try:
-            os_data = st.session_state.df_filtrado.iloc[st.session_state.view_os_id]
-            modal_detalhes(os_data, conn)
-        except (IndexError, KeyError):
+    # Renderizar apenas UM modal por vez; os dados completos são buscados por id
+    modal, ref = None, None
+    if st.session_state.get("view_os_id") is not None:
+        modal, ref = modal_detalhes, st.session_state.view_os_id
+    elif st.session_state.get("edit_os_id") is not None:
+        modal, ref = modal_editar, st.session_state.edit_os_id
+    elif st.session_state.get("delete_os_id") is not None:
+        modal, ref = modal_excluir, st.session_state.delete_os_id
+
+    if modal is not None:
+        os_data = f_buscar_os(conn, *ref)
+        if os_data is None:
             st.error("Erro ao carregar dados da OS. Aplicando filtros novamente.")
             limpar_estados_modais()
+            st.session_state.filtro_recarregar = True
             st.rerun()
-
-    elif "edit_os_data" in st.session_state and st.session_state.edit_os_data is not None:
-        modal_editar(st.session_state.edit_os_data, conn)
-
-    elif "delete_os_data" in st.session_state and st.session_state.delete_os_data is not None:
-        modal_excluir(st.session_state.delete_os_data, conn)
\ No newline at end of file
+        else:
+            modal(os_data, conn)
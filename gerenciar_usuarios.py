@@ -3,6 +3,7 @@ import streamlit as st
 import pandas as pd
 from sqlalchemy import text
 from database import get_connection
+from tabela import selecionar_linha, barra_de_acoes
 from auth import hash_password, validate_password
 
 def render():
@@ -139,41 +140,32 @@ def render_list_users(conn):
         
         st.markdown("---")
         
-        cols_header = st.columns((1.5, 2, 1.5, 2, 1.5))
-        headers = ["Usuário", "Nome de Exibição", "Perfil", "Data de Registro", "Ações"]
-        
-        for col, header in zip(cols_header, headers):
-            col.markdown(f"**{header}**")
-        
-        st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
-        
-        for idx, row in df_users.iterrows():
-            user_id = row['id']
-            cols_row = st.columns((1.5, 2, 1.5, 2, 1.5))
-            
-            cols_row[0].write(str(row['username']))
-            cols_row[1].write(str(row.get('display_name', 'N/A')))
-            
-            role_display = {
-                "admin": "Administrador",
-                "tecnico": "Técnico",
-                "administrativo": "Administrativo",
-                "tecnico_recarga": "Téc. Recarga"
-            }.get(row['role'], row['role'])
-            cols_row[2].write(role_display)
-            
-            cols_row[3].write(str(row.get('data_registro', 'N/A'))[:19])
-            
-            current_user = st.session_state.get('username')
-            if row['username'] == current_user:
-                cols_row[4].write("(Você)")
-            else:
-                if cols_row[4].button("🗑️", key=f"del_user_{user_id}", help="Deletar usuário"):
-                    st.session_state.delete_user_id = user_id
-                    st.session_state.delete_user_data = dict(row)
-                    st.rerun()
-            
-            st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
+        df_users["perfil"] = df_users["role"].map({
+            "admin": "Administrador",
+            "tecnico": "Técnico",
+            "administrativo": "Administrativo",
+            "tecnico_recarga": "Téc. Recarga"
+        }).fillna(df_users["role"])
+        
+        linha = selecionar_linha(
+            df_users,
+            "usuarios_tabela",
+            ordem=["username", "display_name", "perfil", "data_registro"],
+            colunas={
+                "username": "Usuário",
+                "display_name": "Nome de Exibição",
+                "perfil": "Perfil",
+                "data_registro": st.column_config.DatetimeColumn("Data de Registro", format="DD/MM/YYYY HH:mm:ss"),
+            },
+        )
+        
+        # O próprio usuário logado não pode se deletar
+        current_user = st.session_state.get('username')
+        pode_deletar = linha is not None and linha['username'] != current_user
+        if barra_de_acoes(linha, [("🗑️ Deletar", "Deletar usuário", pode_deletar)], "usuarios_acoes"):
+            st.session_state.delete_user_id = int(linha['id'])
+            st.session_state.delete_user_data = linha
+            st.rerun()
     
     except Exception as e:
         st.error(f"Erro ao listar usuários: {e}")
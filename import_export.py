@@ -3,441 +3,394 @@
 import io
 import pandas as pd
 from pandas import DataFrame
-from typing import Optional
 from database import get_connection
-import xlsxwriter
-import re
+from contadores import sincronizar_contador
+from leitura_planilhas import ler_em_blocos, fracao_lida
+from instrumentacao import cronometrar, cronometrado
 import streamlit as st
+from sqlalchemy import text
 
-def _read_any_excel(file) -> DataFrame:
-    name = getattr(file, "name", None)
-    if name and name.lower().endswith(".ods"):
-        return pd.read_excel(file, engine="odf")
-    try:
-        return pd.read_excel(file)
-    except UnicodeDecodeError:
-        return pd.read_excel(file, engine="odf")
+# Linhas lidas da planilha e gravadas no banco por vez: limita a memória da importação
+TAMANHO_BLOCO_IMPORTACAO = 1000
+
+# As conversões abaixo são vetorizadas (dt.strftime, str.*): rodam sobre blocos
+# inteiros sem criar um objeto Python por célula (medidas em bench/micro.py)
 
 def _to_date_str(series: pd.Series) -> pd.Series:
-    s = pd.to_datetime(series, errors="coerce").dt.date.astype("string")
-    return s.where(~s.isna(), None)
+    dt = pd.to_datetime(series, errors="coerce")
+    s = dt.dt.strftime("%Y-%m-%d").astype("string")
+    return s.where(dt.notna(), None)
 
 def _to_time_str(series: pd.Series) -> pd.Series:
-    t = pd.to_datetime(series, errors="coerce").dt.time
-    valid_mask = pd.notna(t)
-    return t.where(valid_mask).map(lambda x: x.strftime("%H:%M:%S") if pd.notna(x) else None)
+    dt = pd.to_datetime(series, errors="coerce")
+    return dt.dt.strftime("%H:%M:%S").where(dt.notna(), None)
 
 def _strip_all(df: DataFrame) -> DataFrame:
-    df = df.copy()
-    df = df.dropna(how="all")
+    # Cópia explícita: sem ela, quando o dropna remove linhas, as atribuições
+    # abaixo disparam SettingWithCopyWarning (o resultado referencia o bloco original)
+    df = df.dropna(how="all").copy()
     for col in df.columns:
         if pd.api.types.is_string_dtype(df[col]):
             df[col] = df[col].astype("string").str.strip()
     return df
 
-def _read_any_file(file) -> DataFrame:
-    name = getattr(file, "name", None)
-    if name and name.lower().endswith(".csv"):
-        try:
-            df = pd.read_csv(file, sep=None, engine='python')
-            return df
-        except Exception:
-            try:
-                file.seek(0)
-                df = pd.read_csv(file, sep=';', engine='python')
-                return df
-            except Exception:
-                file.seek(0)
-                df = pd.read_csv(file, sep=',', engine='python')
-                return df
-    return _read_any_excel(file)
+# --- Importação de OS legadas ---
+# Os blocos vão por COPY para uma tabela temporária e um único INSERT ... SELECT
+# grava na partição do tipo; o ON CONFLICT (numero, tipo) descarta os números
+# que já existem (no banco ou repetidos no próprio arquivo).
 
-def importar_os_externa(file) -> int:
-    raw = _read_any_file(file)
-    if len(raw) >= 2:
-        raw.columns = raw.iloc[1]
-        df = raw.iloc[2:].reset_index(drop=True)
-    else:
-        raw.columns = raw.iloc[0]
-        df = raw.iloc[1:].reset_index(drop=True)
-    
-    df = _strip_all(df)
-    
-    rename_map = {
-        "SECRETARIA": "secretaria", "SETOR": "setor", "DESCRIÇÃO": "descricao",
-        "DESCRICAO": "descricao", "DATA": "data", "HORA": "hora", "OS": "numero",
-        "Nº OS": "numero", "SOLICITANTE": "solicitante", "TELEFONE": "telefone",
-        "TÉCNICO": "tecnico", "TECNICO": "tecnico", "SOLICITAÇÃO": "solicitacao_cliente",
-        "SOLICITAÇÃO DO CLIENTE": "solicitacao_cliente", "SOLICITACAO DO CLIENTE": "solicitacao_cliente",
-        "CATEGORIA": "categoria", "NÚMERO DO PATRIMÔNIO": "patrimonio",
-        "NUMERO DO PATRIMONIO": "patrimonio", "Nº_PATRIMÔNIO": "patrimonio",
-        "Nº PATRIMÔNIO": "patrimonio", "EQUIPAMENTO": "equipamento",
-        "SERVIÇO EXECUTADO": "servico_executado", "SERVICO EXECUTADO": "servico_executado",
-        "SERVIÇO_EXECUTADO": "servico_executado", "STATUS": "status",
-        "DATA FINALIZADA": "data_finalizada", "DATAFINALIZADA": "data_finalizada",
-        "DATA DE RETIRADA": "data_retirada", "DATADERETIRADA": "data_retirada",
-        "RETIRADA POR": "retirada_por", "RETIRADAPOR": "retirada_por"
-    }
-    
-    df.columns = [str(c).strip().upper() for c in df.columns]
-    df = df.rename(columns=rename_map)
-    
-    keep_cols = ["secretaria", "setor", "descricao", "data", "hora",
-                 "numero", "solicitante", "telefone", "tecnico",
-                 "solicitacao_cliente", "categoria", "patrimonio", "equipamento",
-                 "servico_executado", "status", "data_finalizada",
-                 "data_retirada", "retirada_por"]
-    
-    for col in keep_cols:
-        if col not in df.columns:
-            df[col] = None
-    
-    df = df[keep_cols]
-    df["data"] = _to_date_str(df["data"])
-    df["hora"] = _to_time_str(df["hora"])
-    
-    conn = get_connection()
-    try:
-        existing = pd.read_sql("SELECT numero FROM os_externa WHERE numero IS NOT NULL", conn)
-        existing_set = set(existing["numero"].dropna().astype(str))
-    except Exception:
-        existing_set = set()
-    
-    if "numero" in df.columns:
-        df["numero"] = df["numero"].astype("string")
-        mask_new = ~df["numero"].isin(existing_set) | df["numero"].isna()
-        df = df.loc[mask_new]
-    
-    df = df.dropna(how="all", subset=["numero"])
-    
-    inserted = 0
-    if not df.empty:
-        df.to_sql("os_externa", conn, if_exists="append", index=False)
-        inserted = len(df)
-    
-    conn.dispose()
-    return inserted
+_RENAME_OS = {
+    "SECRETARIA": "secretaria", "SETOR": "setor", "DESCRIÇÃO": "descricao",
+    "DESCRICAO": "descricao", "DATA": "data", "HORA": "hora", "OS": "numero",
+    "Nº OS": "numero", "SOLICITANTE": "solicitante", "TELEFONE": "telefone",
+    "TÉCNICO": "tecnico", "TECNICO": "tecnico", "SOLICITAÇÃO": "solicitacao_cliente",
+    "SOLICITAÇÃO DO CLIENTE": "solicitacao_cliente", "SOLICITACAO DO CLIENTE": "solicitacao_cliente",
+    "CATEGORIA": "categoria", "NÚMERO DO PATRIMÔNIO": "patrimonio",
+    "NUMERO DO PATRIMONIO": "patrimonio", "Nº_PATRIMÔNIO": "patrimonio",
+    "Nº PATRIMÔNIO": "patrimonio", "EQUIPAMENTO": "equipamento",
+    "SERVIÇO EXECUTADO": "servico_executado", "SERVICO EXECUTADO": "servico_executado",
+    "SERVIÇO_EXECUTADO": "servico_executado", "STATUS": "status",
+    "DATA FINALIZADA": "data_finalizada", "DATAFINALIZADA": "data_finalizada",
+    "DATA DE RETIRADA": "data_retirada", "DATADERETIRADA": "data_retirada",
+    "RETIRADA POR": "retirada_por", "RETIRADAPOR": "retirada_por"
+}
 
-def importar_os_interna(file) -> int:
-    raw = _read_any_file(file)
-    if len(raw) >= 2:
-        raw.columns = raw.iloc[1]
-        df = raw.iloc[2:].reset_index(drop=True)
-    else:
-        raw.columns = raw.iloc[0]
-        df = raw.iloc[1:].reset_index(drop=True)
-    
-    df = _strip_all(df)
-    
-    rename_map = {
-        "SECRETARIA": "secretaria", "SETOR": "setor", "DESCRIÇÃO": "descricao",
-        "DESCRICAO": "descricao", "DATA": "data", "HORA": "hora", "OS": "numero",
-        "Nº OS": "numero", "SOLICITANTE": "solicitante", "TELEFONE": "telefone",
-        "TÉCNICO": "tecnico", "TECNICO": "tecnico", "SOLICITAÇÃO": "solicitacao_cliente",
-        "SOLICITAÇÃO DO CLIENTE": "solicitacao_cliente", "SOLICITACAO DO CLIENTE": "solicitacao_cliente",
-        "CATEGORIA": "categoria", "NÚMERO DO PATRIMÔNIO": "patrimonio",
-        "NUMERO DO PATRIMONIO": "patrimonio", "Nº_PATRIMÔNIO": "patrimonio",
-        "Nº PATRIMÔNIO": "patrimonio", "EQUIPAMENTO": "equipamento",
-        "SERVIÇO EXECUTADO": "servico_executado", "SERVICO EXECUTADO": "servico_executado",
-        "SERVIÇO_EXECUTADO": "servico_executado", "STATUS": "status",
-        "DATA FINALIZADA": "data_finalizada", "DATAFINALIZADA": "data_finalizada",
-        "DATA DE RETIRADA": "data_retirada", "DATADERETIRADA": "data_retirada",
-        "RETIRADA POR": "retirada_por", "RETIRADAPOR": "retirada_por"
-    }
-    
-    df.columns = [str(c).strip().upper() for c in df.columns]
-    df = df.rename(columns=rename_map)
-    
-    keep_cols = ["secretaria", "setor", "descricao", "data", "hora",
+_KEEP_COLS_OS = ["secretaria", "setor", "descricao", "data", "hora",
                  "numero", "solicitante", "telefone", "tecnico",
                  "solicitacao_cliente", "categoria", "patrimonio", "equipamento",
                  "servico_executado", "status", "data_finalizada",
                  "data_retirada", "retirada_por"]
-    
-    for col in keep_cols:
-        if col not in df.columns:
-            df[col] = None
-    
-    df = df[keep_cols]
-    df["data"] = _to_date_str(df["data"])
-    df["hora"] = _to_time_str(df["hora"])
-    
-    conn = get_connection()
-    try:
-        existing = pd.read_sql("SELECT numero FROM os_interna WHERE numero IS NOT NULL", conn)
-        existing_set = set(existing["numero"].dropna().astype(str))
-    except Exception:
-        existing_set = set()
-    
-    if "numero" in df.columns:
-        df["numero"] = df["numero"].astype("string")
-        mask_new = ~df["numero"].isin(existing_set) | df["numero"].isna()
-        df = df.loc[mask_new]
-    
-    df = df.dropna(how="all", subset=["numero"])
-    
-    inserted = 0
-    if not df.empty:
-        df.to_sql("os_interna", conn, if_exists="append", index=False)
-        inserted = len(df)
-    
-    conn.dispose()
-    return inserted
 
-def exportar_para_excel(path_arquivo: Optional[str] = "auditoria.xlsx") -> bytes | str:
-    conn = get_connection()
-    
-    standard_cols = [
-        "numero", "secretaria", "setor", "data", "hora", "solicitante",
-        "telefone", "equipamento", "descricao", "status",
-        "data_finalizada", "data_retirada", "retirada_por", "tecnico", "tipo"
-    ]
-    
-    df_interna_query = """
-        SELECT
-            numero, secretaria, setor, data, hora, solicitante,
-            telefone, equipamento, descricao, status,
-            data_finalizada, data_retirada, retirada_por, tecnico, 'Interna' as tipo
-        FROM os_interna
+def _blocos_os(file):
     """
-    df_interna = pd.read_sql(df_interna_query, conn)
-    
-    df_externa_query = """
-        SELECT
-            numero, secretaria, setor, data, hora, solicitante,
-            telefone, equipamento, descricao, status,
-            data_finalizada, data_retirada, retirada_por, tecnico, 'Externa' as tipo
-        FROM os_externa
+    Blocos da planilha legada de OS já no formato da tabela. O cabeçalho fica
+    na terceira linha preenchida (as duas primeiras são título da planilha).
     """
-    df_externa = pd.read_sql(df_externa_query, conn)
-    
-    conn.dispose()
-    
-    if path_arquivo:
-        with pd.ExcelWriter(path_arquivo) as writer:
-            df_interna[standard_cols].to_excel(writer, sheet_name="OS Interna", index=False)
-            df_externa[standard_cols].to_excel(writer, sheet_name="OS Externa", index=False)
-        return path_arquivo
-    
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-        df_interna[standard_cols].to_excel(writer, sheet_name="OS Interna", index=False)
-        df_externa[standard_cols].to_excel(writer, sheet_name="OS Externa", index=False)
-    buffer.seek(0)
-    return buffer.getvalue()
+    for df in ler_em_blocos(file, TAMANHO_BLOCO_IMPORTACAO, linha_cabecalho=2):
+        df = _strip_all(df)
+        df.columns = [str(c).strip().upper() for c in df.columns]
+        df = df.rename(columns=_RENAME_OS)
+        
+        for col in _KEEP_COLS_OS:
+            if col not in df.columns:
+                df[col] = None
+        
+        df = df[_KEEP_COLS_OS]
+        df["data"] = _to_date_str(df["data"])
+        df["hora"] = _to_time_str(df["hora"])
+        df["numero"] = df["numero"].astype("string")
+        yield df
 
-def exportar_filtrados_para_excel(df: pd.DataFrame) -> bytes:
-    df_export = df.copy()
-    for col in ['data_finalizada', 'data_retirada']:
-        if col in df_export.columns and pd.api.types.is_datetime64_any_dtype(df_export[col]):
-            df_export[col] = pd.to_datetime(df_export[col], utc=True).dt.tz_convert('America/Sao_Paulo')
-            df_export[col] = df_export[col].dt.tz_localize(None)
-    
-    buffer = io.BytesIO()
-    with pd.ExcelWriter(buffer, engine="xlsxwriter") as writer:
-        df_export.to_excel(writer, sheet_name="Dados Filtrados", index=False)
-    buffer.seek(0)
-    return buffer.getvalue()
+_VIEWS_OS = {"Interna": "os_interna", "Externa": "os_externa"}
 
-def _normalize_mac(mac):
-    """Normaliza MAC para o formato AA:BB:CC:DD:EE:FF e trata valores inválidos."""
-    if pd.isna(mac) or not isinstance(mac, str) or mac.strip() == '':
-        return None
-    
-    mac_normalized = str(mac).replace('-', ':').replace('.', ':').upper().strip()
-    
-    # Lista de MACs "lixo" que devem ser tratados como NULOS
-    junk_macs = ["00:00:00:00:00:00", "FF:FF:FF:FF:FF:FF"]
-    if mac_normalized in junk_macs:
-        return None
-    
-    # Regex para validar o formato MAC
-    if re.match(r"^([0-9A-F]{2}[:-]){5}([0-9A-F]{2})$", mac_normalized):
-        return mac_normalized
-    
-    # Se não for um MAC válido, retorna None
-    return None
+SQL_OS_STAGING = f"""
+    CREATE TEMP TABLE os_importacao (
+        linha INTEGER PRIMARY KEY,
+        {", ".join(f"{col} TEXT" for col in _KEEP_COLS_OS)}
+    ) ON COMMIT DROP
+"""
 
-def importar_equipamentos(file) -> (int, int):
+SQL_OS_COPY = f"COPY os_importacao (linha, {', '.join(_KEEP_COLS_OS)}) FROM STDIN WITH (FORMAT csv)"
+
+SQL_OS_INSERIR = """
+    INSERT INTO ordens_servico (
+        tipo, secretaria, setor, descricao, data, hora, numero, solicitante, telefone, tecnico,
+        solicitacao_cliente, categoria, patrimonio, equipamento, servico_executado, status,
+        data_finalizada, data_retirada, retirada_por
+    )
+    SELECT :tipo, secretaria, setor, descricao, CAST(NULLIF(data, '') AS DATE),
+           CAST(NULLIF(hora, '') AS TIME), numero, solicitante, telefone, tecnico,
+           solicitacao_cliente, categoria, patrimonio, equipamento, servico_executado, status,
+           CAST(NULLIF(data_finalizada, '') AS TIMESTAMPTZ),
+           CAST(NULLIF(data_retirada, '') AS TIMESTAMPTZ), retirada_por
+    FROM os_importacao
+    WHERE NULLIF(numero, '') IS NOT NULL
+    ORDER BY linha
+    ON CONFLICT (numero, tipo) DO NOTHING
+"""
+
+def importar_os(file, tipo) -> (int, int):
     """
-    Importa equipamentos a partir de um arquivo CSV.
-    Insere linha por linha para tratar duplicatas graciosamente.
-    Retorna (registros_importados, registros_ignorados)
+    Importa OS legadas ('Interna' ou 'Externa') de um arquivo CSV, XLSX ou ODS.
+    Retorna (registros_importados, registros_ignorados); são ignoradas as linhas
+    sem número e as de número já existente.
     """
-    from sqlalchemy import text
-    from sqlalchemy.exc import IntegrityError
+    if tipo not in _VIEWS_OS:
+        raise ValueError(f"Tipo de OS inválido: {tipo}")
     
-    # Lê o arquivo
-    df_raw = _read_any_file(file)
-    total_linhas_original = len(df_raw)
-    
-    st.info(f"📄 Arquivo lido: {total_linhas_original} linhas encontradas")
+    conn = get_connection()
+    lidas = 0
+    with cronometrar("importacao_segundos", tipo=f"os_{tipo.lower()}"), conn.connect() as con:
+        with con.begin():
+            # Carga em massa: sem o statement_timeout da aplicação nesta transação
+            con.execute(text("SET LOCAL statement_timeout = 0"))
+            con.execute(text(SQL_OS_STAGING))
+            cursor = con.connection.cursor()
+            try:
+                for df in _blocos_os(file):
+                    df.insert(0, "linha", range(lidas + 1, lidas + len(df) + 1))
+                    lidas += len(df)
+                    buffer = io.StringIO()
+                    df.to_csv(buffer, header=False, index=False)
+                    buffer.seek(0)
+                    cursor.copy_expert(SQL_OS_COPY, buffer)
+            finally:
+                cursor.close()
+            
+            inserted = con.execute(text(SQL_OS_INSERIR), {"tipo": tipo}).rowcount
+            if inserted:
+                # Números importados podem ultrapassar o contador do ano: realinha
+                sincronizar_contador(con, _VIEWS_OS[tipo])
     
+    return inserted, lidas - inserted
+
+# --- Importação de equipamentos em massa ---
+# A planilha vai por COPY para uma tabela temporária; a análise marca, de uma vez,
+# as linhas cujo MAC/IP já existe no banco ou aparece em uma linha anterior do
+# arquivo, e o INSERT ... SELECT grava as demais.
+
+_COLUNAS_EQUIP = """
+    categoria, patrimonio, hostname, especificacao, secretaria,
+    setor, localizacao_fisica, ip, mac, subrede, gateway,
+    dns, numero_serie, observacoes
+"""
+
+SQL_EQUIP_STAGING = """
+    CREATE TEMP TABLE equipamentos_importacao (
+        linha INTEGER PRIMARY KEY,
+        categoria TEXT, patrimonio TEXT, hostname TEXT, especificacao TEXT, secretaria TEXT,
+        setor TEXT, localizacao_fisica TEXT, ip TEXT, mac TEXT, subrede TEXT, gateway TEXT,
+        dns TEXT, numero_serie TEXT, observacoes TEXT
+    ) ON COMMIT DROP
+"""
+
+SQL_EQUIP_COPY = f"COPY equipamentos_importacao (linha, {_COLUNAS_EQUIP}) FROM STDIN WITH (FORMAT csv)"
+
+SQL_EQUIP_ANALISE = """
+    CREATE TEMP TABLE equipamentos_analise ON COMMIT DROP AS
+    SELECT s.*,
+           s.mac IS NOT NULL AND (
+               EXISTS (SELECT 1 FROM equipamentos e WHERE e.mac = s.mac)
+               OR ROW_NUMBER() OVER (PARTITION BY s.mac ORDER BY s.linha) > 1
+           ) AS mac_duplicado,
+           s.ip IS NOT NULL AND (
+               EXISTS (SELECT 1 FROM equipamentos e WHERE e.ip = s.ip)
+               OR ROW_NUMBER() OVER (PARTITION BY s.ip ORDER BY s.linha) > 1
+           ) AS ip_duplicado,
+           GREATEST(length(s.categoria), length(s.patrimonio), length(s.hostname), length(s.secretaria),
+                    length(s.setor), length(s.localizacao_fisica), length(s.ip), length(s.mac),
+                    length(s.subrede), length(s.gateway), length(s.dns), length(s.numero_serie)) > 255
+               AS muito_longo
+    FROM equipamentos_importacao s
+"""
+
+SQL_EQUIP_IGNORADOS = """
+    SELECT linha, hostname,
+           CASE
+               WHEN muito_longo THEN 'Erro: campo com mais de 255 caracteres'
+               WHEN mac_duplicado AND ip_duplicado THEN 'Duplicado: MAC=' || mac || ', IP=' || ip
+               WHEN mac_duplicado THEN 'Duplicado: MAC=' || mac
+               ELSE 'Duplicado: IP=' || ip
+           END AS motivo
+    FROM equipamentos_analise
+    WHERE mac_duplicado OR ip_duplicado OR muito_longo
+    ORDER BY linha
+"""
+
+SQL_EQUIP_INSERIR = f"""
+    INSERT INTO equipamentos ({_COLUNAS_EQUIP})
+    SELECT {_COLUNAS_EQUIP}
+    FROM equipamentos_analise
+    WHERE NOT (mac_duplicado OR ip_duplicado OR muito_longo)
+    ORDER BY linha
+    ON CONFLICT DO NOTHING
+    RETURNING id
+"""
+
+# Linhas aprovadas que não entraram: anti-join com o que foi inserido
+SQL_EQUIP_CONFLITOS = """
+    SELECT a.linha, a.hostname, 'Duplicado: gravado por outra sessão durante a importação' AS motivo
+    FROM equipamentos_analise a
+    WHERE NOT (a.mac_duplicado OR a.ip_duplicado OR a.muito_longo)
+      AND NOT EXISTS (
+          SELECT 1 FROM equipamentos e
+          WHERE e.id = ANY(:inseridos)
+            AND e.hostname = a.hostname
+            AND e.ip IS NOT DISTINCT FROM a.ip
+            AND e.mac IS NOT DISTINCT FROM a.mac
+      )
+    ORDER BY a.linha
+"""
+
+_MAC_VALIDO = r"^([0-9A-F]{2}:){5}[0-9A-F]{2}$"
+
+# MACs "lixo" que devem ser tratados como NULOS
+_MACS_LIXO = ["00:00:00:00:00:00", "FF:FF:FF:FF:FF:FF"]
+
+def _normalize_mac(series: pd.Series) -> pd.Series:
+    """Normaliza MACs para o formato AA:BB:CC:DD:EE:FF; inválidos, vazios e "lixo" viram nulos."""
+    # Números lidos da planilha viram texto sem ':' e são descartados pela validação
+    macs = series.astype("string").str.strip().str.replace(r"[-.]", ":", regex=True).str.upper()
+    validos = macs.str.match(_MAC_VALIDO).fillna(False).astype(bool) & ~macs.isin(_MACS_LIXO)
+    return macs.where(validos, None)
+
+_RENAME_EQUIP = {
+    'categoria': 'categoria',
+    'patrimonio': 'patrimonio',
+    'patrimônio': 'patrimonio',
+    'hostname': 'hostname',
+    'modelo': 'especificacao',
+    'modeloespecificacao': 'especificacao',
+    'especificacao': 'especificacao',
+    'especificação': 'especificacao',
+    'secretaria': 'secretaria',
+    'setor': 'setor',
+    'departamento': 'setor',
+    'localizacao': 'localizacao_fisica',
+    'localizacaofisica': 'localizacao_fisica',
+    'localizaçãofísica': 'localizacao_fisica',
+    'ip': 'ip',
+    'enderecoip': 'ip',
+    'endereçoip': 'ip',
+    'gateway': 'gateway',
+    'mac': 'mac',
+    'macaddress': 'mac',
+    'dns': 'dns',
+    'subrede': 'subrede',
+    'sub-rede': 'subrede',
+    'serie': 'numero_serie',
+    'numeroserie': 'numero_serie',
+    'númeroserie': 'numero_serie',
+    'observacoes': 'observacoes',
+    'observações': 'observacoes',
+    'obs': 'observacoes'
+}
+
+# Colunas que existem na tabela 'equipamentos'
+_KEEP_COLS_EQUIP = [
+    "categoria", "patrimonio", "hostname", "especificacao", "secretaria",
+    "setor", "localizacao_fisica", "ip", "mac", "subrede", "gateway",
+    "dns", "numero_serie", "observacoes"
+]
+
+def _preparar_bloco_equipamentos(df: DataFrame, primeiro: bool) -> DataFrame:
+    """Limpa e mapeia um bloco lido; no primeiro, mostra as colunas e uma amostra."""
     # Remove linhas completamente vazias e limpa espaços
-    df = _strip_all(df_raw)
-    st.info(f"🧹 Após limpeza: {len(df)} linhas restantes")
+    df = _strip_all(df)
     
     # Normaliza nomes das colunas
     df.columns = [str(c).lower().strip().replace(' ', '').replace('_', '') for c in df.columns]
+    if primeiro:
+        st.write("**Colunas detectadas no arquivo:**", list(df.columns))
     
-    st.write("**Colunas detectadas no CSV:**", list(df.columns))
-    
-    # Mapeamento flexível de colunas
-    rename_map = {
-        'categoria': 'categoria',
-        'patrimonio': 'patrimonio',
-        'patrimônio': 'patrimonio',
-        'hostname': 'hostname',
-        'modelo': 'especificacao',
-        'modeloespecificacao': 'especificacao',
-        'especificacao': 'especificacao',
-        'especificação': 'especificacao',
-        'secretaria': 'secretaria',
-        'setor': 'setor',
-        'departamento': 'setor',
-        'localizacao': 'localizacao_fisica',
-        'localizacaofisica': 'localizacao_fisica',
-        'localizaçãofísica': 'localizacao_fisica',
-        'ip': 'ip',
-        'enderecoip': 'ip',
-        'endereçoip': 'ip',
-        'gateway': 'gateway',
-        'mac': 'mac',
-        'macaddress': 'mac',
-        'dns': 'dns',
-        'subrede': 'subrede',
-        'sub-rede': 'subrede',
-        'serie': 'numero_serie',
-        'numeroserie': 'numero_serie',
-        'númeroserie': 'numero_serie',
-        'observacoes': 'observacoes',
-        'observações': 'observacoes',
-        'obs': 'observacoes'
-    }
-    
-    df = df.rename(columns=rename_map)
-    
-    st.write("**Colunas após mapeamento:**", list(df.columns))
-    
-    # Define as colunas que existem na tabela 'equipamentos'
-    keep_cols = [
-        "categoria", "patrimonio", "hostname", "especificacao", "secretaria",
-        "setor", "localizacao_fisica", "ip", "mac", "subrede", "gateway",
-        "dns", "numero_serie", "observacoes"
-    ]
+    df = df.rename(columns=_RENAME_EQUIP)
+    if primeiro:
+        st.write("**Colunas após mapeamento:**", list(df.columns))
     
     # Adiciona colunas faltantes com None
-    for col in keep_cols:
+    for col in _KEEP_COLS_EQUIP:
         if col not in df.columns:
             df[col] = None
     
-    df = df[keep_cols]
+    df = df[_KEEP_COLS_EQUIP]
     
-    # Mostra uma amostra dos dados
-    st.write("**Primeiras 3 linhas após mapeamento:**")
-    st.dataframe(df.head(3))
+    if primeiro:
+        st.write("**Primeiras 3 linhas após mapeamento:**")
+        st.dataframe(df.head(3))
     
     # Normaliza MAC Address
-    df['mac'] = df['mac'].apply(_normalize_mac)
+    df['mac'] = _normalize_mac(df['mac'])
     
     # Garante que 'especificacao' não seja nula (usa hostname como fallback)
     df['especificacao'] = df['especificacao'].fillna(df['hostname'])
+    return df
+
+@cronometrado("importacao_segundos", tipo="equipamentos")
+def importar_equipamentos(file) -> (int, int):
+    """
+    Importa equipamentos a partir de um arquivo CSV, XLSX ou ODS.
+    O arquivo é lido em blocos e cada bloco vai por COPY para uma tabela
+    temporária assim que lido; depois, um único INSERT ... SELECT com
+    ON CONFLICT DO NOTHING grava tudo. Duplicatas de MAC/IP são relatadas por linha.
+    Retorna (registros_importados, registros_ignorados)
+    """
+    total_linhas_original = 0
+    linhas_limpas = 0
+    total_to_process = 0
     
-    # Conta quantos registros têm campos obrigatórios preenchidos
-    before_drop = len(df)
-    df = df.dropna(subset=['hostname', 'categoria', 'secretaria', 'especificacao'])
-    after_drop = len(df)
-    
-    if before_drop > after_drop:
-        st.warning(f"⚠️ {before_drop - after_drop} linhas removidas por falta de campos obrigatórios")
-    
-    if df.empty:
-        st.error("❌ Nenhum registro válido encontrado após validação!")
-        return 0, total_linhas_original
-    
-    # Conecta ao banco
     conn = get_connection()
-    
-    # Inserção linha por linha com tratamento de erro
-    inserted = 0
-    ignored = 0
-    errors = []
-    
-    total_to_process = len(df)
     progress_bar = st.progress(0)
     status_text = st.empty()
     
-    # CORREÇÃO: usa enumerate para ter controle preciso do índice
-    for counter, (idx, row) in enumerate(df.iterrows(), start=1):
-        try:
-            # Prepara os dados da linha
-            row_data = row.to_dict()
-            
-            # Monta a query de inserção
-            insert_query = text("""
-                INSERT INTO equipamentos (
-                    categoria, patrimonio, hostname, especificacao, secretaria,
-                    setor, localizacao_fisica, ip, mac, subrede, gateway,
-                    dns, numero_serie, observacoes
-                ) VALUES (
-                    :categoria, :patrimonio, :hostname, :especificacao, :secretaria,
-                    :setor, :localizacao_fisica, :ip, :mac, :subrede, :gateway,
-                    :dns, :numero_serie, :observacoes
-                )
-            """)
-            
-            # Executa a inserção
-            with conn.connect() as con:
-                with con.begin():
-                    con.execute(insert_query, row_data)
-            
-            inserted += 1
+    # Tudo em uma transação: a tabela temporária some no COMMIT
+    with conn.connect() as con:
+        with con.begin():
+            # Carga em massa: sem o statement_timeout da aplicação nesta transação
+            con.execute(text("SET LOCAL statement_timeout = 0"))
+            con.execute(text(SQL_EQUIP_STAGING))
             
-        except IntegrityError as e:
-            # Duplicata encontrada - registra e continua
-            ignored += 1
-            error_detail = str(e.orig).split('\n')[0] if hasattr(e, 'orig') else str(e)
-            
-            # Identifica qual campo causou a duplicata
-            if 'mac_key' in error_detail.lower():
-                campo_dup = f"MAC={row_data.get('mac')}"
-            elif 'ip_key' in error_detail.lower():
-                campo_dup = f"IP={row_data.get('ip')}"
-            elif 'hostname_key' in error_detail.lower():
-                campo_dup = f"Hostname={row_data.get('hostname')}"
-            else:
-                campo_dup = "Campo desconhecido"
+            # Cada bloco é lido, limpo e enviado por COPY antes do próximo ser lido
+            cursor = con.connection.cursor()
+            try:
+                for indice, df in enumerate(ler_em_blocos(file, TAMANHO_BLOCO_IMPORTACAO)):
+                    total_linhas_original += len(df)
+                    df = _preparar_bloco_equipamentos(df, primeiro=indice == 0)
+                    linhas_limpas += len(df)
+                    
+                    df = df.dropna(subset=['hostname', 'categoria', 'secretaria', 'especificacao'])
+                    if not df.empty:
+                        # Número da linha entre os registros válidos, usado no relatório de ignorados
+                        df.insert(0, 'linha', range(total_to_process + 1, total_to_process + len(df) + 1))
+                        total_to_process += len(df)
+                        buffer = io.StringIO()
+                        df.to_csv(buffer, header=False, index=False)
+                        buffer.seek(0)
+                        cursor.copy_expert(SQL_EQUIP_COPY, buffer)
+                    
+                    fracao = fracao_lida(file)
+                    if fracao is not None:
+                        progress_bar.progress(fracao)
+                    status_text.text(f"Carregando: {total_linhas_original} linhas lidas")
+            finally:
+                cursor.close()
             
-            errors.append({
-                'linha': counter,
-                'hostname': row_data.get('hostname'),
-                'motivo': f"Duplicado: {campo_dup}"
-            })
-        
-        except Exception as e:
-            # Erro inesperado
-            ignored += 1
-            errors.append({
-                'linha': counter,
-                'hostname': row_data.get('hostname'),
-                'motivo': f"Erro: {str(e)[:50]}"
-            })
-        
-        # Atualiza barra de progresso (CORRIGIDO)
-        progress = min(counter / total_to_process, 1.0)  # Garante que nunca ultrapasse 1.0
-        progress_bar.progress(progress)
-        status_text.text(f"Processando: {counter}/{total_to_process} | Inseridos: {inserted} | Ignorados: {ignored}")
+            errors = []
+            inseridos = set()
+            if total_to_process:
+                status_text.text("Gravando equipamentos...")
+                con.execute(text(SQL_EQUIP_ANALISE))
+                errors = [dict(r) for r in con.execute(text(SQL_EQUIP_IGNORADOS)).mappings()]
+                inseridos = {r[0] for r in con.execute(text(SQL_EQUIP_INSERIR))}
+                
+                # Aprovadas na análise mas barradas pelo ON CONFLICT: gravadas por outra sessão durante a importação
+                if len(inseridos) < total_to_process - len(errors):
+                    errors.extend(
+                        dict(r) for r in con.execute(text(SQL_EQUIP_CONFLITOS), {"inseridos": list(inseridos)}).mappings()
+                    )
     
     progress_bar.empty()
     status_text.empty()
     
+    st.info(f"📄 Arquivo lido: {total_linhas_original} linhas encontradas")
+    st.info(f"🧹 Após limpeza: {linhas_limpas} linhas restantes")
+    
+    if linhas_limpas > total_to_process:
+        st.warning(f"⚠️ {linhas_limpas - total_to_process} linhas removidas por falta de campos obrigatórios")
+    
+    if not total_to_process:
+        st.error("❌ Nenhum registro válido encontrado após validação!")
+        return 0, total_linhas_original
+    
+    inserted = len(inseridos)
+    ignored = len(errors)
+    
     # Mostra resumo
     st.success(f"✅ Importação concluída!")
     
     col1, col2 = st.columns(2)
     with col1:
         st.metric("Total de linhas", total_linhas_original)
-        st.metric("Registros válidos", len(df))
+        st.metric("Registros válidos", total_to_process)
     with col2:
         st.metric("✅ Inseridos", inserted, delta=f"+{inserted}")
         st.metric("⚠️ Ignorados", ignored)
@@ -449,10 +402,6 @@ def importar_equipamentos(file) -> (int, int):
             st.dataframe(errors_df, use_container_width=True)
     elif errors:
         with st.expander(f"⚠️ Ver registros ignorados ({len(errors)} total)", expanded=False):
-            st.warning(f"Mostrando os primeiros 20 de {len(errors)} registros ignorados:")
-            errors_df = pd.DataFrame(errors[:20])
-            st.dataframe(errors_df, use_container_width=True)
-    
-    conn.dispose()
+            st.dataframe(pd.DataFrame(errors), use_container_width=True)
     
-    return inserted, ignored
\ No newline at end of file
+    return inserted, ignored
@@ -1,7 +1,9 @@
 # CÓDIGO ATUALIZADO E COMPLETO PARA: sistema_os_crud-main/importar_dados.py
 
 import streamlit as st
-from import_export import importar_equipamentos, importar_os_interna, importar_os_externa
+from import_export import importar_equipamentos, importar_os
+from exportacao import FORMATOS, ArquivoGrandeDemais, exportar_todas_os, ler_e_remover
+from database import get_connection
 from sqlalchemy.exc import IntegrityError # Importa o erro específico
 
 def render():
@@ -50,8 +52,10 @@ def render():
             if st.button("Importar OS Interna"):
                 try:
                     with st.spinner("Importando OS Internas..."):
-                        inserted_int = importar_os_interna(uploaded_os_int)
+                        inserted_int, ignored_int = importar_os(uploaded_os_int, "Interna")
                     st.success(f"Importação concluída! {inserted_int} novos registros de OS Interna adicionados.")
+                    if ignored_int > 0:
+                        st.warning(f"{ignored_int} linhas foram ignoradas (número de OS vazio ou já existente).")
                 except Exception as e:
                     st.error(f"Ocorreu um erro na importação de OS Interna: {e}")
 
@@ -62,7 +66,39 @@ def render():
             if st.button("Importar OS Externa"):
                 try:
                     with st.spinner("Importando OS Externas..."):
-                        inserted_ext = importar_os_externa(uploaded_os_ext)
+                        inserted_ext, ignored_ext = importar_os(uploaded_os_ext, "Externa")
                     st.success(f"Importação concluída! {inserted_ext} novos registros de OS Externa adicionados.")
+                    if ignored_ext > 0:
+                        st.warning(f"{ignored_ext} linhas foram ignoradas (número de OS vazio ou já existente).")
                 except Exception as e:
-                    st.error(f"Ocorreu um erro na importação de OS Externa: {e}")
\ No newline at end of file
+                    st.error(f"Ocorreu um erro na importação de OS Externa: {e}")
+
+    # --- 3. EXPORTAÇÃO COMPLETA ---
+    st.markdown("---")
+    st.markdown("#### 3. Exportar Todas as Ordens de Serviço")
+    st.write("Gera um arquivo com todas as OS (auditoria/backup). No Excel, uma aba para cada tipo.")
+
+    col_fmt, col_btn = st.columns([2, 1])
+    formato = col_fmt.radio(
+        "Formato",
+        list(FORMATOS),
+        format_func=lambda f: FORMATOS[f][0],
+        horizontal=True,
+        label_visibility="collapsed",
+        key="exportacao_completa_formato",
+    )
+    if col_btn.button("Gerar arquivo", use_container_width=True, key="exportacao_completa_gerar"):
+        try:
+            with st.spinner("Gerando arquivo..."):
+                dados = ler_e_remover(exportar_todas_os(get_connection(), formato))
+            st.download_button(
+                f"Baixar {FORMATOS[formato][0]}",
+                data=dados,
+                file_name=f"auditoria_os.{formato}",
+                mime=FORMATOS[formato][1],
+                type="primary",
+            )
+        except ArquivoGrandeDemais as e:
+            st.warning(str(e))
+        except Exception as e:
+            st.error(f"Erro ao exportar: {e}")
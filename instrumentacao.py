@@ -0,0 +1,354 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/instrumentacao.py
+# Medição do tempo de cada interação (rerun da página inteira ou de um fragmento)
+# e de cada comando SQL.
+#
+# Os tempos ficam em um buffer circular do processo, com o nome do trecho medido
+# ('pagina:Filtrar OS', 'fragmento:filtro.resultados', ...). Comparar os dois
+# mostra quanto custa uma paginação ou abertura de modal que roda só o fragmento
+# em vez da página inteira com o menu lateral.
+#
+# Os comandos SQL são medidos por eventos do engine (instalar_ganchos_sql) e
+# guardados em outro buffer com a página e o perfil da sessão que os executou,
+# agrupáveis pela impressão digital (o SQL sem literais). Com METRICAS_PERSISTIR
+# as amostras também são gravadas em lote na tabela metricas_desempenho por uma
+# thread, fora do caminho das requisições.
+#
+# Além dos buffers, cada amostra entra em histogramas acumulados (contagem por
+# faixa de duração, como no Prometheus), expostos em /metrics por monitoramento.py.
+
+import functools
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+import streamlit as st
+from sqlalchemy import event, text
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from config import METRICAS_PERSISTIR, METRICAS_RETENCAO_DIAS
+
+MAX_REGISTROS = 2000
+MAX_CONSULTAS = 2000
+
+# Gravação no banco: a cada INTERVALO_GRAVACAO segundos ou ao juntar TAMANHO_LOTE amostras
+TAMANHO_LOTE = 500
+INTERVALO_GRAVACAO = 10
+
+_registros = deque(maxlen=MAX_REGISTROS)
+_consultas = deque(maxlen=MAX_CONSULTAS)
+_lock = threading.Lock()
+
+# Amostras aguardando gravação; limitado para não crescer com o banco fora do ar
+_pendentes = deque(maxlen=TAMANHO_LOTE * 20)
+_gravador = None
+
+SQL_GRAVAR_METRICAS = text("""
+    INSERT INTO metricas_desempenho (registrado_em, tipo, nome, pagina, papel, duracao_ms)
+    VALUES (:registrado_em, :tipo, :nome, :pagina, :papel, :duracao_ms)
+""")
+SQL_LIMPAR_METRICAS = text("""
+    DELETE FROM metricas_desempenho
+    WHERE registrado_em < CURRENT_TIMESTAMP - make_interval(days => :dias)
+""")
+
+# Limites (segundos) das faixas dos histogramas
+BUCKETS_RAPIDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKETS_LENTOS = (0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+HISTOGRAMAS = {
+    "consulta_segundos": ("Duração dos comandos SQL, por página", BUCKETS_RAPIDOS),
+    "trecho_segundos": ("Duração de páginas, renderizações e fragmentos", BUCKETS_RAPIDOS),
+    "bcrypt_segundos": ("Duração da verificação de senha (bcrypt)", BUCKETS_RAPIDOS),
+    "pdf_segundos": ("Duração da geração de PDF, por documento", BUCKETS_RAPIDOS),
+    "exportacao_segundos": ("Duração das exportações, por formato", BUCKETS_LENTOS),
+    "importacao_segundos": ("Duração das importações em massa, por tipo", BUCKETS_LENTOS),
+}
+
+# métrica -> rótulos (tupla ordenada) -> [contagens acumuladas por faixa, soma, total]
+_histogramas = {metrica: {} for metrica in HISTOGRAMAS}
+
+# Sessões do Streamlit -> último instante (monotonic) em que executaram algo
+_sessoes = {}
+JANELA_SESSAO_ATIVA = 300
+
+_RE_LITERAIS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%\(\w+\)s|%s")
+_RE_LISTAS = re.compile(r"\(\?(?:\s*,\s*\?)+\)")
+_RE_ESPACOS = re.compile(r"\s+")
+
+
+def _contexto():
+    """Página e perfil da sessão que está executando (None fora do script do Streamlit)."""
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return None, None
+    with _lock:
+        _sessoes[ctx.session_id] = time.monotonic()
+    return st.session_state.get("current_page"), st.session_state.get("role")
+
+
+def observar(metrica, segundos, **rotulos):
+    """Soma uma amostra ao histograma da métrica (ver HISTOGRAMAS)."""
+    limites = HISTOGRAMAS[metrica][1]
+    chave = tuple(sorted(rotulos.items()))
+    with _lock:
+        estado = _histogramas[metrica].get(chave)
+        if estado is None:
+            estado = _histogramas[metrica][chave] = [[0] * len(limites), 0.0, 0]
+        for i, limite in enumerate(limites):
+            if segundos <= limite:
+                estado[0][i] += 1
+        estado[1] += segundos
+        estado[2] += 1
+
+
+@contextmanager
+def cronometrar(metrica, **rotulos):
+    """Como medir(), mas só alimenta o histograma da métrica."""
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        observar(metrica, time.perf_counter() - inicio, **rotulos)
+
+
+def cronometrado(metrica, **rotulos):
+    """Decorador de cronometrar()."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with cronometrar(metrica, **rotulos):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def histogramas():
+    """Cópia dos histogramas: lista de (métrica, descrição, limites, [(rótulos, contagens, soma, total)])."""
+    with _lock:
+        return [
+            (metrica, descricao, limites, [
+                (dict(chave), list(estado[0]), estado[1], estado[2])
+                for chave, estado in sorted(_histogramas[metrica].items())
+            ])
+            for metrica, (descricao, limites) in HISTOGRAMAS.items()
+        ]
+
+
+def sessoes_ativas():
+    """Sessões que executaram algo nos últimos JANELA_SESSAO_ATIVA segundos."""
+    limite = time.monotonic() - JANELA_SESSAO_ATIVA
+    with _lock:
+        for sessao in [s for s, instante in _sessoes.items() if instante < limite]:
+            del _sessoes[sessao]
+        return len(_sessoes)
+
+
+def _enfileirar(tipo, nome, pagina, papel, segundos):
+    if _gravador is None:
+        return
+    _pendentes.append({
+        "registrado_em": datetime.now().astimezone(),
+        "tipo": tipo,
+        "nome": nome,
+        "pagina": pagina,
+        "papel": papel,
+        "duracao_ms": segundos * 1000,
+    })
+    if len(_pendentes) >= TAMANHO_LOTE:
+        _gravador.acordar.set()
+
+
+def registrar(nome, segundos):
+    with _lock:
+        _registros.append((nome, segundos))
+    tipo, _, trecho = nome.rpartition(":")
+    observar("trecho_segundos", segundos, tipo=tipo, nome=trecho)
+    _enfileirar("trecho", nome, *_contexto(), segundos)
+
+
+# Trechos em medição na thread do script; cada um guarda se foi marcado ocioso
+_em_medicao = threading.local()
+
+
+@contextmanager
+def medir(nome):
+    """
+    Mede o bloco, inclusive quando ele termina em st.rerun()/st.stop(). Não
+    registra nada se o bloco foi marcado com marcar_ocioso() (ver notificacoes.py).
+    """
+    pilha = _em_medicao.__dict__.setdefault("pilha", [])
+    pilha.append(None)
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        segundos = time.perf_counter() - inicio
+        if pilha.pop() is not True:
+            registrar(nome, segundos)
+
+
+def marcar_ocioso(ocioso=True):
+    """
+    Marca o trecho em medição: ocioso=True quando a passagem não fez nada (ex.:
+    verificação periódica sem alterações); ocioso=False quando fez algo, e então
+    o trecho é registrado mesmo que outra parte dele tenha sido ociosa.
+    """
+    pilha = getattr(_em_medicao, "pilha", None)
+    if pilha and pilha[-1] is not False:
+        pilha[-1] = ocioso
+
+
+def medido(nome):
+    """Decorador de medir(); aplicar por baixo de @st.fragment."""
+    def decorador(funcao):
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            with medir(nome):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorador
+
+
+def impressao_digital(sql):
+    """SQL sem literais e parâmetros, com espaços normalizados: agrupa execuções da mesma consulta."""
+    sql = _RE_LITERAIS.sub("?", sql)
+    sql = _RE_ESPACOS.sub(" ", sql).strip()
+    return _RE_LISTAS.sub("(?)", sql)
+
+
+def registrar_consulta(sql, segundos):
+    pagina, papel = _contexto()
+    impressao = impressao_digital(sql)
+    with _lock:
+        _consultas.append((datetime.now().astimezone(), impressao, pagina, papel, segundos))
+    observar("consulta_segundos", segundos, pagina=pagina or "")
+    _enfileirar("consulta", impressao, pagina, papel, segundos)
+
+
+def instalar_ganchos_sql(engine):
+    """Mede cada comando executado pelo engine; inicia a gravação no banco, se ativada."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _antes(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("inicio_comandos", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _depois(conn, cursor, statement, parameters, context, executemany):
+        inicio = conn.info["inicio_comandos"].pop()
+        # A gravação das próprias métricas não é medida
+        if not conn.get_execution_options().get("sem_metricas"):
+            registrar_consulta(statement, time.perf_counter() - inicio)
+
+    @event.listens_for(engine, "handle_error")
+    def _erro(contexto):
+        inicios = contexto.connection.info.get("inicio_comandos") if contexto.connection is not None else None
+        if inicios:
+            inicios.pop()
+
+    if METRICAS_PERSISTIR:
+        _iniciar_gravador(engine)
+
+
+class _Gravador(threading.Thread):
+    """Grava as amostras pendentes em lote e apaga as antigas de hora em hora."""
+
+    def __init__(self, engine):
+        super().__init__(name="gravador-metricas", daemon=True)
+        self.engine = engine
+        self.acordar = threading.Event()
+        self.ultima_limpeza = 0
+
+    def run(self):
+        while True:
+            self.acordar.wait(INTERVALO_GRAVACAO)
+            self.acordar.clear()
+            try:
+                self.gravar()
+            except Exception as e:
+                print(f"❌ Erro ao gravar métricas de desempenho: {e}")
+
+    def gravar(self):
+        lote = []
+        while _pendentes and len(lote) < TAMANHO_LOTE * 4:
+            lote.append(_pendentes.popleft())
+        limpar = time.monotonic() - self.ultima_limpeza > 3600
+        if not lote and not limpar:
+            return
+        with self.engine.connect() as con:
+            con = con.execution_options(sem_metricas=True)
+            with con.begin():
+                if lote:
+                    con.execute(SQL_GRAVAR_METRICAS, lote)
+                if limpar:
+                    con.execute(SQL_LIMPAR_METRICAS, {"dias": METRICAS_RETENCAO_DIAS})
+        if limpar:
+            self.ultima_limpeza = time.monotonic()
+
+
+def _iniciar_gravador(engine):
+    global _gravador
+    if _gravador is None:
+        _gravador = _Gravador(engine)
+        _gravador.start()
+
+
+def persistencia_ativa():
+    return _gravador is not None
+
+
+def _percentil(valores_ordenados, p):
+    indice = min(len(valores_ordenados) - 1, int(round(p * (len(valores_ordenados) - 1))))
+    return valores_ordenados[indice]
+
+
+def _agrupar(amostras):
+    """Lista de dicts (nome, execuções, p50/p95/máximo/total em ms) a partir de (nome, segundos)."""
+    por_nome = {}
+    for nome, segundos in amostras:
+        por_nome.setdefault(nome, []).append(segundos * 1000)
+    linhas = []
+    for nome, valores in sorted(por_nome.items()):
+        valores.sort()
+        linhas.append({
+            "nome": nome,
+            "execucoes": len(valores),
+            "p50_ms": round(_percentil(valores, 0.50), 1),
+            "p95_ms": round(_percentil(valores, 0.95), 1),
+            "max_ms": round(valores[-1], 1),
+            "total_ms": round(sum(valores), 1),
+        })
+    return linhas
+
+
+def resumo():
+    """Lista de dicts (nome, execuções, p50/p95/máximo/total em ms) por trecho medido."""
+    with _lock:
+        registros = list(_registros)
+    return _agrupar(registros)
+
+
+def resumo_consultas():
+    """Como resumo(), por impressão digital de consulta, das que mais somam tempo para as que menos."""
+    with _lock:
+        consultas = [(impressao, segundos) for _, impressao, _, _, segundos in _consultas]
+    return sorted(_agrupar(consultas), key=lambda linha: linha["total_ms"], reverse=True)
+
+
+def consultas_mais_lentas(quantidade=20):
+    """Execuções mais demoradas ainda no buffer, com página e perfil de quem as disparou."""
+    with _lock:
+        consultas = list(_consultas)
+    consultas.sort(key=lambda c: c[4], reverse=True)
+    return [
+        {
+            "momento": momento,
+            "duracao_ms": round(segundos * 1000, 1),
+            "pagina": pagina,
+            "papel": papel,
+            "consulta": impressao,
+        }
+        for momento, impressao, pagina, papel, segundos in consultas[:quantidade]
+    ]
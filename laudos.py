@@ -3,6 +3,8 @@ import streamlit as st
 import pandas as pd
 from sqlalchemy import text
 from database import get_connection
+from instrumentacao import medido, cronometrado
+from tabela import selecionar_linha, barra_de_acoes
 from config import TECNICOS, STATUS_LAUDO
 from datetime import datetime
 import pytz
@@ -19,6 +21,7 @@ import os
 
 TECNICOS_LAUDO = sorted(TECNICOS)
 
+@cronometrado("pdf_segundos", documento="laudo")
 def gerar_pdf_laudo(laudo_data):
     """Gera um PDF do laudo técnico seguindo o modelo fornecido."""
     buffer = io.BytesIO()
@@ -279,7 +282,7 @@ def f_registrar_laudo(conn, data):
                 con.execute(query_laudo, data)
                 
                 # Atualizar status da OS para AGUARDANDO PEÇA(S)
-                tipo_os = data.get('tipo_os')  # "OS Interna" ou "OS Externa"
+                tipo_os = data.get('tipo_os')  # "Interna" ou "Externa"
                 numero_os = data.get('numero_os')
                 
                 # Determinar qual tabela usar
@@ -433,8 +436,6 @@ def render():
     """Renderiza a interface de laudos técnicos."""
     conn = get_connection()
     
-    render_modal_detalhes(conn)
-    
     st.title("📋 Laudos Técnicos")
     
     tab1, tab2 = st.tabs(["📝 Registrar Laudo", "🔍 Consulta de Laudos"])
@@ -561,88 +562,105 @@ def render():
     
     # ================= ABA 2: CONSULTA DE LAUDOS =================
     with tab2:
-        st.markdown("### Consulta de Laudos Técnicos")
+        render_consulta_laudos(conn)
+
+# Filtrar, abrir o modal de detalhes e interagir com ele roda só este fragmento
+@st.fragment
+@medido("fragmento:laudos.consulta")
+def render_consulta_laudos(conn):
+    render_modal_detalhes(conn)
+    
+    st.markdown("### Consulta de Laudos Técnicos")
+    
+    with st.expander("Filtros de Pesquisa"):
+        col1, col2 = st.columns(2)
+        with col1:
+            f_tipo_os = st.multiselect("Tipo de OS", ["Interna", "Externa"], key="filter_tipo_os")
+            f_status = st.multiselect("Status do Laudo", STATUS_LAUDO, key="filter_status")
+        with col2:
+            f_tecnico = st.multiselect("Técnico", TECNICOS_LAUDO, key="filter_tecnico")
+            f_numero_os = st.text_input("Número da OS", key="filter_numero_os")
+        f_busca = st.text_input(
+            "Busca no diagnóstico",
+            placeholder="Ex: fonte queimada",
+            key="filter_busca",
+            help="Procura as palavras no diagnóstico e nas observações (sem diferenciar acentos)."
+        )
         
-        with st.expander("Filtros de Pesquisa"):
-            col1, col2 = st.columns(2)
-            with col1:
-                f_tipo_os = st.multiselect("Tipo de OS", ["Interna", "Externa"], key="filter_tipo_os")
-                f_status = st.multiselect("Status do Laudo", STATUS_LAUDO, key="filter_status")
-            with col2:
-                f_tecnico = st.multiselect("Técnico", TECNICOS_LAUDO, key="filter_tecnico")
-                f_numero_os = st.text_input("Número da OS", key="filter_numero_os")
+        filtrar = st.button("Aplicar Filtros", use_container_width=True)
+    
+    if filtrar or 'df_laudos_filtrados' in st.session_state:
+        if filtrar:
+            query_base = "SELECT id, numero_os, tipo_os, diagnostico, estado_conservacao, status, tecnico FROM laudos"
+            where_clauses = []
+            params = {}
             
-            filtrar = st.button("Aplicar Filtros", use_container_width=True)
-        
-        if filtrar or 'df_laudos_filtrados' in st.session_state:
-            if filtrar:
-                query_base = "SELECT id, numero_os, tipo_os, diagnostico, estado_conservacao, status, tecnico FROM laudos"
-                where_clauses = []
-                params = {}
-                
-                if f_tipo_os:
-                    placeholders = ','.join([f":tipo{i}" for i in range(len(f_tipo_os))])
-                    where_clauses.append(f"tipo_os IN ({placeholders})")
-                    for i, t in enumerate(f_tipo_os):
-                        params[f"tipo{i}"] = t
-                
-                if f_status:
-                    placeholders = ','.join([f":status{i}" for i in range(len(f_status))])
-                    where_clauses.append(f"status IN ({placeholders})")
-                    for i, s in enumerate(f_status):
-                        params[f"status{i}"] = s
-                
-                if f_tecnico:
-                    placeholders = ','.join([f":tec{i}" for i in range(len(f_tecnico))])
-                    where_clauses.append(f"tecnico IN ({placeholders})")
-                    for i, t in enumerate(f_tecnico):
-                        params[f"tec{i}"] = t
-                
-                if f_numero_os:
-                    where_clauses.append("numero_os ILIKE :numero_os")
-                    params["numero_os"] = f"%{f_numero_os}%"
-                
-                if where_clauses:
-                    query_base += " WHERE " + " AND ".join(where_clauses)
-                
-                query_base += " ORDER BY id DESC"
-                
-                try:
-                    with conn.connect() as con:
-                        df_laudos = pd.read_sql(text(query_base), con, params=params)
-                    st.session_state.df_laudos_filtrados = df_laudos
-                except Exception as e:
-                    st.error(f"Erro ao filtrar laudos: {e}")
-                    return
+            if f_tipo_os:
+                placeholders = ','.join([f":tipo{i}" for i in range(len(f_tipo_os))])
+                where_clauses.append(f"tipo_os IN ({placeholders})")
+                for i, t in enumerate(f_tipo_os):
+                    params[f"tipo{i}"] = t
+            
+            if f_status:
+                placeholders = ','.join([f":status{i}" for i in range(len(f_status))])
+                where_clauses.append(f"status IN ({placeholders})")
+                for i, s in enumerate(f_status):
+                    params[f"status{i}"] = s
+            
+            if f_tecnico:
+                placeholders = ','.join([f":tec{i}" for i in range(len(f_tecnico))])
+                where_clauses.append(f"tecnico IN ({placeholders})")
+                for i, t in enumerate(f_tecnico):
+                    params[f"tec{i}"] = t
             
-            df_laudos = st.session_state.get('df_laudos_filtrados', pd.DataFrame())
+            if f_numero_os:
+                where_clauses.append("numero_os ILIKE :numero_os")
+                params["numero_os"] = f"%{f_numero_os}%"
             
-            if df_laudos.empty:
-                st.info("Nenhum laudo encontrado.")
+            # Coluna gerada `busca` com índice GIN (migração 0013)
+            if f_busca and f_busca.strip():
+                where_clauses.append("busca @@ websearch_to_tsquery('busca_pt', :busca)")
+                params["busca"] = f_busca.strip()
+            
+            if where_clauses:
+                query_base += " WHERE " + " AND ".join(where_clauses)
+            
+            if "busca" in params:
+                query_base += " ORDER BY ts_rank(busca, websearch_to_tsquery('busca_pt', :busca)) DESC, id DESC"
             else:
-                st.markdown(f"**{len(df_laudos)} Laudo(s) encontrado(s)**")
-                
-                cols_header = st.columns((0.5, 1, 1, 2, 1.5, 1, 0.8))
-                headers = ["ID", "OS", "Tipo", "Diagnóstico", "Estado", "Status", ""]
-                for col, header in zip(cols_header, headers):
-                    col.markdown(f"**{header}**")
-                
-                st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
-                
-                for idx, row in df_laudos.iterrows():
-                    cols = st.columns((0.5, 1, 1, 2, 1.5, 1, 0.8))
-                    cols[0].write(str(row["id"]))
-                    cols[1].write(str(row["numero_os"]))
-                    cols[2].write(str(row["tipo_os"]))
-                    
-                    diagnostico_resumido = str(row["diagnostico"])[:40] + "..." if len(str(row["diagnostico"])) > 40 else str(row["diagnostico"])
-                    cols[3].write(diagnostico_resumido)
-                    
-                    cols[4].write(str(row.get("estado_conservacao", "N/A")))
-                    cols[5].write(str(row["status"]))
-                    
-                    if cols[6].button("👁️", key=f"view_{row['id']}", help="Ver detalhes do laudo", use_container_width=True):
-                        st.session_state.view_laudo_id = row["id"]
-                        st.rerun()
-                    
-                    st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
\ No newline at end of file
+                query_base += " ORDER BY id DESC"
+            
+            try:
+                with conn.connect() as con:
+                    df_laudos = pd.read_sql(text(query_base), con, params=params)
+                st.session_state.df_laudos_filtrados = df_laudos
+            except Exception as e:
+                st.error(f"Erro ao filtrar laudos: {e}")
+                return
+        
+        df_laudos = st.session_state.get('df_laudos_filtrados', pd.DataFrame())
+        
+        if df_laudos.empty:
+            st.info("Nenhum laudo encontrado.")
+        else:
+            st.markdown(f"**{len(df_laudos)} Laudo(s) encontrado(s)**")
+            
+            # Todos os laudos filtrados em uma tabela virtualizada; detalhes pela linha selecionada
+            linha = selecionar_linha(
+                df_laudos,
+                "laudos_tabela",
+                ordem=["id", "numero_os", "tipo_os", "diagnostico", "estado_conservacao", "status", "tecnico"],
+                colunas={
+                    "id": "ID",
+                    "numero_os": "OS",
+                    "tipo_os": "Tipo",
+                    "diagnostico": st.column_config.TextColumn("Diagnóstico", width="large"),
+                    "estado_conservacao": "Estado",
+                    "status": "Status",
+                    "tecnico": "Técnico",
+                },
+            )
+            
+            if barra_de_acoes(linha, [("👁️ Ver detalhes", "Ver detalhes do laudo")], "laudos_acoes"):
+                st.session_state.view_laudo_id = int(linha["id"])
+                st.rerun(scope="fragment")
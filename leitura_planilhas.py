@@ -0,0 +1,201 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/leitura_planilhas.py
+# Leitura de planilhas (CSV, XLSX, ODS) em blocos de linhas.
+#
+# Nenhum formato é carregado inteiro: o CSV é lido pelo parser C do pandas em
+# blocos (o separador é detectado em uma amostra do início do arquivo), o XLSX
+# é percorrido linha a linha pelo openpyxl em modo somente leitura e o ODS é
+# lido com iterparse direto do content.xml compactado. A memória usada depende
+# apenas do tamanho do bloco, não do tamanho do arquivo.
+
+import csv
+import io
+import re
+import zipfile
+from datetime import datetime, time
+from xml.etree.ElementTree import iterparse
+
+import openpyxl
+import pandas as pd
+
+TAMANHO_AMOSTRA = 64 * 1024
+
+_NS_TABLE = "urn:oasis:names:tc:opendocument:xmlns:table:1.0"
+_NS_OFFICE = "urn:oasis:names:tc:opendocument:xmlns:office:1.0"
+_NS_TEXT = "urn:oasis:names:tc:opendocument:xmlns:text:1.0"
+
+_ODS_TABELA = f"{{{_NS_TABLE}}}table"
+_ODS_LINHA = f"{{{_NS_TABLE}}}table-row"
+_ODS_CELULAS = (f"{{{_NS_TABLE}}}table-cell", f"{{{_NS_TABLE}}}covered-table-cell")
+_ODS_PARAGRAFO = f"{{{_NS_TEXT}}}p"
+
+
+def _detectar_csv(file):
+    """Separador e codificação a partir de uma amostra do início do arquivo."""
+    amostra = file.read(TAMANHO_AMOSTRA)
+    file.seek(0)
+    if isinstance(amostra, str):
+        texto, codificacao = amostra, None
+    else:
+        try:
+            texto, codificacao = amostra.decode("utf-8-sig"), "utf-8-sig"
+        except UnicodeDecodeError as e:
+            if e.start >= len(amostra) - 3:
+                # A amostra cortou um caractere multibyte no final
+                texto, codificacao = amostra[:e.start].decode("utf-8-sig"), "utf-8-sig"
+            else:
+                texto, codificacao = amostra.decode("latin-1"), "latin-1"
+    # Só linhas completas entram na detecção
+    if len(amostra) == TAMANHO_AMOSTRA and "\n" in texto:
+        texto = texto[:texto.rfind("\n")]
+    try:
+        separador = csv.Sniffer().sniff(texto, delimiters=";,\t|").delimiter
+    except csv.Error:
+        separador = ";" if texto.count(";") >= texto.count(",") else ","
+    return separador, codificacao
+
+
+def _blocos_csv(file, tamanho_bloco, linha_cabecalho):
+    separador, codificacao = _detectar_csv(file)
+    try:
+        leitor = pd.read_csv(
+            file, sep=separador, engine="c", encoding=codificacao,
+            header=linha_cabecalho, dtype=str, chunksize=tamanho_bloco,
+        )
+    except (pd.errors.EmptyDataError, pd.errors.ParserError):
+        # Arquivo vazio ou sem a linha de cabeçalho
+        return
+    with leitor:
+        yield from leitor
+
+
+def _texto_celula(valor):
+    """Horas viram texto HH:MM:SS, que _to_time_str entende."""
+    if isinstance(valor, time):
+        return valor.strftime("%H:%M:%S")
+    return valor
+
+
+def _blocos_de_linhas(linhas, tamanho_bloco, linha_cabecalho):
+    """
+    Agrupa linhas (sequências de valores) em DataFrames. Linhas em branco são
+    ignoradas, como no read_csv; a de índice `linha_cabecalho` dá os nomes.
+    """
+    cabecalho = None
+    bloco = []
+    posicao = 0
+    for linha in linhas:
+        if all(v is None or v == "" for v in linha):
+            continue
+        if cabecalho is None:
+            if posicao == linha_cabecalho:
+                cabecalho = [
+                    f"Unnamed: {i}" if v is None or v == "" else v for i, v in enumerate(linha)
+                ]
+            posicao += 1
+            continue
+        linha = [_texto_celula(v) for v in linha[:len(cabecalho)]]
+        linha.extend([None] * (len(cabecalho) - len(linha)))
+        bloco.append(linha)
+        if len(bloco) == tamanho_bloco:
+            yield pd.DataFrame(bloco, columns=cabecalho)
+            bloco = []
+    if bloco:
+        yield pd.DataFrame(bloco, columns=cabecalho)
+
+
+def _linhas_xlsx(file):
+    livro = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    try:
+        yield from livro.worksheets[0].iter_rows(values_only=True)
+    finally:
+        livro.close()
+
+
+def _valor_celula_ods(celula):
+    tipo = celula.get(f"{{{_NS_OFFICE}}}value-type")
+    if tipo in ("float", "percentage", "currency"):
+        valor = float(celula.get(f"{{{_NS_OFFICE}}}value"))
+        return int(valor) if valor.is_integer() else valor
+    if tipo == "date":
+        return datetime.fromisoformat(celula.get(f"{{{_NS_OFFICE}}}date-value"))
+    if tipo == "time":
+        # Duração ISO 8601, ex.: PT14H30M00S
+        m = re.match(r"PT(\d+)H(\d+)M(\d+)", celula.get(f"{{{_NS_OFFICE}}}time-value", ""))
+        return f"{int(m[1]) % 24:02d}:{m[2]}:{m[3]}" if m else None
+    if tipo == "boolean":
+        return celula.get(f"{{{_NS_OFFICE}}}boolean-value") == "true"
+    texto = "\n".join("".join(p.itertext()) for p in celula.iter(_ODS_PARAGRAFO))
+    return texto or None
+
+
+def _linhas_ods(file):
+    """Linhas da primeira tabela do content.xml, descartando cada uma após lida."""
+    with zipfile.ZipFile(file) as arquivo, arquivo.open("content.xml") as conteudo:
+        pilha = []
+        for evento, elemento in iterparse(conteudo, events=("start", "end")):
+            if evento == "start":
+                pilha.append(elemento)
+                continue
+            pilha.pop()
+            if elemento.tag == _ODS_TABELA:
+                return
+            if elemento.tag != _ODS_LINHA:
+                continue
+            valores = []
+            vazias = 0
+            for celula in elemento:
+                if celula.tag not in _ODS_CELULAS:
+                    continue
+                repeticoes = int(celula.get(f"{{{_NS_TABLE}}}number-columns-repeated", 1))
+                valor = _valor_celula_ods(celula)
+                if valor is None:
+                    # Células vazias repetidas (comuns no fim da linha) só são
+                    # materializadas se houver um valor depois delas
+                    vazias += repeticoes
+                    continue
+                valores.extend([None] * vazias)
+                valores.extend([valor] * repeticoes)
+                vazias = 0
+            repeticoes = int(elemento.get(f"{{{_NS_TABLE}}}number-rows-repeated", 1))
+            if pilha:
+                pilha[-1].remove(elemento)
+            if valores:
+                for _ in range(repeticoes):
+                    yield list(valores)
+
+
+def _formato(file):
+    nome = (getattr(file, "name", None) or "").lower()
+    if nome.endswith(".csv"):
+        return "csv"
+    if not zipfile.is_zipfile(file):
+        file.seek(0)
+        return "csv"
+    with zipfile.ZipFile(file) as arquivo:
+        formato = "ods" if "content.xml" in arquivo.namelist() else "xlsx"
+    file.seek(0)
+    return formato
+
+
+def ler_em_blocos(file, tamanho_bloco, linha_cabecalho=0):
+    """
+    Gera DataFrames de até `tamanho_bloco` linhas com o conteúdo do arquivo
+    (CSV, XLSX ou ODS, primeira planilha). `linha_cabecalho` é o índice, entre
+    as linhas não vazias, da linha com os nomes das colunas; as anteriores são
+    descartadas. Valores de CSV chegam como texto.
+    """
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    formato = _formato(file)
+    if formato == "csv":
+        return _blocos_csv(file, tamanho_bloco, linha_cabecalho)
+    linhas = _linhas_ods(file) if formato == "ods" else _linhas_xlsx(file)
+    return _blocos_de_linhas(linhas, tamanho_bloco, linha_cabecalho)
+
+
+def fracao_lida(file):
+    """Quanto do arquivo já foi lido (0 a 1), para barras de progresso."""
+    tamanho = getattr(file, "size", None)
+    if not tamanho:
+        return None
+    return min(file.tell() / tamanho, 1.0)
@@ -0,0 +1,148 @@
+-- Schema base do sistema (antigo database.init_db).
+-- Idempotente: pode ser aplicada tanto em bancos novos quanto em bancos
+-- criados pelas versões anteriores da aplicação.
+
+CREATE TABLE IF NOT EXISTS os_interna (
+    id SERIAL PRIMARY KEY,
+    numero VARCHAR(255) UNIQUE,
+    secretaria VARCHAR(255),
+    setor VARCHAR(255),
+    data DATE,
+    hora TIME,
+    solicitante VARCHAR(255),
+    telefone VARCHAR(255),
+    solicitacao_cliente TEXT,
+    categoria VARCHAR(255),
+    patrimonio VARCHAR(255),
+    equipamento VARCHAR(255),
+    descricao TEXT,
+    servico_executado TEXT,
+    status VARCHAR(255),
+    data_finalizada TIMESTAMP WITH TIME ZONE,
+    data_retirada TIMESTAMP WITH TIME ZONE,
+    retirada_por VARCHAR(255),
+    tecnico VARCHAR(255),
+    registrado_por VARCHAR(100),
+    laudo_filename VARCHAR(255),
+    laudo_pdf BYTEA
+);
+
+CREATE TABLE IF NOT EXISTS os_externa (
+    id SERIAL PRIMARY KEY,
+    numero VARCHAR(255) UNIQUE,
+    secretaria VARCHAR(255),
+    setor VARCHAR(255),
+    data DATE,
+    hora TIME,
+    solicitante VARCHAR(255),
+    telefone VARCHAR(255),
+    solicitacao_cliente TEXT,
+    categoria VARCHAR(255),
+    patrimonio VARCHAR(255),
+    equipamento VARCHAR(255),
+    descricao TEXT,
+    servico_executado TEXT,
+    status VARCHAR(255),
+    data_finalizada TIMESTAMP WITH TIME ZONE,
+    data_retirada TIMESTAMP WITH TIME ZONE,
+    retirada_por VARCHAR(255),
+    tecnico VARCHAR(255),
+    registrado_por VARCHAR(100),
+    laudo_filename VARCHAR(255),
+    laudo_pdf BYTEA
+);
+
+CREATE TABLE IF NOT EXISTS equipamentos (
+    id SERIAL PRIMARY KEY,
+    categoria VARCHAR(255) NOT NULL,
+    patrimonio VARCHAR(255),
+    hostname VARCHAR(255) NOT NULL,
+    especificacao TEXT NOT NULL,
+    secretaria VARCHAR(255) NOT NULL,
+    setor VARCHAR(255),
+    localizacao_fisica VARCHAR(255),
+    ip VARCHAR(255) UNIQUE,
+    mac VARCHAR(255) UNIQUE,
+    subrede VARCHAR(255),
+    gateway VARCHAR(255),
+    dns VARCHAR(255),
+    numero_serie VARCHAR(255),
+    observacoes TEXT,
+    data_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS laudos (
+    id SERIAL PRIMARY KEY,
+    tipo_os VARCHAR(50) NOT NULL,
+    numero_os VARCHAR(255) NOT NULL,
+    estado_conservacao VARCHAR(50),
+    diagnostico TEXT,
+    equipamento_completo VARCHAR(20),
+    observacoes TEXT,
+    tecnico VARCHAR(255) NOT NULL,
+    status VARCHAR(100) NOT NULL DEFAULT 'PENDENTE',
+    data_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    data_atendimento TIMESTAMP WITH TIME ZONE
+);
+
+CREATE TABLE IF NOT EXISTS usuarios (
+    id SERIAL PRIMARY KEY,
+    username VARCHAR(100) UNIQUE NOT NULL,
+    password_hash TEXT NOT NULL,
+    role VARCHAR(50) NOT NULL CHECK (role IN ('admin', 'tecnico', 'administrativo', 'tecnico_recarga')),
+    display_name VARCHAR(255),
+    data_registro TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- A versão anterior recriava esta tabela (DROP ... CASCADE) a cada inicialização;
+-- bancos existentes já estão neste formato, então basta garantir que ela exista.
+CREATE TABLE IF NOT EXISTS recargas (
+    id SERIAL PRIMARY KEY,
+    numero_recarga VARCHAR(50) UNIQUE NOT NULL,
+    -- Data e hora de abertura (automáticas)
+    data_abertura DATE NOT NULL,
+    hora_abertura TIME NOT NULL,
+    -- Localização
+    secretaria VARCHAR(100) NOT NULL,
+    localizacao VARCHAR(255) NOT NULL,
+    -- Insumo
+    insumo VARCHAR(255) NOT NULL,
+    -- Status simplificado
+    status VARCHAR(50) NOT NULL DEFAULT 'EM ABERTO'
+        CHECK (status IN ('EM ABERTO', 'AGUARDANDO INSUMO', 'RECARGA FEITA')),
+    -- Responsável e metadados
+    responsavel VARCHAR(100),
+    data_atualizacao TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Contador de numeração de OS por tabela/ano (ver contadores.py)
+CREATE TABLE IF NOT EXISTS contadores_os (
+    tabela VARCHAR(50) NOT NULL,
+    ano SMALLINT NOT NULL,
+    ultimo_numero INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (tabela, ano)
+);
+
+-- Colunas adicionadas ao longo do tempo em bancos antigos
+ALTER TABLE os_interna ADD COLUMN IF NOT EXISTS registrado_por VARCHAR(100);
+ALTER TABLE os_externa ADD COLUMN IF NOT EXISTS registrado_por VARCHAR(100);
+ALTER TABLE usuarios ADD COLUMN IF NOT EXISTS display_name VARCHAR(255);
+ALTER TABLE os_interna ADD COLUMN IF NOT EXISTS laudo_visualizado BOOLEAN DEFAULT FALSE;
+ALTER TABLE os_externa ADD COLUMN IF NOT EXISTS laudo_visualizado BOOLEAN DEFAULT FALSE;
+
+-- Tabela LAUDOS no formato atual
+ALTER TABLE laudos DROP COLUMN IF EXISTS componente;
+ALTER TABLE laudos DROP COLUMN IF EXISTS especificacao;
+ALTER TABLE laudos DROP COLUMN IF EXISTS link_compra;
+ALTER TABLE laudos ADD COLUMN IF NOT EXISTS tipo_os VARCHAR(50);
+ALTER TABLE laudos ADD COLUMN IF NOT EXISTS numero_os VARCHAR(255);
+ALTER TABLE laudos ADD COLUMN IF NOT EXISTS estado_conservacao VARCHAR(50);
+ALTER TABLE laudos ADD COLUMN IF NOT EXISTS diagnostico TEXT;
+ALTER TABLE laudos ADD COLUMN IF NOT EXISTS equipamento_completo VARCHAR(20);
+
+CREATE INDEX IF NOT EXISTS idx_laudos_numero_os ON laudos (numero_os, tipo_os);
+CREATE INDEX IF NOT EXISTS idx_recargas_numero ON recargas (numero_recarga);
+CREATE INDEX IF NOT EXISTS idx_recargas_status ON recargas (status);
+CREATE INDEX IF NOT EXISTS idx_recargas_data ON recargas (data_abertura);
+CREATE INDEX IF NOT EXISTS idx_recargas_secretaria ON recargas (secretaria);
@@ -0,0 +1,7 @@
+-- Antigo update_schema.py: recria a constraint de perfis.
+-- O script anterior omitia 'tecnico_recarga'; aqui a lista fica igual à de config.VALID_ROLES.
+
+ALTER TABLE usuarios DROP CONSTRAINT IF EXISTS usuarios_role_check;
+ALTER TABLE usuarios
+    ADD CONSTRAINT usuarios_role_check
+    CHECK (role IN ('admin', 'tecnico', 'administrativo', 'tecnico_recarga'));
@@ -0,0 +1,95 @@
+-- Consolida os_interna/os_externa em uma única tabela `ordens_servico`,
+-- particionada por LIST (tipo). As tabelas antigas viram views de compatibilidade
+-- sobre as partições, de modo que INSERT/UPDATE/DELETE antigos continuam funcionando.
+--
+-- Os ids das duas tabelas antigas se sobrepõem, por isso a chave primária é (id, tipo).
+-- Novos registros recebem ids de uma sequência única.
+
+CREATE TABLE ordens_servico (
+    id SERIAL NOT NULL,
+    tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('Interna', 'Externa')),
+    numero VARCHAR(255),
+    secretaria VARCHAR(255),
+    setor VARCHAR(255),
+    data DATE,
+    hora TIME,
+    solicitante VARCHAR(255),
+    telefone VARCHAR(255),
+    solicitacao_cliente TEXT,
+    categoria VARCHAR(255),
+    patrimonio VARCHAR(255),
+    equipamento VARCHAR(255),
+    descricao TEXT,
+    servico_executado TEXT,
+    status VARCHAR(255),
+    data_finalizada TIMESTAMP WITH TIME ZONE,
+    data_retirada TIMESTAMP WITH TIME ZONE,
+    retirada_por VARCHAR(255),
+    tecnico VARCHAR(255),
+    registrado_por VARCHAR(100),
+    laudo_filename VARCHAR(255),
+    laudo_pdf BYTEA,
+    laudo_visualizado BOOLEAN DEFAULT FALSE,
+    PRIMARY KEY (id, tipo),
+    UNIQUE (numero, tipo)
+) PARTITION BY LIST (tipo);
+
+CREATE TABLE ordens_servico_interna PARTITION OF ordens_servico (tipo DEFAULT 'Interna')
+    FOR VALUES IN ('Interna');
+CREATE TABLE ordens_servico_externa PARTITION OF ordens_servico (tipo DEFAULT 'Externa')
+    FOR VALUES IN ('Externa');
+
+-- --- Migração dos dados ---
+INSERT INTO ordens_servico (
+    id, tipo, numero, secretaria, setor, data, hora, solicitante, telefone,
+    solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+    status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+    laudo_filename, laudo_pdf, laudo_visualizado
+)
+SELECT
+    id, 'Interna', numero, secretaria, setor, data, hora, solicitante, telefone,
+    solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+    status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+    laudo_filename, laudo_pdf, laudo_visualizado
+FROM os_interna;
+
+INSERT INTO ordens_servico (
+    id, tipo, numero, secretaria, setor, data, hora, solicitante, telefone,
+    solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+    status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+    laudo_filename, laudo_pdf, laudo_visualizado
+)
+SELECT
+    id, 'Externa', numero, secretaria, setor, data, hora, solicitante, telefone,
+    solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+    status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+    laudo_filename, laudo_pdf, laudo_visualizado
+FROM os_externa;
+
+SELECT setval(pg_get_serial_sequence('ordens_servico', 'id'), COALESCE((SELECT MAX(id) FROM ordens_servico), 0) + 1, false);
+
+DROP TABLE os_interna;
+DROP TABLE os_externa;
+
+-- --- Views de compatibilidade (mesmas colunas e ordem das tabelas antigas) ---
+CREATE VIEW os_interna AS
+    SELECT id, numero, secretaria, setor, data, hora, solicitante, telefone,
+           solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+           status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+           laudo_filename, laudo_pdf, laudo_visualizado
+    FROM ordens_servico_interna;
+
+CREATE VIEW os_externa AS
+    SELECT id, numero, secretaria, setor, data, hora, solicitante, telefone,
+           solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+           status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+           laudo_filename, laudo_pdf, laudo_visualizado
+    FROM ordens_servico_externa;
+
+ALTER VIEW os_interna ALTER COLUMN id SET DEFAULT nextval(pg_get_serial_sequence('ordens_servico', 'id')::regclass);
+ALTER VIEW os_externa ALTER COLUMN id SET DEFAULT nextval(pg_get_serial_sequence('ordens_servico', 'id')::regclass);
+ALTER VIEW os_interna ALTER COLUMN laudo_visualizado SET DEFAULT FALSE;
+ALTER VIEW os_externa ALTER COLUMN laudo_visualizado SET DEFAULT FALSE;
+
+-- "Todas as OS do técnico X ordenadas por data" em uma única varredura de índice
+CREATE INDEX idx_ordens_servico_tecnico_data ON ordens_servico (tecnico, data DESC, hora DESC);
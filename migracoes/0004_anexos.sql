@@ -0,0 +1,63 @@
+-- Anexos das OS (laudos em PDF e afins) fora da linha da OS.
+--
+-- Antes o PDF ficava em ordens_servico.laudo_pdf, e todo SELECT * das listagens
+-- trazia os binários junto. Agora o conteúdo fica em `anexos` e as listagens
+-- consultam apenas os metadados. O download lê o conteúdo em blocos (ver anexos.py).
+
+CREATE TABLE anexos (
+    id SERIAL PRIMARY KEY,
+    tipo_os VARCHAR(10) NOT NULL,
+    os_id INTEGER NOT NULL,
+    nome_arquivo VARCHAR(255) NOT NULL,
+    mime VARCHAR(100) NOT NULL DEFAULT 'application/pdf',
+    tamanho BIGINT NOT NULL,
+    sha256 CHAR(64) NOT NULL,
+    conteudo BYTEA NOT NULL,
+    criado_em TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
+    FOREIGN KEY (os_id, tipo_os) REFERENCES ordens_servico (id, tipo) ON DELETE CASCADE
+);
+
+-- PDFs já são comprimidos: armazenamento TOAST sem compressão permite que
+-- substring() leia só os blocos pedidos, sem descomprimir o arquivo inteiro.
+ALTER TABLE anexos ALTER COLUMN conteudo SET STORAGE EXTERNAL;
+
+CREATE INDEX idx_anexos_os ON anexos (tipo_os, os_id);
+
+-- --- Migração dos PDFs existentes ---
+INSERT INTO anexos (tipo_os, os_id, nome_arquivo, mime, tamanho, sha256, conteudo)
+SELECT
+    tipo,
+    id,
+    COALESCE(NULLIF(laudo_filename, ''), 'laudo_' || REPLACE(numero, '/', '_') || '.pdf'),
+    'application/pdf',
+    octet_length(laudo_pdf),
+    encode(sha256(laudo_pdf), 'hex'),
+    laudo_pdf
+FROM ordens_servico
+WHERE laudo_pdf IS NOT NULL AND octet_length(laudo_pdf) > 0;
+
+-- As views de compatibilidade dependem das colunas removidas: recria sem elas
+DROP VIEW os_interna;
+DROP VIEW os_externa;
+
+ALTER TABLE ordens_servico DROP COLUMN laudo_pdf;
+ALTER TABLE ordens_servico DROP COLUMN laudo_filename;
+
+CREATE VIEW os_interna AS
+    SELECT id, numero, secretaria, setor, data, hora, solicitante, telefone,
+           solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+           status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+           laudo_visualizado
+    FROM ordens_servico_interna;
+
+CREATE VIEW os_externa AS
+    SELECT id, numero, secretaria, setor, data, hora, solicitante, telefone,
+           solicitacao_cliente, categoria, patrimonio, equipamento, descricao, servico_executado,
+           status, data_finalizada, data_retirada, retirada_por, tecnico, registrado_por,
+           laudo_visualizado
+    FROM ordens_servico_externa;
+
+ALTER VIEW os_interna ALTER COLUMN id SET DEFAULT nextval(pg_get_serial_sequence('ordens_servico', 'id')::regclass);
+ALTER VIEW os_externa ALTER COLUMN id SET DEFAULT nextval(pg_get_serial_sequence('ordens_servico', 'id')::regclass);
+ALTER VIEW os_interna ALTER COLUMN laudo_visualizado SET DEFAULT FALSE;
+ALTER VIEW os_externa ALTER COLUMN laudo_visualizado SET DEFAULT FALSE;
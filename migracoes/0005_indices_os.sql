@@ -0,0 +1,18 @@
+-- Índices de ordens_servico desenhados para as consultas mais frequentes
+-- (ver consultas.py; bench/verificar_indices.py confere os planos).
+
+-- Contagens por status (dashboard) e por técnico + status (Minhas Tarefas):
+-- o status vem primeiro para que o mesmo índice sirva às duas consultas.
+CREATE INDEX idx_ordens_servico_status_tecnico ON ordens_servico (status, tecnico);
+
+-- Tarefas pendentes do técnico, já na ordem de exibição. Índice parcial: as OS
+-- encerradas são a grande maioria e nunca aparecem nessa lista.
+-- O predicado precisa ser idêntico ao de consultas.SQL_TAREFAS_TECNICO.
+CREATE INDEX idx_ordens_servico_pendentes_tecnico ON ordens_servico (tecnico, data DESC, hora DESC)
+    WHERE status NOT IN ('ENTREGUE AO CLIENTE', 'AGUARDANDO RETIRADA', 'FINALIZADO');
+
+-- Últimas OS finalizadas do técnico (ORDER BY data_finalizada DESC LIMIT n)
+CREATE INDEX idx_ordens_servico_tecnico_finalizada ON ordens_servico (tecnico, data_finalizada DESC);
+
+-- Listagem do filtro por período, ordenada por data/hora
+CREATE INDEX idx_ordens_servico_data_hora ON ordens_servico (data DESC, hora DESC);
@@ -0,0 +1,110 @@
+-- Consolidado diário de indicadores das OS, mantido incrementalmente por trigger.
+--
+-- Uma linha por (dia, tipo, secretaria, técnico, categoria, status) com a
+-- quantidade de OS e a soma dos tempos de atendimento (em dias) usados no TMA.
+-- Dashboards e relatórios por período leem daqui em vez de varrer o histórico.
+-- Valores nulos das dimensões são gravados como '' (e a data nula como -infinity)
+-- para que possam fazer parte da chave primária.
+
+CREATE TABLE kpi_diario (
+    dia DATE NOT NULL,
+    tipo VARCHAR(10) NOT NULL,
+    secretaria VARCHAR(255) NOT NULL,
+    tecnico VARCHAR(255) NOT NULL,
+    categoria VARCHAR(255) NOT NULL,
+    status VARCHAR(255) NOT NULL,
+    qtd BIGINT NOT NULL DEFAULT 0,
+    qtd_tma BIGINT NOT NULL DEFAULT 0,
+    soma_tma_dias NUMERIC NOT NULL DEFAULT 0,
+    PRIMARY KEY (dia, tipo, secretaria, tecnico, categoria, status)
+);
+
+-- Tempo de atendimento em dias (mesma regra do dashboard): data_finalizada no
+-- horário de São Paulo menos a data de abertura. NULL quando não se aplica.
+CREATE FUNCTION kpi_dias_atendimento(p_data DATE, p_data_finalizada TIMESTAMP WITH TIME ZONE)
+RETURNS NUMERIC
+LANGUAGE sql STABLE AS $$
+    SELECT EXTRACT(EPOCH FROM (p_data_finalizada AT TIME ZONE 'America/Sao_Paulo') - p_data::timestamp)::numeric / 86400
+$$;
+
+-- Soma (sinal = 1) ou subtrai (sinal = -1) uma OS do consolidado.
+-- Recebe os campos (e não a linha) porque nos triggers das partições
+-- NEW/OLD têm o tipo da partição, e não o de ordens_servico.
+CREATE FUNCTION kpi_diario_aplicar(
+    p_data DATE, p_tipo VARCHAR, p_secretaria VARCHAR, p_tecnico VARCHAR,
+    p_categoria VARCHAR, p_status VARCHAR, p_data_finalizada TIMESTAMP WITH TIME ZONE,
+    sinal INTEGER
+)
+RETURNS void
+LANGUAGE plpgsql AS $$
+DECLARE
+    v_dias NUMERIC := kpi_dias_atendimento(p_data, p_data_finalizada);
+    v_conta_tma BOOLEAN := v_dias IS NOT NULL AND v_dias >= 0;
+    v_dia DATE := COALESCE(p_data, '-infinity'::date);
+BEGIN
+    INSERT INTO kpi_diario AS k (dia, tipo, secretaria, tecnico, categoria, status, qtd, qtd_tma, soma_tma_dias)
+    VALUES (
+        v_dia, p_tipo, COALESCE(p_secretaria, ''), COALESCE(p_tecnico, ''),
+        COALESCE(p_categoria, ''), COALESCE(p_status, ''),
+        sinal,
+        CASE WHEN v_conta_tma THEN sinal ELSE 0 END,
+        CASE WHEN v_conta_tma THEN sinal * v_dias ELSE 0 END
+    )
+    ON CONFLICT (dia, tipo, secretaria, tecnico, categoria, status) DO UPDATE SET
+        qtd = k.qtd + EXCLUDED.qtd,
+        qtd_tma = k.qtd_tma + EXCLUDED.qtd_tma,
+        soma_tma_dias = k.soma_tma_dias + EXCLUDED.soma_tma_dias;
+
+    IF sinal < 0 THEN
+        DELETE FROM kpi_diario
+        WHERE dia = v_dia AND tipo = p_tipo
+          AND secretaria = COALESCE(p_secretaria, '') AND tecnico = COALESCE(p_tecnico, '')
+          AND categoria = COALESCE(p_categoria, '') AND status = COALESCE(p_status, '')
+          AND qtd = 0;
+    END IF;
+END;
+$$;
+
+CREATE FUNCTION kpi_diario_trigger()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP = 'UPDATE'
+       AND OLD.data IS NOT DISTINCT FROM NEW.data
+       AND OLD.tipo IS NOT DISTINCT FROM NEW.tipo
+       AND OLD.secretaria IS NOT DISTINCT FROM NEW.secretaria
+       AND OLD.tecnico IS NOT DISTINCT FROM NEW.tecnico
+       AND OLD.categoria IS NOT DISTINCT FROM NEW.categoria
+       AND OLD.status IS NOT DISTINCT FROM NEW.status
+       AND OLD.data_finalizada IS NOT DISTINCT FROM NEW.data_finalizada THEN
+        RETURN NULL;  -- nada que afete o consolidado mudou
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM kpi_diario_aplicar(OLD.data, OLD.tipo, OLD.secretaria, OLD.tecnico,
+                                   OLD.categoria, OLD.status, OLD.data_finalizada, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM kpi_diario_aplicar(NEW.data, NEW.tipo, NEW.secretaria, NEW.tecnico,
+                                   NEW.categoria, NEW.status, NEW.data_finalizada, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_ordens_servico_kpi_diario
+    AFTER INSERT OR UPDATE OR DELETE ON ordens_servico
+    FOR EACH ROW EXECUTE FUNCTION kpi_diario_trigger();
+
+-- --- Carga inicial a partir do histórico ---
+INSERT INTO kpi_diario (dia, tipo, secretaria, tecnico, categoria, status, qtd, qtd_tma, soma_tma_dias)
+SELECT
+    COALESCE(data, '-infinity'::date), tipo, COALESCE(secretaria, ''), COALESCE(tecnico, ''),
+    COALESCE(categoria, ''), COALESCE(status, ''),
+    COUNT(*),
+    COUNT(*) FILTER (WHERE dias >= 0),
+    COALESCE(SUM(dias) FILTER (WHERE dias >= 0), 0)
+FROM (
+    SELECT *, kpi_dias_atendimento(data, data_finalizada) AS dias FROM ordens_servico
+) os
+GROUP BY 1, 2, 3, 4, 5, 6;
@@ -0,0 +1,12 @@
+-- Chave de ordenação do filtro de OS, para paginação por keyset.
+--
+-- O filtro ordena por data DESC, hora DESC (nulos primeiro). Comparações de
+-- linha como (data, hora, id) < (...) não funcionam com nulos, então a ordem é
+-- materializada em uma única coluna não nula: data nula vira +infinity (continua
+-- no topo) e hora nula vira 24:00 (topo do respectivo dia). O id desempata.
+
+ALTER TABLE ordens_servico
+    ADD COLUMN ordenacao TIMESTAMP NOT NULL
+    GENERATED ALWAYS AS (COALESCE(data, 'infinity'::date) + COALESCE(hora, '24:00'::time)) STORED;
+
+CREATE INDEX idx_ordens_servico_ordenacao ON ordens_servico (ordenacao DESC, id DESC);
@@ -0,0 +1,14 @@
+-- Normaliza laudos.tipo_os para os mesmos valores de ordens_servico.tipo.
+--
+-- Versões antigas gravavam 'OS Interna'/'OS Externa'; as atuais gravam
+-- 'Interna'/'Externa'. Com um único formato, a verificação de "OS sem laudo"
+-- vira um NOT EXISTS simples, servido por idx_laudos_numero_os (numero_os, tipo_os).
+
+UPDATE laudos
+SET tipo_os = INITCAP(TRIM(REGEXP_REPLACE(tipo_os, '^\s*OS\s+', '', 'i')))
+WHERE tipo_os IS DISTINCT FROM INITCAP(TRIM(REGEXP_REPLACE(tipo_os, '^\s*OS\s+', '', 'i')));
+
+-- NOT VALID: passa a valer para novos registros sem impedir a migração caso
+-- exista algum valor legado fora do padrão (conferir com VALIDATE CONSTRAINT).
+ALTER TABLE laudos
+    ADD CONSTRAINT laudos_tipo_os_check CHECK (tipo_os IN ('Interna', 'Externa')) NOT VALID;
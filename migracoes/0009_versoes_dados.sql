@@ -0,0 +1,69 @@
+-- Versões de dados para invalidação de cache.
+--
+-- Cada chave (ex.: 'tecnico:FULANO') tem um contador incrementado por trigger
+-- sempre que os dados correspondentes mudam. A aplicação guarda em cache o
+-- resultado junto com a versão lida e só refaz a consulta quando ela muda.
+
+CREATE TABLE versoes_dados (
+    chave VARCHAR(255) PRIMARY KEY,
+    versao BIGINT NOT NULL DEFAULT 0,
+    atualizado_em TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE FUNCTION versoes_dados_incrementar(p_chave VARCHAR)
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO versoes_dados (chave, versao) VALUES (p_chave, 1)
+    ON CONFLICT (chave) DO UPDATE SET
+        versao = versoes_dados.versao + 1,
+        atualizado_em = CURRENT_TIMESTAMP;
+$$;
+
+-- OS: invalida a carga de trabalho do técnico antigo e do novo
+CREATE FUNCTION ordens_servico_versao_tecnico()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.tecnico IS NOT NULL THEN
+        PERFORM versoes_dados_incrementar('tecnico:' || OLD.tecnico);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.tecnico IS NOT NULL
+       AND (TG_OP = 'INSERT' OR NEW.tecnico IS DISTINCT FROM OLD.tecnico) THEN
+        PERFORM versoes_dados_incrementar('tecnico:' || NEW.tecnico);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_ordens_servico_versao_tecnico
+    AFTER INSERT OR UPDATE OR DELETE ON ordens_servico
+    FOR EACH ROW EXECUTE FUNCTION ordens_servico_versao_tecnico();
+
+-- Laudos: mudam a lista "Pendentes de Laudo" do técnico responsável pela OS
+CREATE FUNCTION versoes_dados_incrementar_tecnico_os(p_numero VARCHAR, p_tipo VARCHAR)
+RETURNS void
+LANGUAGE sql AS $$
+    SELECT versoes_dados_incrementar('tecnico:' || t.tecnico)
+    FROM (
+        SELECT DISTINCT tecnico FROM ordens_servico
+        WHERE numero = p_numero AND tipo = p_tipo AND tecnico IS NOT NULL
+    ) t;
+$$;
+
+CREATE FUNCTION laudos_versao_tecnico()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP <> 'DELETE' THEN
+        PERFORM versoes_dados_incrementar_tecnico_os(NEW.numero_os, NEW.tipo_os);
+    END IF;
+    IF TG_OP <> 'INSERT' THEN
+        PERFORM versoes_dados_incrementar_tecnico_os(OLD.numero_os, OLD.tipo_os);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_laudos_versao_tecnico
+    AFTER INSERT OR UPDATE OR DELETE ON laudos
+    FOR EACH ROW EXECUTE FUNCTION laudos_versao_tecnico();
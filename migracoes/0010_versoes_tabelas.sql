@@ -0,0 +1,39 @@
+-- Versão por tabela para o cache compartilhado de consultas (cache_consultas.py).
+--
+-- Cada comando que altera uma das tabelas abaixo incrementa 'tabela:<nome>' em
+-- versoes_dados (uma vez por comando, não por linha). As partições de
+-- ordens_servico também recebem o trigger porque as views os_interna/os_externa
+-- gravam direto nelas, sem passar pela tabela mãe.
+
+CREATE FUNCTION versoes_dados_tabela()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    PERFORM versoes_dados_incrementar('tabela:' || TG_ARGV[0]);
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_ordens_servico_versao_tabela
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ordens_servico
+    FOR EACH STATEMENT EXECUTE FUNCTION versoes_dados_tabela('ordens_servico');
+
+CREATE TRIGGER trg_ordens_servico_interna_versao_tabela
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ordens_servico_interna
+    FOR EACH STATEMENT EXECUTE FUNCTION versoes_dados_tabela('ordens_servico');
+
+CREATE TRIGGER trg_ordens_servico_externa_versao_tabela
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON ordens_servico_externa
+    FOR EACH STATEMENT EXECUTE FUNCTION versoes_dados_tabela('ordens_servico');
+
+CREATE TRIGGER trg_laudos_versao_tabela
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON laudos
+    FOR EACH STATEMENT EXECUTE FUNCTION versoes_dados_tabela('laudos');
+
+CREATE TRIGGER trg_equipamentos_versao_tabela
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON equipamentos
+    FOR EACH STATEMENT EXECUTE FUNCTION versoes_dados_tabela('equipamentos');
+
+CREATE TRIGGER trg_recargas_versao_tabela
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON recargas
+    FOR EACH STATEMENT EXECUTE FUNCTION versoes_dados_tabela('recargas');
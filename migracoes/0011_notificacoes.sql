@@ -0,0 +1,36 @@
+-- Avisos de alteração via LISTEN/NOTIFY (notificacoes.py).
+--
+-- Toda chave incrementada em versoes_dados passa a ser anunciada no canal
+-- 'versoes_dados' com a própria chave como conteúdo ('tecnico:FULANO',
+-- 'tabela:recargas', ...). O NOTIFY só é entregue no COMMIT e avisos iguais na
+-- mesma transação são enviados uma única vez.
+
+CREATE OR REPLACE FUNCTION versoes_dados_incrementar(p_chave VARCHAR)
+RETURNS void
+LANGUAGE sql AS $$
+    INSERT INTO versoes_dados (chave, versao) VALUES (p_chave, 1)
+    ON CONFLICT (chave) DO UPDATE SET
+        versao = versoes_dados.versao + 1,
+        atualizado_em = CURRENT_TIMESTAMP;
+    SELECT pg_notify('versoes_dados', p_chave);
+$$;
+
+-- Recargas: versão por status, para que o painel do técnico de recarga só
+-- recarregue quando uma recarga entra ou sai dos status que ele acompanha
+CREATE FUNCTION recargas_versao_status()
+RETURNS trigger
+LANGUAGE plpgsql AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.status IS NOT NULL THEN
+        PERFORM versoes_dados_incrementar('recargas:status:' || OLD.status);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.status IS NOT NULL THEN
+        PERFORM versoes_dados_incrementar('recargas:status:' || NEW.status);
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+CREATE TRIGGER trg_recargas_versao_status
+    AFTER INSERT OR UPDATE OR DELETE ON recargas
+    FOR EACH ROW EXECUTE FUNCTION recargas_versao_status();
@@ -0,0 +1,17 @@
+-- Amostras de desempenho gravadas em lote pela aplicação (instrumentacao.py)
+-- quando METRICAS_PERSISTIR=1: o tempo de cada trecho medido (página,
+-- renderização, fragmento) e de cada comando SQL, com a página e o perfil do
+-- usuário que o disparou. A própria aplicação apaga as amostras antigas.
+
+CREATE TABLE metricas_desempenho (
+    id BIGSERIAL PRIMARY KEY,
+    registrado_em TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    tipo VARCHAR(10) NOT NULL CHECK (tipo IN ('trecho', 'consulta')),
+    -- Nome do trecho ('pagina:Dashboard') ou impressão digital da consulta
+    nome TEXT NOT NULL,
+    pagina VARCHAR(100),
+    papel VARCHAR(50),
+    duracao_ms DOUBLE PRECISION NOT NULL
+);
+
+CREATE INDEX idx_metricas_desempenho_registrado_em ON metricas_desempenho (registrado_em);
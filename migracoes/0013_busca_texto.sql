@@ -0,0 +1,49 @@
+-- Busca por texto: trigramas para os ILIKE '%x%' e busca textual em português.
+--
+-- pg_trgm e unaccent são extensões confiáveis a partir do PostgreSQL 13: o dono
+-- do banco pode criá-las sem superusuário.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE EXTENSION IF NOT EXISTS unaccent;
+
+-- --- Substrings (ILIKE '%x%') ---
+-- Buscas parciais de equipamentos.py (hostname, IP) e laudos.py (número da OS).
+-- Com gin_trgm_ops o ILIKE usa o índice em vez de ler a tabela inteira (a
+-- partir de 3 caracteres; com menos, o PostgreSQL volta à leitura sequencial).
+CREATE INDEX idx_equipamentos_hostname_trgm ON equipamentos USING GIN (hostname gin_trgm_ops);
+CREATE INDEX idx_equipamentos_ip_trgm ON equipamentos USING GIN (ip gin_trgm_ops);
+CREATE INDEX idx_laudos_numero_os_trgm ON laudos USING GIN (numero_os gin_trgm_ops);
+
+-- --- Busca livre ---
+-- Configuração 'busca_pt': o dicionário do português (radicais e palavras
+-- vazias) precedido do unaccent, para que "saude" encontre "SAÚDE" e vice-versa.
+-- Com a configuração fixa, to_tsvector é IMMUTABLE e pode ser coluna gerada.
+CREATE TEXT SEARCH CONFIGURATION busca_pt (COPY = portuguese);
+ALTER TEXT SEARCH CONFIGURATION busca_pt
+    ALTER MAPPING FOR hword, hword_part, word WITH unaccent, portuguese_stem;
+
+-- Pesos (ts_rank): A número, B equipamento/categoria/secretaria/setor,
+-- C texto do pedido, D serviço executado. A coluna é mantida pelo próprio
+-- PostgreSQL em cada INSERT/UPDATE; adicioná-la reescreve a tabela uma vez.
+ALTER TABLE ordens_servico
+    ADD COLUMN busca tsvector NOT NULL
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('busca_pt', COALESCE(numero, '')), 'A') ||
+        setweight(to_tsvector('busca_pt',
+            COALESCE(equipamento, '') || ' ' || COALESCE(categoria, '') || ' ' ||
+            COALESCE(secretaria, '') || ' ' || COALESCE(setor, '')), 'B') ||
+        setweight(to_tsvector('busca_pt',
+            COALESCE(solicitacao_cliente, '') || ' ' || COALESCE(descricao, '')), 'C') ||
+        setweight(to_tsvector('busca_pt', COALESCE(servico_executado, '')), 'D')
+    ) STORED;
+
+CREATE INDEX idx_ordens_servico_busca ON ordens_servico USING GIN (busca);
+
+ALTER TABLE laudos
+    ADD COLUMN busca tsvector NOT NULL
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('busca_pt', COALESCE(diagnostico, '')), 'A') ||
+        setweight(to_tsvector('busca_pt', COALESCE(observacoes, '')), 'B')
+    ) STORED;
+
+CREATE INDEX idx_laudos_busca ON laudos USING GIN (busca);
@@ -0,0 +1,6 @@
+-- kpi_dias_atendimento (0006) converte o horário com AT TIME ZONE, que depende
+-- da base de fusos do servidor: a função é STABLE, não IMMUTABLE. Ela só é
+-- usada pelos triggers do consolidado, então nada exige IMMUTABLE.
+-- (Bancos novos já a criam como STABLE; aqui corrige os que aplicaram a 0006 antiga.)
+
+ALTER FUNCTION kpi_dias_atendimento(DATE, TIMESTAMP WITH TIME ZONE) STABLE;
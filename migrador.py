@@ -0,0 +1,116 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/migrador.py
+# Migrações de schema versionadas e executadas uma única vez.
+#
+# Os arquivos ficam em migracoes/NNNN_descricao.sql e são aplicados em ordem,
+# cada um na sua própria transação, registrando a versão em `schema_version`.
+# Um advisory lock garante que apenas uma réplica da aplicação migre por vez;
+# com o banco em dia, a inicialização custa apenas uma consulta de versão.
+
+import os
+import re
+import sys
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import ProgrammingError
+
+PASTA_MIGRACOES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migracoes")
+
+# Chave arbitrária (fixa) do pg_advisory_lock usado durante as migrações
+CHAVE_LOCK_MIGRACAO = 7240001
+
+_PADRAO_ARQUIVO = re.compile(r"^(\d{4})_(\w+)\.sql$")
+
+
+def listar_migracoes():
+    """Retorna a lista ordenada de (versao, nome, caminho) das migrações disponíveis."""
+    migracoes = []
+    for arquivo in os.listdir(PASTA_MIGRACOES):
+        match = _PADRAO_ARQUIVO.match(arquivo)
+        if match:
+            migracoes.append((int(match.group(1)), match.group(2), os.path.join(PASTA_MIGRACOES, arquivo)))
+    migracoes.sort()
+
+    versoes = [m[0] for m in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise RuntimeError("Existem migrações com o mesmo número de versão em migracoes/.")
+    return migracoes
+
+
+def versao_atual(con):
+    """Versão aplicada no banco (0 se o controle de versão ainda não existe)."""
+    try:
+        versao = con.execute(text("SELECT COALESCE(MAX(versao), 0) FROM schema_version")).scalar()
+        con.commit()
+        return versao
+    except ProgrammingError:
+        con.rollback()
+        return 0
+
+
+def aplicar_migracoes(engine):
+    """
+    Aplica as migrações pendentes. Retorna a quantidade aplicada.
+    Pode ser chamada por várias réplicas ao mesmo tempo: o advisory lock serializa
+    a execução e a versão é conferida novamente após obtê-lo.
+    """
+    migracoes = listar_migracoes()
+    ultima_versao = migracoes[-1][0] if migracoes else 0
+
+    with engine.connect() as con:
+        if versao_atual(con) >= ultima_versao:
+            return 0
+
+        # Migrações podem passar do statement_timeout da aplicação (ver config.py)
+        con.execute(text("SET statement_timeout = 0"))
+        con.execute(text("SELECT pg_advisory_lock(:chave)"), {"chave": CHAVE_LOCK_MIGRACAO})
+        con.commit()
+        try:
+            with con.begin():
+                con.execute(text("""
+                    CREATE TABLE IF NOT EXISTS schema_version (
+                        versao INTEGER PRIMARY KEY,
+                        nome VARCHAR(255) NOT NULL,
+                        aplicada_em TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+                    )
+                """))
+
+            # Outra réplica pode ter migrado enquanto aguardávamos o lock
+            versao = versao_atual(con)
+            aplicadas = 0
+            for numero, nome, caminho in migracoes:
+                if numero <= versao:
+                    continue
+                with open(caminho, encoding="utf-8") as f:
+                    sql = f.read()
+                with con.begin():
+                    # no_parameters: o SQL é enviado como está (sem interpretar '%')
+                    con.exec_driver_sql(sql, execution_options={"no_parameters": True})
+                    con.execute(
+                        text("INSERT INTO schema_version (versao, nome) VALUES (:versao, :nome)"),
+                        {"versao": numero, "nome": nome},
+                    )
+                print(f"✅ Migração {numero:04d} ({nome}) aplicada.")
+                aplicadas += 1
+            return aplicadas
+        except Exception as e:
+            print(f"❌ ERRO AO APLICAR MIGRAÇÕES: {e}")
+            raise
+        finally:
+            con.execute(text("SELECT pg_advisory_unlock(:chave)"), {"chave": CHAVE_LOCK_MIGRACAO})
+            # A conexão volta ao pool com o timeout padrão da sessão
+            con.execute(text("RESET statement_timeout"))
+            con.commit()
+
+
+if __name__ == "__main__":
+    # Execução manual: python migrador.py (usa as variáveis DB_* do ambiente)
+    from config import DB_HOST, DB_NAME, DB_USER, DB_PASSWORD, DB_PORT
+
+    url = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    engine = create_engine(url)
+    try:
+        total = aplicar_migracoes(engine)
+        print(f"Banco em dia ({total} migração(ões) aplicada(s) nesta execução).")
+    except Exception:
+        sys.exit(1)
+    finally:
+        engine.dispose()
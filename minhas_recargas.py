@@ -3,12 +3,19 @@ import streamlit as st
 import pandas as pd
 from sqlalchemy import text
 from database import get_connection
-from datetime import datetime
+from notificacoes import INTERVALO_VERIFICACAO, dados_do_painel
+from instrumentacao import medido
+from config import SECRETARIAS
+from datetime import datetime, timedelta
 import pytz
 
 # Status de recargas simplificado
 STATUS_RECARGA = ["EM ABERTO", "AGUARDANDO INSUMO", "RECARGA FEITA"]
 
+# Histórico: período inicial e máximo de linhas enviadas para a tabela
+HISTORICO_DIAS_PADRAO = 90
+HISTORICO_LIMITE = 1000
+
 def f_registrar_recarga(conn, dados_recarga):
     """Registra uma nova recarga."""
     try:
@@ -51,6 +58,32 @@ def f_atualizar_recarga(conn, recarga_id, novo_status):
         st.error(f"Erro ao atualizar recarga: {e}")
         return False
 
+def buscar_historico_recargas(conn, data_inicio, data_fim, status=None, secretarias=None):
+    """
+    Recargas do período (filtros aplicados no banco), das mais recentes para as
+    mais antigas. Traz até HISTORICO_LIMITE + 1 linhas: a excedente só indica
+    que o resultado foi cortado.
+    """
+    condicoes = ["data_abertura BETWEEN :data_inicio AND :data_fim"]
+    params = {"data_inicio": data_inicio, "data_fim": data_fim, "limite": HISTORICO_LIMITE + 1}
+    if status:
+        condicoes.append("status = ANY(:status)")
+        params["status"] = list(status)
+    if secretarias:
+        condicoes.append("secretaria = ANY(:secretarias)")
+        params["secretarias"] = list(secretarias)
+    query = text(f"""
+        SELECT id, numero_recarga, secretaria, localizacao, insumo,
+               status, data_abertura, hora_abertura, responsavel
+        FROM recargas
+        WHERE {" AND ".join(condicoes)}
+        ORDER BY data_abertura DESC, hora_abertura DESC
+        LIMIT :limite
+    """)
+    with conn.connect() as con:
+        result = con.execute(query, params)
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
 def render():
     role = st.session_state.get('role', '')
     display_name = st.session_state.get('display_name', '')
@@ -145,129 +178,137 @@ def render():
         with tab2:
             st.markdown("### Histórico de Recargas")
             
+            # Filtros aplicados no banco: só o período pedido chega à tabela
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                data_inicio = st.date_input(
+                    "Data Inicial",
+                    value=datetime.now().date() - timedelta(days=HISTORICO_DIAS_PADRAO),
+                    format="DD/MM/YYYY",
+                )
+            with col2:
+                data_fim = st.date_input("Data Final", value=datetime.now().date(), format="DD/MM/YYYY")
+            with col3:
+                filtro_status = st.multiselect(
+                    "Filtrar por Status",
+                    STATUS_RECARGA,
+                    default=[]
+                )
+            with col4:
+                filtro_secretaria = st.multiselect(
+                    "Filtrar por Secretaria",
+                    sorted(SECRETARIAS),
+                    default=[]
+                )
+
             try:
-                query = text("""
-                    SELECT id, numero_recarga, secretaria, localizacao, insumo, 
-                           status, data_abertura, hora_abertura, responsavel
-                    FROM recargas
-                    ORDER BY data_abertura DESC, hora_abertura DESC
-                """)
-                
-                with conn.connect() as con:
-                    result = con.execute(query).fetchall()
-                    if result:
-                        df = pd.DataFrame(result, columns=result[0]._mapping.keys())
-                        
-                        # Filtros
-                        col1, col2 = st.columns(2)
-                        with col1:
-                            filtro_status = st.multiselect(
-                                "Filtrar por Status",
-                                STATUS_RECARGA,
-                                default=[]
-                            )
-                        with col2:
-                            filtro_secretaria = st.multiselect(
-                                "Filtrar por Secretaria",
-                                sorted(df['secretaria'].unique()),
-                                default=[]
-                            )
-                        
-                        # Aplicar filtros
-                        if filtro_status:
-                            df = df[df['status'].isin(filtro_status)]
-                        if filtro_secretaria:
-                            df = df[df['secretaria'].isin(filtro_secretaria)]
-                        
-                        if len(df) > 0:
-                            st.markdown(f"**Total: {len(df)} recarga(s)**")
-                            st.markdown("---")
-                            
-                            for idx, row in df.iterrows():
-                                with st.container(border=True):
-                                    col1, col2, col3 = st.columns([2, 1, 1])
-                                    
-                                    with col1:
-                                        st.markdown(f"**{row['numero_recarga']}**")
-                                        st.markdown(f"{row['localizacao']}")
-                                        st.markdown(f"{row['insumo']}")
-                                        st.markdown(f"{row['secretaria']}")
-                                    
-                                    with col2:
-                                        st.markdown(f"**Data:** {row['data_abertura']}")
-                                        st.markdown(f"**Hora:** {row['hora_abertura']}")
-                                    
-                                    with col3:
-                                        status_icons = {
-                                            "EM ABERTO": "🔴",
-                                            "AGUARDANDO INSUMO": "🟠",
-                                            "RECARGA FEITA": "🟢"
-                                        }
-                                        icon = status_icons.get(row['status'], "⚪")
-                                        st.markdown(f"**Status:** {icon} {row['status']}")
-                                    
-                                    st.caption(f"Registrado por: {row['responsavel']}")
-                        else:
-                            st.info("Nenhuma recarga encontrada com os filtros aplicados.")
+                df = buscar_historico_recargas(conn, data_inicio, data_fim, filtro_status, filtro_secretaria)
+
+                if len(df) > 0:
+                    if len(df) > HISTORICO_LIMITE:
+                        df = df.head(HISTORICO_LIMITE)
+                        st.warning(
+                            f"Exibindo as {HISTORICO_LIMITE} recargas mais recentes do período. "
+                            "Reduza o período ou use os filtros para ver as demais."
+                        )
                     else:
-                        st.info("Nenhuma recarga registrada.")
+                        st.markdown(f"**Total: {len(df)} recarga(s)**")
+                    
+                    # Tabela virtualizada: o resultado vai uma vez, sem um widget por recarga
+                    status_icons = {
+                        "EM ABERTO": "🔴",
+                        "AGUARDANDO INSUMO": "🟠",
+                        "RECARGA FEITA": "🟢"
+                    }
+                    df = df.assign(status=[f"{status_icons.get(s, '⚪')} {s}" for s in df['status']])
+                    st.dataframe(
+                        df,
+                        hide_index=True,
+                        use_container_width=True,
+                        column_order=["numero_recarga", "localizacao", "insumo", "secretaria",
+                                      "data_abertura", "hora_abertura", "status", "responsavel"],
+                        column_config={
+                            "numero_recarga": "Número",
+                            "localizacao": "Localização",
+                            "insumo": "Insumo",
+                            "secretaria": "Secretaria",
+                            "data_abertura": st.column_config.DateColumn("Data", format="DD/MM/YYYY"),
+                            "hora_abertura": "Hora",
+                            "status": "Status",
+                            "responsavel": "Registrado por",
+                        },
+                    )
+                else:
+                    st.info("Nenhuma recarga encontrada com os filtros aplicados.")
             except Exception as e:
                 st.error(f"Erro ao carregar histórico: {e}")
     
     # ================= SEÇÃO: TÉCNICO RECARGA =================
     elif role == "tecnico_recarga":
-        st.markdown("### Minhas Recargas em Aberto")
+        render_painel_tecnico_recarga(conn)
+    
+    else:
+        st.warning("Você não tem permissão para acessar esta página.")
+
+def buscar_recargas_em_aberto(conn):
+    """Recargas que o técnico de recarga ainda precisa executar."""
+    query = text("""
+        SELECT id, numero_recarga, secretaria, localizacao, insumo, 
+               status, data_abertura, hora_abertura
+        FROM recargas
+        WHERE status IN ('EM ABERTO', 'AGUARDANDO INSUMO')
+        ORDER BY data_abertura DESC, hora_abertura DESC
+    """)
+    with conn.connect() as con:
+        result = con.execute(query)
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
+
+# Atualiza sozinho: só volta ao banco quando uma recarga entra ou sai dos
+# status acompanhados (aviso 'recargas:status:<status>', ver notificacoes.py)
+@st.fragment(run_every=INTERVALO_VERIFICACAO)
+@medido("fragmento:minhas_recargas.painel")
+def render_painel_tecnico_recarga(conn):
+    st.markdown("### Minhas Recargas em Aberto")
+    
+    try:
+        df = dados_do_painel(
+            "minhas_recargas",
+            ["recargas:status:EM ABERTO", "recargas:status:AGUARDANDO INSUMO"],
+            buscar_recargas_em_aberto,
+            conn,
+        )
         
-        try:
-            query = text("""
-                SELECT id, numero_recarga, secretaria, localizacao, insumo, 
-                       status, data_abertura, hora_abertura
-                FROM recargas
-                WHERE status IN ('EM ABERTO', 'AGUARDANDO INSUMO')
-                ORDER BY data_abertura DESC, hora_abertura DESC
-            """)
+        if len(df) == 0:
+            st.success("Nenhuma recarga em aberto!")
+        else:
+            st.info(f"Você tem **{len(df)}** recarga(s) para executar.")
+            st.markdown("---")
             
-            with conn.connect() as con:
-                result = con.execute(query).fetchall()
-                if result:
-                    df = pd.DataFrame(result, columns=result[0]._mapping.keys())
+            for idx, row in df.iterrows():
+                with st.container(border=True):
+                    col1, col2 = st.columns([3, 1])
                     
-                    if len(df) == 0:
-                        st.success("Parabéns! Você não possui recargas pendentes!")
-                    else:
-                        st.info(f"Você tem **{len(df)}** recarga(s) para executar.")
-                        st.markdown("---")
+                    with col1:
+                        status_icons = {
+                            "EM ABERTO": "🔴",
+                            "AGUARDANDO INSUMO": "🟠"
+                        }
+                        icon = status_icons.get(row['status'], "⚪")
                         
-                        for idx, row in df.iterrows():
-                            with st.container(border=True):
-                                col1, col2 = st.columns([3, 1])
-                                
-                                with col1:
-                                    status_icons = {
-                                        "EM ABERTO": "🔴",
-                                        "AGUARDANDO INSUMO": "🟠"
-                                    }
-                                    icon = status_icons.get(row['status'], "⚪")
-                                    
-                                    st.markdown(f"### {icon} {row['numero_recarga']}")
-                                    st.markdown(f"**Localização:** {row['localizacao']}")
-                                    st.markdown(f"**Insumo:** {row['insumo']}")
-                                    st.markdown(f"**Secretaria:** {row['secretaria']}")
-                                    st.markdown(f"**Status:** {row['status']}")
-                                    st.markdown(f"*Aberto em: {row['data_abertura']} às {row['hora_abertura']}*")
-                                
-                                with col2:
-                                    if st.button(
-                                        "✅ Recarga\nFeita",
-                                        key=f"finish_{row['id']}",
-                                        use_container_width=True
-                                    ):
-                                        if f_atualizar_recarga(conn, row['id'], "RECARGA FEITA"):
-                                            st.rerun()
-                else:
-                    st.success("Nenhuma recarga em aberto!")
-        except Exception as e:
-            st.error(f"Erro ao carregar recargas: {e}")
-    
-    else:
-        st.warning("Você não tem permissão para acessar esta página.")
\ No newline at end of file
+                        st.markdown(f"### {icon} {row['numero_recarga']}")
+                        st.markdown(f"**Localização:** {row['localizacao']}")
+                        st.markdown(f"**Insumo:** {row['insumo']}")
+                        st.markdown(f"**Secretaria:** {row['secretaria']}")
+                        st.markdown(f"**Status:** {row['status']}")
+                        st.markdown(f"*Aberto em: {row['data_abertura']} às {row['hora_abertura']}*")
+                    
+                    with col2:
+                        if st.button(
+                            "✅ Recarga\nFeita",
+                            key=f"finish_{row['id']}",
+                            use_container_width=True
+                        ):
+                            if f_atualizar_recarga(conn, row['id'], "RECARGA FEITA"):
+                                st.rerun()
+    except Exception as e:
+        st.error(f"Erro ao carregar recargas: {e}")
@@ -1,133 +1,14 @@
 import streamlit as st
 import pandas as pd
-from sqlalchemy import text
 from database import get_connection
+from carga_trabalho import carregar_carga_trabalho
+from notificacoes import INTERVALO_VERIFICACAO, dados_do_painel
+from instrumentacao import medido
 from config import STATUS_OPTIONS, CATEGORIAS, EQUIPAMENTOS
 from datetime import datetime
 import pytz
 import math
 
-def buscar_tarefas_tecnico(conn, display_name):
-    """Busca todas as OSs atribuídas ao técnico logado (Apenas Pendentes)."""
-    try:
-        query = text("""
-            SELECT *, 'Interna' as tipo FROM os_interna 
-            WHERE tecnico = :tecnico AND status NOT IN ('ENTREGUE AO CLIENTE', 'AGUARDANDO RETIRADA', 'FINALIZADO')
-            UNION ALL 
-            SELECT *, 'Externa' as tipo FROM os_externa 
-            WHERE tecnico = :tecnico AND status NOT IN ('ENTREGUE AO CLIENTE', 'AGUARDANDO RETIRADA', 'FINALIZADO')
-            ORDER BY data DESC, hora DESC
-        """)
-        with conn.connect() as con:
-            result = con.execute(query, {"tecnico": display_name})
-            rows = result.fetchall()
-            columns = result.keys()
-            df = pd.DataFrame(rows, columns=columns)
-        return df
-    except Exception as e:
-        st.error(f"Erro ao buscar tarefas: {e}")
-        return pd.DataFrame()
-
-def contar_os_abertas(conn, display_name):
-    """Conta OSs em aberto atribuídas ao técnico."""
-    try:
-        query = text("""
-            SELECT COUNT(*) as total FROM (
-                SELECT id FROM os_interna WHERE tecnico = :tecnico AND status = 'EM ABERTO'
-                UNION ALL 
-                SELECT id FROM os_externa WHERE tecnico = :tecnico AND status = 'EM ABERTO'
-            ) as combined
-        """)
-        with conn.connect() as con:
-            result = con.execute(query, {"tecnico": display_name}).fetchone()
-        return result[0] if result else 0
-    except Exception:
-        return 0
-
-def contar_os_aguardando_pecas(conn, display_name):
-    """Conta OSs aguardando peças atribuídas ao técnico."""
-    try:
-        query = text("""
-            SELECT COUNT(*) as total FROM (
-                SELECT id FROM os_interna WHERE tecnico = :tecnico AND status = 'AGUARDANDO PEÇA(S)'
-                UNION ALL 
-                SELECT id FROM os_externa WHERE tecnico = :tecnico AND status = 'AGUARDANDO PEÇA(S)'
-            ) as combined
-        """)
-        with conn.connect() as con:
-            result = con.execute(query, {"tecnico": display_name}).fetchone()
-        return result[0] if result else 0
-    except Exception:
-        return 0
-
-def buscar_os_pendentes_laudo(conn, display_name):
-    """Busca OSs com status AGUARDANDO PEÇA(S) que ainda não têm laudo."""
-    try:
-        # ✅ CORREÇÃO: Query 1 com context manager próprio
-        query_os = text("""
-            SELECT id, numero, 'Interna' as tipo, secretaria, equipamento, status, data 
-            FROM os_interna WHERE tecnico = :tecnico AND status = 'AGUARDANDO PEÇA(S)'
-            UNION ALL 
-            SELECT id, numero, 'Externa' as tipo, secretaria, equipamento, status, data 
-            FROM os_externa WHERE tecnico = :tecnico AND status = 'AGUARDANDO PEÇA(S)'
-            ORDER BY data DESC
-        """)
-        
-        df_os = pd.DataFrame()
-        os_sem_laudo = []
-        
-        # Buscar OSs aguardando peças
-        with conn.connect() as con:
-            result = con.execute(query_os, {"tecnico": display_name})
-            rows = result.fetchall()
-            columns = result.keys()
-            df_os = pd.DataFrame(rows, columns=columns)
-        
-        # ✅ CORREÇÃO: NOVA conexão para cada verificação de laudo
-        for _, row in df_os.iterrows():
-            tipo_os_laudo = f"OS {row['tipo']}"
-            query_laudo = text("""
-                SELECT COUNT(*) as total FROM laudos 
-                WHERE numero_os = :numero AND (tipo_os = :tipo OR tipo_os = :tipo_simples)
-            """)
-            
-            with conn.connect() as con:  # ✅ NOVA conexão para cada query laudo
-                result_laudo = con.execute(query_laudo, {
-                    "numero": row['numero'], 
-                    "tipo": tipo_os_laudo, 
-                    "tipo_simples": row['tipo']
-                }).fetchone()
-                
-                if result_laudo and result_laudo[0] == 0:
-                    os_sem_laudo.append(row)
-                    
-        return pd.DataFrame(os_sem_laudo) if os_sem_laudo else pd.DataFrame()
-        
-    except Exception as e:
-        st.error(f"Erro ao buscar OS pendentes de laudo: {e}")
-        return pd.DataFrame()
-
-def buscar_os_recentes_finalizadas(conn, display_name, limite=5):
-    """Busca as últimas OSs finalizadas do técnico (Inclui Aguardando Retirada)."""
-    try:
-        query = text("""
-            SELECT *, 'Interna' as tipo FROM os_interna 
-            WHERE tecnico = :tecnico AND status IN ('FINALIZADO', 'AGUARDANDO RETIRADA', 'ENTREGUE AO CLIENTE')
-            UNION ALL 
-            SELECT *, 'Externa' as tipo FROM os_externa 
-            WHERE tecnico = :tecnico AND status IN ('FINALIZADO', 'AGUARDANDO RETIRADA', 'ENTREGUE AO CLIENTE')
-            ORDER BY data_finalizada DESC LIMIT :limite
-        """)
-        with conn.connect() as con:
-            result = con.execute(query, {"tecnico": display_name, "limite": limite})
-            rows = result.fetchall()
-            columns = result.keys()
-            df = pd.DataFrame(rows, columns=columns)
-        return df
-    except Exception as e:
-        st.error(f"Erro ao buscar OS finalizadas: {e}")
-        return pd.DataFrame()
-
 def display_expandable_card(row, display_name):
     """Exibe um card expansível com informações da OS usando identificadores únicos."""
     # ✅ IDENTIFICADOR ÚNICO E ESTÁVEL por OS
@@ -225,11 +106,11 @@ def render_pagination_controls(page_var_name, total_pages):
     with col1:
         if st.button("⏮️ Primeira", disabled=(current_page == 1), key=f"first_{page_var_name}"):
             st.session_state[page_var_name] = 1
-            st.rerun()
+            st.rerun(scope="fragment")
     with col2:
         if st.button("◀️ Anterior", disabled=(current_page == 1), key=f"prev_{page_var_name}"):
             st.session_state[page_var_name] -= 1
-            st.rerun()
+            st.rerun(scope="fragment")
     with col3:
         st.markdown(
             f"<div style='text-align: center;'>Página {current_page} de {total_pages}</div>",
@@ -238,11 +119,11 @@ def render_pagination_controls(page_var_name, total_pages):
     with col4:
         if st.button("Próxima ▶️", disabled=(current_page >= total_pages), key=f"next_{page_var_name}"):
             st.session_state[page_var_name] += 1
-            st.rerun()
+            st.rerun(scope="fragment")
     with col5:
         if st.button("⏭️ Última", disabled=(current_page >= total_pages), key=f"last_{page_var_name}"):
             st.session_state[page_var_name] = total_pages
-            st.rerun()
+            st.rerun(scope="fragment")
 
 def render():
     st.markdown("## Minhas Tarefas")
@@ -250,8 +131,35 @@ def render():
     conn = get_connection()
     display_name = st.session_state.get('display_name', st.session_state.get('username', ''))
     
-    total_abertas = contar_os_abertas(conn, display_name)
-    total_aguardando_pecas = contar_os_aguardando_pecas(conn, display_name)
+    render_painel(conn, display_name)
+
+# O painel se atualiza sozinho: a cada verificação só recarrega do banco se
+# chegou aviso de alteração nas OS ou laudos do técnico (ver notificacoes.py)
+@st.fragment(run_every=INTERVALO_VERIFICACAO)
+@medido("fragmento:minhas_tarefas.painel")
+def render_painel(conn, display_name):
+    ITEMS_PER_PAGE = 5
+    if "tarefas_page" not in st.session_state:
+        st.session_state.tarefas_page = 1
+    
+    def carregar(tecnico, pagina):
+        return carregar_carga_trabalho(conn, tecnico, pagina, ITEMS_PER_PAGE)
+    
+    # Cabeçalho, página de tarefas, pendentes de laudo e finalizadas em uma única consulta
+    chaves = [f"tecnico:{display_name}"]
+    try:
+        carga = dados_do_painel("minhas_tarefas", chaves, carregar, display_name, st.session_state.tarefas_page)
+        total_pages_tarefas = max(math.ceil(carga["total_tarefas"] / ITEMS_PER_PAGE), 1)
+        if st.session_state.tarefas_page > total_pages_tarefas:
+            # A lista encolheu (ex.: OS finalizada): volta para a última página existente
+            st.session_state.tarefas_page = total_pages_tarefas
+            carga = dados_do_painel("minhas_tarefas", chaves, carregar, display_name, total_pages_tarefas)
+    except Exception as e:
+        st.error(f"Erro ao carregar suas tarefas: {e}")
+        return
+    
+    total_abertas = carga["abertas"]
+    total_aguardando_pecas = carga["aguardando_pecas"]
     
     col1, col2, col3 = st.columns(3)
     with col1:
@@ -264,30 +172,18 @@ def render():
     
     st.markdown("---")
     
-    ITEMS_PER_PAGE = 5
     tab1, tab2, tab3 = st.tabs(["OSs em Aberto", "Pendentes de Laudo", "Últimas Finalizadas"])
     
     with tab1:
         st.markdown("### Ordens de Serviço em Aberto")
-        df_abertas = buscar_tarefas_tecnico(conn, display_name)
+        df_page = carga["tarefas"]
         
-        if df_abertas.empty:
+        if df_page.empty:
             st.success("✅ Parabéns! Você não tem ordens de serviço em aberto no momento.")
         else:
-            if "tarefas_page" not in st.session_state:
-                st.session_state.tarefas_page = 1
-            
-            total_items = len(df_abertas)
-            total_pages = math.ceil(total_items / ITEMS_PER_PAGE)
-            
-            if st.session_state.tarefas_page > total_pages:
-                st.session_state.tarefas_page = total_pages
-            if st.session_state.tarefas_page < 1:
-                st.session_state.tarefas_page = 1
-            
-            start_idx = (st.session_state.tarefas_page - 1) * ITEMS_PER_PAGE
-            end_idx = start_idx + ITEMS_PER_PAGE
-            df_page = df_abertas.iloc[start_idx:end_idx]
+            # A consulta já devolve apenas a página atual
+            total_items = carga["total_tarefas"]
+            total_pages = total_pages_tarefas
             
             st.info(f"📋 Exibindo {len(df_page)} de {total_items} ordens | Página {st.session_state.tarefas_page} de {total_pages}")
             
@@ -300,7 +196,7 @@ def render():
     
     with tab2:
         st.markdown("### OSs Aguardando Laudo de Avaliação")
-        df_pendentes = buscar_os_pendentes_laudo(conn, display_name)
+        df_pendentes = carga["pendentes_laudo"]
         
         if df_pendentes.empty:
             st.success("✅ Não há ordens de serviço pendentes de laudo.")
@@ -353,7 +249,7 @@ def render():
     
     with tab3:
         st.markdown("### Últimas 5 OSs Finalizadas")
-        df_finalizadas = buscar_os_recentes_finalizadas(conn, display_name, limite=5)
+        df_finalizadas = carga["finalizadas"]
         
         if df_finalizadas.empty:
             st.info("ℹ️ Nenhuma ordem de serviço finalizada recentemente.")
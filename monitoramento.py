@@ -0,0 +1,131 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/monitoramento.py
+# Servidor HTTP de monitoramento, em uma thread do próprio processo do Streamlit.
+#
+#   /healthz  consulta o banco pelo engine compartilhado (200 se respondeu, 503 se não)
+#   /metrics  métricas no formato texto do Prometheus: sessões ativas, pool de
+#             conexões, cache de consultas e os histogramas de instrumentacao.py
+#
+# É iniciado por servidor.py antes do Streamlit (o healthcheck responde mesmo sem
+# nenhum usuário conectado) e também por app.py, caso a aplicação seja iniciada
+# diretamente com `streamlit run app.py`. A porta vem de MONITORAMENTO_PORTA.
+
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sqlalchemy import text
+
+import database
+from cache_consultas import estatisticas
+from config import MONITORAMENTO_PORTA
+from instrumentacao import histogramas, sessoes_ativas
+
+PREFIXO = "sistema_os_"
+
+_servidor = None
+_lock = threading.Lock()
+
+
+def _escapar(valor):
+    return str(valor).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _rotulos(rotulos):
+    if not rotulos:
+        return ""
+    return "{" + ",".join(f'{nome}="{_escapar(valor)}"' for nome, valor in rotulos.items()) + "}"
+
+
+def _numero(valor):
+    return repr(float(valor)) if isinstance(valor, float) else str(valor)
+
+
+def _metrica(linhas, nome, tipo, descricao, valor):
+    linhas.append(f"# HELP {PREFIXO}{nome} {descricao}")
+    linhas.append(f"# TYPE {PREFIXO}{nome} {tipo}")
+    linhas.append(f"{PREFIXO}{nome} {_numero(valor)}")
+
+
+def gerar_metricas():
+    """Texto do /metrics (formato de exposição do Prometheus, versão 0.0.4)."""
+    linhas = []
+    _metrica(linhas, "sessoes_ativas", "gauge",
+             "Sessões do Streamlit com atividade nos últimos 5 minutos", sessoes_ativas())
+
+    if database._engine is not None:
+        pool = database.metricas_pool()
+        _metrica(linhas, "pool_tamanho", "gauge", "Conexões permanentes do pool", pool["tamanho"])
+        _metrica(linhas, "pool_em_uso", "gauge", "Conexões emprestadas no momento", pool["em_uso"])
+        _metrica(linhas, "pool_ociosas", "gauge", "Conexões ociosas no pool", pool["ociosas"])
+        _metrica(linhas, "pool_overflow", "gauge", "Conexões abertas além do tamanho do pool", pool["overflow"])
+        _metrica(linhas, "pool_checkouts_total", "counter", "Conexões emprestadas desde o início", pool["checkouts"])
+        _metrica(linhas, "pool_conexoes_criadas_total", "counter", "Conexões abertas com o banco", pool["conexoes_criadas"])
+        _metrica(linhas, "pool_invalidadas_total", "counter", "Conexões descartadas por erro", pool["invalidadas"])
+        _metrica(linhas, "pool_esgotamentos_total", "counter", "Esperas por conexão que estouraram o timeout", pool["esgotamentos"])
+
+    cache = estatisticas()
+    _metrica(linhas, "cache_acertos_total", "counter", "Consultas servidas pelo cache", cache["acertos"])
+    _metrica(linhas, "cache_falhas_total", "counter", "Consultas que foram ao banco", cache["falhas"])
+    _metrica(linhas, "cache_itens", "gauge", "Resultados guardados no cache", cache["itens"])
+
+    for metrica, descricao, limites, series in histogramas():
+        nome = PREFIXO + metrica
+        linhas.append(f"# HELP {nome} {descricao}")
+        linhas.append(f"# TYPE {nome} histogram")
+        for rotulos, contagens, soma, total in series:
+            for limite, contagem in zip(limites, contagens):
+                linhas.append(f"{nome}_bucket{_rotulos({**rotulos, 'le': limite})} {contagem}")
+            linhas.append(f"{nome}_bucket{_rotulos({**rotulos, 'le': '+Inf'})} {total}")
+            linhas.append(f"{nome}_sum{_rotulos(rotulos)} {_numero(soma)}")
+            linhas.append(f"{nome}_count{_rotulos(rotulos)} {total}")
+    return "\n".join(linhas) + "\n"
+
+
+def verificar_banco():
+    """(ok, detalhe): SELECT 1 por uma conexão do pool compartilhado."""
+    try:
+        engine = database._engine or database.inicializar_engine(tentativas=1)
+        with engine.connect() as con:
+            con.execution_options(sem_metricas=True).execute(text("SELECT 1"))
+        return True, "ok"
+    except Exception as e:
+        return False, str(e)
+
+
+class _Tratador(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == "/healthz":
+            ok, detalhe = verificar_banco()
+            self._responder(200 if ok else 503, "text/plain; charset=utf-8", detalhe + "\n")
+        elif self.path == "/metrics":
+            self._responder(200, "text/plain; version=0.0.4; charset=utf-8", gerar_metricas())
+        else:
+            self._responder(404, "text/plain; charset=utf-8", "não encontrado\n")
+
+    def _responder(self, status, tipo, corpo):
+        dados = corpo.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", tipo)
+        self.send_header("Content-Length", str(len(dados)))
+        self.end_headers()
+        self.wfile.write(dados)
+
+    def log_message(self, formato, *args):
+        # Healthchecks a cada poucos segundos não devem poluir o log do container
+        pass
+
+
+def iniciar(porta=MONITORAMENTO_PORTA):
+    """Sobe o servidor uma única vez por processo; chamadas seguintes não fazem nada."""
+    global _servidor
+    with _lock:
+        if _servidor is not None:
+            return _servidor
+        try:
+            _servidor = ThreadingHTTPServer(("0.0.0.0", porta), _Tratador)
+        except OSError as e:
+            print(f"❌ Monitoramento não iniciado na porta {porta}: {e}")
+            return None
+        _servidor.daemon_threads = True
+        threading.Thread(target=_servidor.serve_forever, name="monitoramento", daemon=True).start()
+        print(f"✅ Monitoramento em http://0.0.0.0:{porta} (/healthz, /metrics)")
+        return _servidor
@@ -0,0 +1,116 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/notificacoes.py
+# Avisos de alteração do banco para os painéis abertos o dia todo.
+#
+# Uma thread por processo fica em LISTEN no canal 'versoes_dados'
+# (migracoes/0011_notificacoes.sql) e conta quantos avisos chegaram para cada
+# chave ('tecnico:FULANO', 'recargas:status:EM ABERTO', ...). Os painéis rodam
+# em st.fragment(run_every=...) e, a cada verificação, só comparam esses
+# contadores em memória: o banco é consultado apenas quando chega um aviso
+# para uma das chaves do painel.
+
+import select
+import threading
+import time
+
+import psycopg2
+import streamlit as st
+
+from database import get_connection
+from instrumentacao import marcar_ocioso
+
+CANAL = "versoes_dados"
+
+# Intervalo (segundos) em que os painéis conferem se chegou algum aviso
+INTERVALO_VERIFICACAO = 3
+
+
+class _Ouvinte(threading.Thread):
+    """Thread de LISTEN com reconexão automática."""
+
+    def __init__(self, dsn):
+        super().__init__(name="ouvinte-versoes-dados", daemon=True)
+        self.dsn = dsn
+        self.lock = threading.Lock()
+        self.contadores = {}
+        # Incrementada a cada (re)conexão: avisos perdidos enquanto desconectado
+        # fazem todos os painéis recarregarem uma vez
+        self.geracao = 0
+        self.ativo = False
+
+    def run(self):
+        espera = 1
+        while True:
+            try:
+                self._escutar()
+            except (psycopg2.Error, OSError) as e:
+                print(f"❌ Ouvinte de notificações desconectado: {e}")
+            if self.ativo:
+                # Chegou a ficar em LISTEN: a queda é nova, recomeça o intervalo
+                espera = 1
+            self.ativo = False
+            time.sleep(espera)
+            espera = min(espera * 2, 60)
+
+    def _escutar(self):
+        con = psycopg2.connect(self.dsn)
+        try:
+            con.autocommit = True
+            with con.cursor() as cur:
+                cur.execute(f"LISTEN {CANAL}")
+            with self.lock:
+                self.geracao += 1
+            self.ativo = True
+            while True:
+                if select.select([con], [], [], 30) == ([], [], []):
+                    # Sem avisos: confirma que a conexão continua viva
+                    with con.cursor() as cur:
+                        cur.execute("SELECT 1")
+                    continue
+                con.poll()
+                with self.lock:
+                    while con.notifies:
+                        aviso = con.notifies.pop(0)
+                        self.contadores[aviso.payload] = self.contadores.get(aviso.payload, 0) + 1
+        finally:
+            con.close()
+
+    def marca(self, chaves):
+        with self.lock:
+            return (self.geracao,) + tuple(self.contadores.get(c, 0) for c in chaves)
+
+
+@st.cache_resource(show_spinner=False)
+def _obter_ouvinte():
+    url = get_connection().url.set(drivername="postgresql")
+    ouvinte = _Ouvinte(url.render_as_string(hide_password=False))
+    ouvinte.start()
+    return ouvinte
+
+
+def marca_alteracoes(chaves):
+    """
+    Marca (tupla comparável) dos avisos recebidos para as chaves, ou None se o
+    ouvinte não estiver conectado, caso em que o painel deve consultar o banco.
+    """
+    ouvinte = _obter_ouvinte()
+    if not ouvinte.ativo:
+        return None
+    return ouvinte.marca(chaves)
+
+
+def dados_do_painel(nome, chaves, carregar, *args):
+    """
+    Devolve carregar(*args), guardado na sessão até chegar um aviso para alguma
+    das chaves (ou mudarem os argumentos). Usado dentro de st.fragment(run_every).
+    As verificações sem alteração não entram nas métricas do fragmento (medido).
+    """
+    marca = marca_alteracoes(chaves)
+    chave_sessao = f"_painel_{nome}"
+    guardado = st.session_state.get(chave_sessao)
+    if marca is not None and guardado is not None and guardado[0] == (marca, args):
+        marcar_ocioso()
+        return guardado[1]
+    marcar_ocioso(False)
+    dados = carregar(*args)
+    st.session_state[chave_sessao] = ((marca, args), dados)
+    return dados
@@ -3,6 +3,10 @@ import streamlit as st
 import pandas as pd
 from sqlalchemy import text
 from database import get_connection, gerar_proximo_numero_recarga
+from consultas import SQL_CONTAGEM_STATUS_RECARGAS
+from cache_consultas import consultar, consultar_escalar
+from instrumentacao import medido
+from tabela import selecionar_linha, barra_de_acoes
 from config import SECRETARIAS
 from datetime import date, datetime
 import math
@@ -335,16 +339,19 @@ def render_tab_registro(conn):
                 del st.session_state.edit_recarga_id
             st.rerun()
 
+# A aba de consulta é um fragmento: paginar e abrir modais não refaz a página inteira
+@st.fragment
+@medido("fragmento:recargas.consulta")
 def render_tab_consulta(conn):
     st.markdown("### Consulta de Recargas")
     
     try:
-        with conn.connect() as con:
-            total_count = con.execute(text("SELECT COUNT(*) FROM recargas")).scalar()
-            status_counts = con.execute(text("""
-                SELECT status, COUNT(*) as count FROM recargas
-                GROUP BY status ORDER BY count DESC
-            """)).fetchall()
+        # Contadores compartilhados entre sessões até a próxima gravação em recargas
+        status_counts = [
+            (row["status"], row["count"])
+            for row in consultar(conn, ["recargas"], SQL_CONTAGEM_STATUS_RECARGAS)
+        ]
+        total_count = sum(count for _, count in status_counts)
         
         col1, col2, col3, col4 = st.columns(4)
         with col1:
@@ -425,8 +432,7 @@ def render_tab_consulta(conn):
     
     try:
         count_query = f"SELECT COUNT(*) FROM ({query_base}) as sub"
-        with conn.connect() as con:
-            total_items = con.execute(text(count_query), params).scalar()
+        total_items = consultar_escalar(conn, ["recargas"], count_query, params)
     except Exception as e:
         st.error(f"Erro ao contar recargas: {e}")
         return
@@ -456,46 +462,35 @@ def render_tab_consulta(conn):
         
         st.markdown("---")
         
-        cols_header = st.columns((1, 1.5, 1.5, 1.5, 1.5, 2, 2))
-        headers = ["Nº Recarga", "Data Solicit.", "Status", "Secretaria", "Tipo", "Modelo (resumo)", "Ações"]
-        
-        for col, header in zip(cols_header, headers):
-            col.markdown(f"**{header}**")
+        linha = selecionar_linha(
+            df_recargas,
+            f"recarga_tabela_{st.session_state.recarga_page}",
+            ordem=["numero_recarga", "data_solicitacao", "status", "secretaria", "tipo_insumo", "modelo_insumo"],
+            colunas={
+                "numero_recarga": "Nº Recarga",
+                "data_solicitacao": "Data Solicit.",
+                "status": "Status",
+                "secretaria": "Secretaria",
+                "tipo_insumo": "Tipo",
+                "modelo_insumo": st.column_config.TextColumn("Modelo (resumo)", width="medium"),
+            },
+        )
         
-        st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
+        acao = barra_de_acoes(
+            linha,
+            [("👁️ Visualizar", "Visualizar"), ("✏️ Editar", "Editar"), ("🗑️ Deletar", "Deletar")],
+            "recarga_acoes",
+        )
         
-        for idx, row in df_recargas.iterrows():
-            recarga_id = row['id']
-            cols_row = st.columns((1, 1.5, 1.5, 1.5, 1.5, 2, 2))
-            
-            cols_row[0].write(str(row.get('numero_recarga', 'N/A')))
-            cols_row[1].write(str(row.get('data_solicitacao', 'N/A')))
-            cols_row[2].write(str(row.get('status', 'N/A')))
-            cols_row[3].write(str(row.get('secretaria', 'N/A')))
-            cols_row[4].write(str(row.get('tipo_insumo', 'N/A')))
-            
-            modelo = str(row.get('modelo_insumo', 'N/A'))
-            modelo_resumido = modelo[:25] + "..." if len(modelo) > 25 else modelo
-            cols_row[5].write(modelo_resumido)
-            
-            action_col = cols_row[6]
-            col_b1, col_b2, col_b3 = action_col.columns(3)
-            
-            if col_b1.button("👁️", key=f"view_{recarga_id}_{idx}", use_container_width=True, help="Visualizar"):
-                show_recarga_details(dict(row))
-            
-            if col_b2.button("✏️", key=f"edit_{recarga_id}_{idx}", use_container_width=True, help="Editar"):
-                st.session_state.edit_recarga_id = recarga_id
-                if 'form_data' in st.session_state:
-                    del st.session_state.form_data
-                st.rerun()
-            
-            if col_b3.button("🗑️", key=f"del_{recarga_id}_{idx}", use_container_width=True, type="secondary", help="Deletar"):
-                st.session_state.delete_recarga_id = recarga_id
-                st.session_state.delete_recarga_data = dict(row)
-                st.rerun()
-            
-            st.markdown("<hr style='margin-top: 0; margin-bottom: 0;'>", unsafe_allow_html=True)
+        if acao == "👁️ Visualizar":
+            show_recarga_details(linha)
+        elif acao == "✏️ Editar":
+            st.session_state.edit_recarga_id = linha["id"]
+            if 'form_data' in st.session_state:
+                del st.session_state.form_data
+            st.rerun()
+        elif acao == "🗑️ Deletar":
+            confirmar_exclusao(conn, linha["id"], linha)
         
         st.markdown("---")
         if total_pages > 1:
@@ -503,46 +498,34 @@ def render_tab_consulta(conn):
             
             if col_nav1.button("← Anterior", key="prev_recarga", disabled=(st.session_state.recarga_page <= 1)):
                 st.session_state.recarga_page -= 1
-                st.rerun()
+                st.rerun(scope="fragment")
             
             col_nav2.markdown(f"**Página {st.session_state.recarga_page} de {total_pages}**")
             
             if col_nav3.button("Próxima →", key="next_recarga", disabled=(st.session_state.recarga_page >= total_pages)):
                 st.session_state.recarga_page += 1
-                st.rerun()
+                st.rerun(scope="fragment")
     
     except Exception as e:
         st.error(f"Erro ao consultar recargas: {e}")
         st.exception(e)
 
-def render_delete_confirmation(conn):
-    if 'delete_recarga_id' in st.session_state:
-        recarga_id = st.session_state.delete_recarga_id
-        recarga_data = st.session_state.get('delete_recarga_data', {})
-        
-        st.warning("Confirmação de Exclusão")
-        st.write(f"Tem certeza que deseja deletar a recarga **{recarga_data.get('numero_recarga', 'N/A')}**?")
-        
-        col1, col2 = st.columns(2)
-        if col1.button("Sim, Deletar", type="primary", use_container_width=True):
-            if f_deletar_recarga(conn, recarga_id):
-                del st.session_state.delete_recarga_id
-                if 'delete_recarga_data' in st.session_state:
-                    del st.session_state.delete_recarga_data
-                st.rerun()
-        
-        if col2.button("Cancelar", use_container_width=True):
-            del st.session_state.delete_recarga_id
-            if 'delete_recarga_data' in st.session_state:
-                del st.session_state.delete_recarga_data
+@st.dialog("Confirmação de Exclusão")
+def confirmar_exclusao(conn, recarga_id, recarga_data):
+    st.write(f"Tem certeza que deseja deletar a recarga **{recarga_data.get('numero_recarga', 'N/A')}**?")
+    
+    col1, col2 = st.columns(2)
+    if col1.button("Sim, Deletar", type="primary", use_container_width=True):
+        if f_deletar_recarga(conn, recarga_id):
             st.rerun()
+    
+    if col2.button("Cancelar", use_container_width=True):
+        st.rerun()
 
 def render():
     conn = get_connection()
     st.title("Gerenciamento de Recargas de Impressora")
     
-    render_delete_confirmation(conn)
-    
     tab1, tab2 = st.tabs(["Registro de Recargas", "Consulta de Recargas"])
     
     with tab1:
@@ -99,7 +99,6 @@ def render():
                     try:
                         with conn.connect() as con:
                             with con.begin(): 
-                                con.execute(text("LOCK TABLE os_interna IN ACCESS EXCLUSIVE MODE"))
                                 numero_os = gerar_proximo_numero_os(con, "os_interna")
                                 con.execute(
                                     text("""
@@ -225,7 +224,6 @@ def render():
                     try:
                         with conn.connect() as con:
                             with con.begin():
-                                con.execute(text("LOCK TABLE os_externa IN ACCESS EXCLUSIVE MODE"))
                                 numero_os_ext = gerar_proximo_numero_os(con, "os_externa")
                                 con.execute(
                                     text("""
@@ -0,0 +1,18 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/servidor.py
+# Ponto de entrada do container: sobe o monitoramento (/healthz, /metrics) e em
+# seguida o Streamlit, no mesmo processo, para que as métricas expostas sejam
+# as da aplicação. Os argumentos são repassados ao `streamlit run app.py`:
+#   python servidor.py --server.port=8501 --server.address=0.0.0.0
+
+import os
+import sys
+
+from streamlit.web import cli
+
+import monitoramento
+
+if __name__ == "__main__":
+    monitoramento.iniciar()
+    app = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")
+    sys.argv = ["streamlit", "run", app, *sys.argv[1:]]
+    sys.exit(cli.main())
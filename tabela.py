@@ -0,0 +1,60 @@
+# CÓDIGO PARA O NOVO ARQUIVO: sistema_os_crud-main/tabela.py
+# Tabela com seleção de linha e ações, no lugar das grades de st.columns/st.button.
+#
+# Os dados vão ao navegador uma única vez (st.dataframe, virtualizado) e as
+# ações são um conjunto fixo de botões que age sobre a linha selecionada: o
+# número de widgets não cresce com o tamanho da página.
+
+import streamlit as st
+
+
+def selecionar_linha(df, chave, ordem=None, colunas=None, altura=None):
+    """
+    Exibe o DataFrame com seleção de uma única linha e devolve a linha
+    selecionada como dict (ou None), com todas as colunas do df.
+    `ordem` lista as colunas visíveis e `colunas` é o column_config do st.dataframe.
+    """
+    if ordem is not None:
+        # Colunas ausentes do resultado (ex.: esquemas antigos) são ignoradas
+        ordem = [c for c in ordem if c in df.columns]
+    opcoes = {"height": altura} if altura is not None else {}
+    evento = st.dataframe(
+        df,
+        key=chave,
+        on_select="rerun",
+        selection_mode="single-row",
+        hide_index=True,
+        use_container_width=True,
+        column_order=ordem,
+        column_config=colunas,
+        **opcoes,
+    )
+    linhas = evento.selection.rows
+    # Após recarregar os dados a seleção antiga pode apontar para fora do df
+    if not linhas or linhas[0] >= len(df):
+        return None
+    return df.iloc[linhas[0]].to_dict()
+
+
+def barra_de_acoes(linha, acoes, chave):
+    """
+    Botões de ação para a linha selecionada, desabilitados sem seleção.
+    `acoes` é uma lista de (rótulo, ajuda) ou (rótulo, ajuda, habilitada).
+    Devolve o rótulo do botão clicado, ou None.
+    """
+    if linha is None:
+        st.caption("Selecione uma linha na tabela para ver as ações disponíveis.")
+    colunas = st.columns(len(acoes))
+    clicada = None
+    for coluna, acao in zip(colunas, acoes):
+        rotulo, ajuda = acao[0], acao[1]
+        habilitada = acao[2] if len(acao) > 2 else True
+        if coluna.button(
+            rotulo,
+            key=f"{chave}_{rotulo}",
+            help=ajuda,
+            disabled=linha is None or not habilitada,
+            use_container_width=True,
+        ):
+            clicada = rotulo
+    return clicada
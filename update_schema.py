@@ -1,46 +1,39 @@
 # CÓDIGO ATUALIZADO E COMPLETO PARA: sistema_os_crud-main/update_schema.py
+# As alterações de schema agora vivem em migracoes/ (ver migrador.py).
+# Este script continua existindo para quem já o executava manualmente no contêiner.
 
 import os
-from sqlalchemy import create_engine, text
+import sys
+from sqlalchemy import create_engine
+from migrador import aplicar_migracoes
 
 def migrate_schema():
-    print("--- Iniciando migração de schema (Adicionando 'administrativo' role) ---")
-    
-    # --- ALTERAÇÃO AQUI ---
+    print("--- Aplicando migrações de schema pendentes ---")
+
     # Lê as variáveis de ambiente do contêiner onde o script está rodando.
-    DB_HOST = os.getenv("DB_HOST")         # Será "db-dev"
-    DB_NAME = os.getenv("DB_NAME")         # Será "ordens_servico_dev"
-    DB_USER = os.getenv("DB_USER")         # Será "postgres"
-    DB_PASSWORD = os.getenv("DB_PASSWORD") # Será "1234"
+    DB_HOST = os.getenv("DB_HOST")
+    DB_NAME = os.getenv("DB_NAME")
+    DB_USER = os.getenv("DB_USER")
+    DB_PASSWORD = os.getenv("DB_PASSWORD")
     DB_PORT = "5432" # Na rede interna do Docker, a porta do Postgres é sempre 5432
 
     # Verifica se as variáveis foram carregadas
     if not all([DB_HOST, DB_NAME, DB_USER, DB_PASSWORD]):
         print("\n❌ ERRO: Variáveis de ambiente (DB_HOST, DB_NAME, etc.) não foram carregadas.")
         print("Certifique-se de que o contêiner 'app-dev' está rodando ('docker compose up -d').")
-        return
-    # --- FIM DA ALTERAÇÃO ---
+        sys.exit(1)
 
     db_engine_url = f"postgresql+psycopg2://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
-    
-    try:
-        engine = create_engine(db_engine_url)
-        with engine.connect() as con:
-            with con.begin():
-                print("1. Removendo a antiga constraint 'usuarios_role_check'...")
-                con.execute(text("ALTER TABLE usuarios DROP CONSTRAINT IF EXISTS usuarios_role_check;"))
-                
-                print("2. Adicionando a nova constraint 'usuarios_role_check' com 'administrativo'...")
-                con.execute(text("""
-                    ALTER TABLE usuarios
-                    ADD CONSTRAINT usuarios_role_check
-                    CHECK (role IN ('admin', 'tecnico', 'administrativo'));
-                """))
-            
-            print("\n✅ Schema atualizado com sucesso!")
 
+    engine = create_engine(db_engine_url)
+    try:
+        total = aplicar_migracoes(engine)
+        print(f"\n✅ Schema atualizado com sucesso! ({total} migração(ões) aplicada(s))")
     except Exception as e:
         print(f"\n❌ Falha ao migrar o schema: {e}")
+        sys.exit(1)
+    finally:
+        engine.dispose()
 
 if __name__ == "__main__":
-    migrate_schema()
\ No newline at end of file
+    migrate_schema()